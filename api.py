@@ -1,9 +1,112 @@
+import heapq
+import itertools
 import requests
+import threading
+import time
+from collections import OrderedDict
+from chunk_pipeline import CHUNK_SIZE, ChunkPipeline
+from disk_cache import DISK_CACHE_MAX_AGE, disk_cache
+from fetch_trace import fetch_trace
+from ladder_store import MAX_REUSE_AGE
 
 # This is the URL of your local proxy server.
 # PROXY_BASE_URL = "http://127.0.0.1:5000"
 PROXY_BASE_URL = "https://poeladdertracker.fly.dev" # Replace with your actual Fly.io URL
 
+# The proxy answers HTTP 429 with a Retry-After estimate instead of waiting itself.
+# Ladder requests wait it out on the client, up to this many seconds per retry.
+MAX_RATE_LIMIT_WAIT = 30
+RATE_LIMIT_RETRIES = 3
+
+# Minimum spacing (in seconds) between ladder requests, shared by every thread of the
+# app, so concurrent fetches such as the league comparison stay within one budget.
+LADDER_REQUEST_INTERVAL = 0.25
+
+# Priority classes for ladder requests, most urgent first. The interactive race-mode
+# refresh goes ahead of a character search, which goes ahead of bulk scans.
+PRIORITY_RACE = 0
+PRIORITY_SEARCH = 1
+PRIORITY_BULK = 2
+
+# How often (in seconds) a request waiting for the budget checks whether it was cancelled.
+CANCEL_POLL_INTERVAL = 0.1
+
+# Number of response bodies kept for conditional (If-None-Match) requests.
+MAX_CONDITIONAL_CACHE_ENTRIES = 500
+
+class RequestBudget:
+    """
+    Paces requests from all threads through one shared budget: at most one
+    request per `interval` seconds, and none while a rate-limit penalty reported
+    by the proxy (HTTP 429) is running.
+
+    When several threads are waiting, the next slot goes to the most urgent
+    priority class (oldest request first within a class), so a race-mode
+    refresh waits at most about one interval behind a bulk scan instead of
+    queueing behind all of its requests.
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self.penalties = 0 # Number of pauses so far, for callers that adapt their pace
+        self._condition = threading.Condition(threading.Lock())
+        self._waiting = [] # Heap of (priority, arrival) tickets
+        self._arrivals = itertools.count()
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    def acquire(self, priority=PRIORITY_BULK, cancelled=None):
+        """
+        Blocks until the calling thread may send its next request. If the optional
+        `cancelled()` callable becomes true while waiting, gives up without using
+        a slot and returns False.
+        """
+        with self._condition:
+            ticket = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if cancelled is not None and cancelled():
+                        return False
+                    now = time.time()
+                    timeout = None
+                    if self._waiting[0] == ticket:
+                        # A penalty may have started while this thread was waiting for its turn.
+                        slot = max(self._next_slot, self._paused_until)
+                        if now >= slot:
+                            self._next_slot = now + self.interval
+                            return True
+                        timeout = slot - now
+                    if cancelled is not None:
+                        timeout = min(timeout or CANCEL_POLL_INTERVAL, CANCEL_POLL_INTERVAL)
+                    self._condition.wait(timeout)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                # Let the next thread in line take over.
+                self._condition.notify_all()
+
+    def pause(self, seconds):
+        """Holds back every thread for `seconds`, e.g. after a 429 from the proxy."""
+        with self._condition:
+            self.penalties += 1
+            self._paused_until = max(self._paused_until, time.time() + seconds)
+
+def _request_error(e):
+    """Turns a failed proxy request into the error dict the fetch methods return."""
+    # Try to parse a JSON error from the response body first. An error Response
+    # is falsy, so it has to be compared with None.
+    if e.response is not None:
+        try:
+            return e.response.json()
+        except requests.exceptions.JSONDecodeError:
+            # If body is not JSON, create a generic HTTP error
+            return {"error": "http_error", "message": f"Server returned status {e.response.status_code}"}
+    # Handle connection errors specifically
+    if isinstance(e, requests.exceptions.ConnectionError):
+        return {"error": "connection_failed", "message": f"Connection to proxy at {PROXY_BASE_URL} failed. Is the internal server running?"}
+    # Fallback for other request exceptions
+    return {"error": "request_failed", "message": str(e)}
+
 class _GGGAPIClient:
     """
     A client to interact with the local proxy server, which in turn
@@ -12,6 +115,61 @@ class _GGGAPIClient:
     """
     def __init__(self):
         self.session = requests.Session()
+        self.budget = RequestBudget(LADDER_REQUEST_INTERVAL)
+        self._conditional_cache = OrderedDict() # (url, params) -> (etag, body bytes)
+        self._conditional_cache_lock = threading.Lock()
+
+    def _conditional_get(self, url, params=None):
+        """
+        GETs a URL, sending If-None-Match when an earlier response for the same
+        URL and parameters carried an ETag. On 304 Not Modified the cached body is
+        restored into the response, so callers can use it like a normal 200.
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._conditional_cache_lock:
+            cached = self._conditional_cache.get(key)
+        headers = {'If-None-Match': cached[0]} if cached else None
+
+        with fetch_trace.phase("request"):
+            response = self.session.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            response._content = cached[1]
+            response.status_code = 200
+        elif response.status_code == 200 and response.headers.get('ETag'):
+            with self._conditional_cache_lock:
+                self._conditional_cache[key] = (response.headers['ETag'], response.content)
+                self._conditional_cache.move_to_end(key)
+                while len(self._conditional_cache) > MAX_CONDITIONAL_CACHE_ENTRIES:
+                    self._conditional_cache.popitem(last=False)
+        return response
+
+    def _save_to_disk(self, key, value):
+        cache = disk_cache()
+        if cache is not None:
+            cache.put(key, value)
+
+    def _load_from_disk(self, key, max_age):
+        cache = disk_cache()
+        return cache.get(key, max_age) if cache is not None else None
+
+    def _top_key(self, league_id, ascendancy, limit):
+        return f"top/{league_id}/{ascendancy or ''}/{limit}"
+
+    def cached_leagues(self, max_age=DISK_CACHE_MAX_AGE):
+        """
+        Returns (fetched at, leagues) for the league list that fetch_leagues() last
+        got, if the disk cache has one from the last `max_age` seconds, else None.
+        """
+        return self._load_from_disk("leagues", max_age)
+
+    def cached_top(self, league_id, ascendancy=None, limit=10, max_age=DISK_CACHE_MAX_AGE):
+        """Like cached_leagues(), for the fetch_top() response with the same arguments."""
+        return self._load_from_disk(self._top_key(league_id, ascendancy, limit), max_age)
+
+    def _decode(self, response):
+        """Parses a JSON response body, timed as the trace's 'decode' phase."""
+        with fetch_trace.phase("decode"):
+            return response.json()
 
     def fetch_leagues(self):
         """
@@ -19,31 +177,25 @@ class _GGGAPIClient:
         """
         try:
             # The proxy server exposes a /leagues endpoint
-            response = self.session.get(f"{PROXY_BASE_URL}/leagues")
+            response = self._conditional_get(f"{PROXY_BASE_URL}/leagues")
             response.raise_for_status()
             # The proxy server correctly returns a JSON object with a 'result' key
             # based on the GGG API v2 spec.
-            return response.json()
+            leagues = self._decode(response)
+            if isinstance(leagues, list):
+                self._save_to_disk("leagues", leagues)
+            return leagues
         except requests.exceptions.RequestException as e:
             print(f"API Client Error: Could not connect to proxy server to fetch leagues: {e}")
-            # Try to parse a JSON error from the response body first
-            if e.response is not None:
-                try:
-                    return e.response.json()
-                except requests.exceptions.JSONDecodeError:
-                    # If body is not JSON, create a generic HTTP error
-                    return {"error": "http_error", "message": f"Server returned status {e.response.status_code}"}
-            # Handle connection errors specifically
-            elif isinstance(e, requests.exceptions.ConnectionError):
-                return {"error": "connection_failed", "message": f"Connection to proxy at {PROXY_BASE_URL} failed. Is the internal server running?"}
-            # Fallback for other request exceptions
-            else:
-                return {"error": "request_failed", "message": str(e)}
-
-    def fetch_ladder(self, league_id, limit=200, offset=0, deep_search=False):
+            return _request_error(e)
+
+    def fetch_ladder(self, league_id, limit=200, offset=0, deep_search=False, priority=PRIORITY_BULK, cancelled=None):
         """
         Fetches ladder data from the local proxy server.
         It decides which endpoint to use based on the 'deep_search' flag.
+        The request waits for the shared budget in its `priority` class; if the
+        optional `cancelled()` callable becomes true first, it is never sent and
+        a 'cancelled' error dict is returned.
         """
         params = {'limit': limit, 'offset': offset}
 
@@ -56,23 +208,81 @@ class _GGGAPIClient:
             endpoint = f"/public-ladder/{league_id}"
 
         try:
-            response = self.session.get(f"{PROXY_BASE_URL}{endpoint}", params=params)
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                with fetch_trace.phase("rate_limit_wait"):
+                    if not self.budget.acquire(priority, cancelled):
+                        return {"error": "cancelled", "message": "The request was cancelled before it was sent."}
+                response = self._conditional_get(f"{PROXY_BASE_URL}{endpoint}", params=params)
+                if response.status_code == 429 and attempt < RATE_LIMIT_RETRIES:
+                    retry_after = response.headers.get("Retry-After")
+                    wait_time = int(retry_after) if retry_after and retry_after.isdigit() else 5
+                    print(f"API Client: Proxy is rate limited. Retrying in {min(wait_time, MAX_RATE_LIMIT_WAIT)}s...")
+                    # Pausing the shared budget holds back every other thread too.
+                    self.budget.pause(min(wait_time, MAX_RATE_LIMIT_WAIT))
+                    continue
+                break
             response.raise_for_status()
-            return response.json()
+            return self._decode(response)
         except requests.exceptions.RequestException as e:
             print(f"API Client Error: Failed to fetch ladder data from proxy: {e}")
-            # Try to parse a JSON error from the response body first
-            if e.response is not None:
-                try:
-                    return e.response.json()
-                except requests.exceptions.JSONDecodeError:
-                    return {"error": "http_error", "message": f"Server returned status {e.response.status_code}"}
-            # Handle connection errors specifically
-            elif isinstance(e, requests.exceptions.ConnectionError):
-                return {"error": "connection_failed", "message": f"Connection to proxy at {PROXY_BASE_URL} failed. Is the internal server running?"}
-            # Fallback for other request exceptions
-            else:
-                return {"error": "request_failed", "message": str(e)}
+            return _request_error(e)
+
+    def iter_ladder_chunks(self, league_id, start=0, end=None, chunk_size=CHUNK_SIZE, deep_search=False, stop_event=None, priority=PRIORITY_BULK,
+                           store=None, max_age=MAX_REUSE_AGE):
+        """
+        Returns a ChunkPipeline yielding (offset, response) for the ladder chunks
+        from `start` up to `end`, with several fetch_ladder() requests in flight.
+        Use it as a context manager so that leaving the loop early cancels the
+        requests that are still waiting for the budget.
+
+        With a LadderStore, chunks it got less than `max_age` seconds ago are
+        taken from it without a request, and fetched chunks are added to it
+        (with their ranks stamped).
+        """
+        def fetch_chunk(offset, limit, cancelled):
+            if store is not None:
+                entries = store.chunk(offset, max_age)
+                if entries is not None and len(entries) == limit:
+                    return {'entries': entries}
+            data = self.fetch_ladder(league_id, limit=limit, offset=offset, deep_search=deep_search, priority=priority, cancelled=cancelled)
+            if store is not None and isinstance(data, dict) and data.get('entries'):
+                store.put(offset, data['entries'])
+            return data
+        return ChunkPipeline(fetch_chunk, start, end, chunk_size, stop_event=stop_event, budget=self.budget)
+
+    def find_character(self, league_id, name, neighbors=1):
+        """
+        Looks a character up through the proxy's name index in one request.
+        Returns the lookup result, {'status': 'pending'} while the league snapshot
+        is still being built, or an error dict (e.g. 'not_found').
+        """
+        try:
+            response = self._conditional_get(f"{PROXY_BASE_URL}/character/{league_id}/{name}", params={'neighbors': neighbors})
+            response.raise_for_status()
+            return self._decode(response)
+        except requests.exceptions.RequestException as e:
+            print(f"API Client Error: Failed to look up character through proxy: {e}")
+            return _request_error(e)
+
+    def fetch_top(self, league_id, ascendancy=None, limit=10):
+        """
+        Fetches the ranked top-N characters per ascendancy (or for a single
+        ascendancy/base class) from the proxy's precomputed league snapshot.
+        Returns {'status': 'pending'} while the snapshot is still being built.
+        """
+        params = {'limit': limit}
+        if ascendancy:
+            params['ascendancy'] = ascendancy
+        try:
+            response = self._conditional_get(f"{PROXY_BASE_URL}/top/{league_id}", params=params)
+            response.raise_for_status()
+            top = self._decode(response)
+            if isinstance(top, dict) and 'results' in top:
+                self._save_to_disk(self._top_key(league_id, ascendancy, limit), top)
+            return top
+        except requests.exceptions.RequestException as e:
+            print(f"API Client Error: Failed to fetch top characters from proxy: {e}")
+            return _request_error(e)
 
 # Create a single instance of the client to be used throughout the application.
 # This is the "singleton" pattern. When other files import GGGAPIClient,
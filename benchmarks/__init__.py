@@ -0,0 +1,6 @@
+"""
+Benchmarks for the ladder tracker's hot paths.
+
+Run from the repository root, e.g. `python -m benchmarks.hot_paths`. Each
+module can also be run as a script.
+"""
@@ -0,0 +1,317 @@
+"""
+A local stand-in for the GGG API, for load-testing the proxy without touching
+the real servers.
+
+Serves the four endpoints the proxy uses:
+
+    POST /oauth/token           client-credentials tokens
+    GET  /leagues               the configured leagues (bearer token required)
+    GET  /ladder/<league>       the authenticated, deep ladder (bearer token required)
+    GET  /api/ladders/<league>  the public ladder, capped at 15,000 entries
+
+Every response is delayed by a configurable latency and carries the
+X-Rate-Limit-Policy / -Rules / -<rule> / -<rule>-State headers the proxy's
+RateLimitGovernor reads. A client that exceeds a rule is restricted for the
+rule's penalty and gets 429 with Retry-After until it ends. Ladders are built
+with benchmarks.synthetic and keep changing while the simulator runs:
+characters gain experience, some die, and the order is updated.
+
+GET /_stats reports the calls received per endpoint and status.
+
+Run it standalone and point a proxy at it:
+
+    python -m benchmarks.ggg_simulator --port 8900 --latency 0.2
+    GGG_WEB_BASE_URL=http://127.0.0.1:8900 GGG_API_BASE_URL=http://127.0.0.1:8900 \\
+        GGG_CLIENT_ID=simulator GGG_CLIENT_SECRET=simulator python proxy_server.py
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic import MAX_EXPERIENCE, synthetic_entries
+from data_processor import XP_THRESHOLDS
+from ladder_snapshot import PUBLIC_LADDER_DEPTH
+
+DEFAULT_LEAGUES = ("Standard", "Hardcore", "Simulated")
+MAX_CHUNK_SIZE = 200
+TOKEN_LIFETIME = 36000
+
+# Endpoint -> (policy name, rule name, default rules as "max_hits:period:restriction,...").
+# The values are in the range of what GGG sends for these endpoints.
+DEFAULT_POLICIES = {
+    "oauth": ("oauth-token-request", "Ip", "5:10:60,20:300:300"),
+    "leagues": ("league-request-limit", "Client", "30:10:60,100:300:300"),
+    "ladder": ("ladder-view", "Client", "10:5:10,30:60:60"),
+    "public-ladder": ("ladder-view-public", "Ip", "8:10:60,30:60:120")
+}
+
+
+class SimulatedPolicy:
+    """
+    One GGG rate-limit policy: a log of recent hits checked against every rule,
+    and the restriction that follows once a rule is broken.
+    """
+    def __init__(self, name, rule_name, rules):
+        self.name = name
+        self.rule_name = rule_name
+        self.rules = rules # [(max_hits, period, restriction)]
+        self.hits = deque()
+        self.restricted_until = 0.0
+        self._lock = threading.Lock()
+
+    def hit(self):
+        """Records a request. Returns (retry_after or None, response headers)."""
+        now = time.time()
+        with self._lock:
+            longest = max(period for _, period, _ in self.rules)
+            while self.hits and self.hits[0] <= now - longest:
+                self.hits.popleft()
+            if now >= self.restricted_until:
+                self.hits.append(now)
+                for max_hits, period, restriction in self.rules:
+                    if sum(1 for t in self.hits if t > now - period) > max_hits:
+                        self.restricted_until = max(self.restricted_until, now + restriction)
+            restricted = max(0, int(self.restricted_until - now + 0.999))
+            states = []
+            for max_hits, period, restriction in self.rules:
+                current = sum(1 for t in self.hits if t > now - period)
+                states.append(f"{current}:{period}:{restricted if current > max_hits or restricted else 0}")
+        headers = {
+            "X-Rate-Limit-Policy": self.name,
+            "X-Rate-Limit-Rules": self.rule_name,
+            f"X-Rate-Limit-{self.rule_name}": ",".join(f"{m}:{p}:{r}" for m, p, r in self.rules),
+            f"X-Rate-Limit-{self.rule_name}-State": ",".join(states)
+        }
+        if restricted:
+            headers["Retry-After"] = str(restricted)
+            return restricted, headers
+        return None, headers
+
+
+class SimulatedLeague:
+    """A ladder that keeps moving: every tick some characters gain experience and a few die."""
+    def __init__(self, league_id, rows, seed=0, tick=10.0, active_rate=0.05, death_rate=0.002):
+        self.league_id = league_id
+        self.entries = list(synthetic_entries(rows, seed=seed))
+        self.tick = tick
+        self.active_rate = active_rate
+        self.death_rate = death_rate
+        self.rng = random.Random(seed + 1)
+        self.last_tick = time.time()
+        self.lock = threading.Lock()
+
+    def _advance(self):
+        """Applies the ticks that have passed since the last request."""
+        ticks = int((time.time() - self.last_tick) / self.tick) if self.tick > 0 else 0
+        if ticks <= 0:
+            return
+        self.last_tick += ticks * self.tick
+        rng = self.rng
+        for entry in rng.sample(self.entries, min(len(self.entries), int(len(self.entries) * self.active_rate * ticks))):
+            if entry['dead'] or entry['retired']:
+                continue
+            char_data = entry['character']
+            char_data['experience'] = min(MAX_EXPERIENCE, char_data['experience'] + int(rng.random() * ticks * 2_000_000))
+            char_data['level'] = min(100, bisect.bisect_right(XP_THRESHOLDS, char_data['experience']))
+            if rng.random() < self.death_rate * ticks:
+                entry['dead'] = True
+        self.entries.sort(key=lambda e: e['character']['experience'], reverse=True)
+        for rank, entry in enumerate(self.entries, 1):
+            entry['rank'] = rank
+
+    def page(self, offset, limit, depth=None):
+        """Returns the response body for one ladder chunk."""
+        with self.lock:
+            self._advance()
+            total = len(self.entries) if depth is None else min(len(self.entries), depth)
+            entries = self.entries[offset:max(offset, min(offset + limit, total))]
+            return json.dumps({"total": total, "cached_since": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.last_tick)),
+                               "entries": entries}).encode("utf-8")
+
+
+class GGGSimulator:
+    """Runs the simulated API on a background thread until stop() is called."""
+    def __init__(self, host="127.0.0.1", port=0, latency=0.1, jitter=0.05, leagues=DEFAULT_LEAGUES,
+                 rows=PUBLIC_LADDER_DEPTH, tick=10.0, policies=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.leagues = {name: SimulatedLeague(name, rows, seed=seed + i, tick=tick) for i, name in enumerate(leagues)}
+        self.policies = {
+            endpoint: SimulatedPolicy(name, rule_name, (policies or {}).get(endpoint) or parse_rules(rules))
+            for endpoint, (name, rule_name, rules) in DEFAULT_POLICIES.items()
+        }
+        self.calls = Counter() # (endpoint, status) -> count
+        self.tokens = set()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="GGGSimulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        """Calls received so far, per endpoint and per status code."""
+        with self._lock:
+            calls = dict(self.calls)
+        endpoints = {}
+        for (endpoint, status), count in sorted(calls.items()):
+            endpoints.setdefault(endpoint, {"total": 0, "statuses": {}})
+            endpoints[endpoint]["total"] += count
+            endpoints[endpoint]["statuses"][str(status)] = count
+        return {"total": sum(calls.values()), "rate_limited": sum(c for (_, s), c in calls.items() if s == 429),
+                "endpoints": endpoints}
+
+    def _record(self, endpoint, status):
+        with self._lock:
+            self.calls[(endpoint, status)] += 1
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if urlparse(self.path).path == "/oauth/token":
+                    return self.serve("oauth", self.token)
+                self.send_json(404, {"error": {"code": 1, "message": "Resource not found"}})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                path = unquote(url.path)
+                if path == "/_stats":
+                    return self.send_json(200, simulator.stats())
+                if path == "/leagues":
+                    return self.serve("leagues", self.authorized(self.league_list))
+                for prefix, endpoint, depth in (("/ladder/", "ladder", None), ("/api/ladders/", "public-ladder", PUBLIC_LADDER_DEPTH)):
+                    if path.startswith(prefix):
+                        league = simulator.leagues.get(path[len(prefix):])
+                        action = lambda: self.ladder(league, query, depth)
+                        return self.serve(endpoint, self.authorized(action) if endpoint == "ladder" else action)
+                self.send_json(404, {"error": {"code": 1, "message": "Resource not found"}})
+
+            def serve(self, endpoint, action):
+                time.sleep(max(0.0, simulator.latency + random.uniform(-simulator.jitter, simulator.jitter)))
+                retry_after, headers = simulator.policies[endpoint].hit()
+                if retry_after is not None:
+                    status, payload = 429, {"error": {"code": 3, "message": "Rate limit exceeded"}}
+                else:
+                    status, payload = action()
+                simulator._record(endpoint, status)
+                self.send_json(status, payload, headers)
+
+            def authorized(self, action):
+                def check():
+                    token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                    if token not in simulator.tokens:
+                        return 401, {"error": {"code": 8, "message": "Unauthorized"}}
+                    return action()
+                return check
+
+            def token(self):
+                token = os.urandom(16).hex()
+                with simulator._lock:
+                    simulator.tokens.add(token)
+                return 200, {"access_token": token, "expires_in": TOKEN_LIFETIME, "token_type": "bearer",
+                             "scope": "service:leagues service:leagues:ladder"}
+
+            def league_list(self):
+                return 200, [{"id": name, "realm": "pc", "description": "Simulated league", "rules": []}
+                             for name in simulator.leagues]
+
+            def ladder(self, league, query, depth):
+                if league is None:
+                    return 404, {"error": {"code": 1, "message": "Resource not found"}}
+                try:
+                    limit = min(max(int(query.get("limit", [MAX_CHUNK_SIZE])[0]), 1), MAX_CHUNK_SIZE)
+                    offset = max(int(query.get("offset", [0])[0]), 0)
+                except ValueError:
+                    return 400, {"error": {"code": 2, "message": "Invalid query"}}
+                return 200, league.page(offset, limit, depth)
+
+            def send_json(self, status, payload, headers=None):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def parse_rules(value):
+    """Parses "max_hits:period:restriction,..." into a list of integer triples."""
+    rules = [tuple(int(f) for f in part.split(":")) for part in value.split(",") if part.strip()]
+    if not rules or any(len(rule) != 3 for rule in rules):
+        raise ValueError(f"Invalid rate-limit rules '{value}'; expected e.g. '8:10:60,30:60:120'.")
+    return rules
+
+
+def add_simulator_arguments(parser):
+    """The simulator's command-line options, shared with the load generator."""
+    parser.add_argument("--latency", type=float, default=0.1, help="Mean upstream latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Latency varies by up to this much either way.")
+    parser.add_argument("--leagues", default=",".join(DEFAULT_LEAGUES), help="Comma-separated league names.")
+    parser.add_argument("--ladder-rows", type=int, default=PUBLIC_LADDER_DEPTH, help="Characters per league.")
+    parser.add_argument("--tick", type=float, default=10.0, help="Seconds between ladder updates (0 freezes them).")
+    for endpoint in DEFAULT_POLICIES:
+        parser.add_argument(f"--{endpoint}-rules", metavar="RULES",
+                            help=f"Rate-limit rules for {endpoint} (default {DEFAULT_POLICIES[endpoint][2]}).")
+
+
+def simulator_from_arguments(args, port=0):
+    policies = {endpoint: parse_rules(getattr(args, f"{endpoint.replace('-', '_')}_rules"))
+                for endpoint in DEFAULT_POLICIES if getattr(args, f"{endpoint.replace('-', '_')}_rules")}
+    return GGGSimulator(port=port, latency=args.latency, jitter=args.jitter,
+                        leagues=[l.strip() for l in args.leagues.split(",") if l.strip()],
+                        rows=args.ladder_rows, tick=args.tick, policies=policies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    add_simulator_arguments(parser)
+    args = parser.parse_args()
+
+    simulator = simulator_from_arguments(args, args.port).start()
+    print(f"Simulated GGG API listening on {simulator.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Times the ladder tracker's hot paths on synthetic ladders of growing size.
+
+Covered: building the compact ladder, process_ladder_data, the desktop fetch
+loop (LadderAggregator plus its stop check), the race-mode neighbour lookup,
+whole-ladder ranking, snapshot indexing, top-N, lookups, deltas and
+serialization, and the proxy's snapshot-backed routes.
+
+Every benchmark reports the best of --repeat runs. Results can be written as
+JSON and compared against a file from an earlier commit:
+
+    python -m benchmarks.hot_paths --json results/HEAD.json
+    python -m benchmarks.hot_paths --rows 15000 --compare results/HEAD.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from functools import cached_property
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import data_processor
+from benchmarks.synthetic import CHUNK_SIZE, SIZES, synthetic_ladder
+from compact_ladder import CompactLadder
+from data_processor import STANDARD_ASCENDANCIES, LadderAggregator, process_ladder_data, rank_ladder, stamp_ladder_ranks
+from ladder_snapshot import LadderSnapshot
+from ladder_store import LadderStore
+
+LEAGUE = "Benchmark"
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Registers a benchmark. It receives a Dataset and returns the seconds one run took."""
+    def register(func):
+        BENCHMARKS.append((name, func))
+        return func
+    return register
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+class Dataset:
+    """One synthetic ladder plus everything derived from it, built on first use."""
+    def __init__(self, rows):
+        self.rows = rows
+        self.ladder = stamp_ladder_ranks(synthetic_ladder(rows))
+
+    def chunks(self):
+        """Raw entry chunks, as the desktop client receives them from the API."""
+        for offset in range(0, self.rows, CHUNK_SIZE):
+            yield self.ladder[offset:offset + CHUNK_SIZE]
+
+    @cached_property
+    def target(self):
+        """A character halfway down the ladder, as tracked in race mode."""
+        return self.ladder[self.rows // 2]
+
+    @cached_property
+    def snapshot(self):
+        return LadderSnapshot(LEAGUE, self.ladder, 1)
+
+    @cached_property
+    def next_snapshot(self):
+        """The following crawl: every 50th character gained experience and swapped places with the one above."""
+        entries = self.ladder[:]
+        for i in range(1, len(entries), 50):
+            entries[i]['character']['experience'] = entries[i - 1]['character']['experience']
+            entries[i - 1], entries[i] = entries[i], entries[i - 1]
+        return LadderSnapshot(LEAGUE, stamp_ladder_ranks(CompactLadder(entries)), 2)
+
+    @cached_property
+    def store(self):
+        """The desktop client's store for this league, holding every chunk."""
+        store = LadderStore(LEAGUE, CHUNK_SIZE)
+        for offset, chunk in zip(range(0, self.rows, CHUNK_SIZE), self.chunks()):
+            store.put(offset, chunk)
+        return store
+
+    @cached_property
+    def client(self):
+        """A Flask test client for the proxy, serving this dataset's snapshot."""
+        import proxy_server
+        proxy_server.crawler.touch = lambda league_id: None # Never crawl the real API
+        proxy_server.crawler._snapshots[LEAGUE] = self.snapshot
+        return proxy_server.app.test_client()
+
+
+@benchmark("compact_ladder.extend")
+def bench_compact_extend(data):
+    ladder = CompactLadder()
+    elapsed = 0.0
+    for chunk in data.chunks():
+        elapsed += timed(ladder.extend, chunk)
+    return elapsed
+
+
+@benchmark("process_ladder_data.all")
+def bench_process_all(data):
+    return timed(process_ladder_data, data.ladder, None, 10)
+
+
+@benchmark("process_ladder_data.base_class")
+def bench_process_base(data):
+    return timed(process_ladder_data, data.ladder, "Witch", 10)
+
+
+@benchmark("fetch_loop.aggregate_and_stop_check")
+def bench_fetch_loop(data):
+    """App.fetch_and_display_data per chunk: add, refresh the top-N and check whether to stop."""
+    aggregator = LadderAggregator(10)
+    elapsed = 0.0
+    for chunk in data.chunks():
+        started = time.perf_counter()
+        aggregator.add(chunk)
+        aggregator.results(None, 10)
+        aggregator.is_satisfied(STANDARD_ASCENDANCIES, 10)
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+
+@benchmark("race.neighbour_lookup")
+def bench_race_neighbours(data):
+    """RaceModeWindow.process_and_display_data's global and same-class neighbours, from the league's LadderStore."""
+    name = data.target['character']['name']
+    store = data.store
+
+    def lookup():
+        for same_class in (False, True):
+            ahead = store.neighbor(name, "ahead", same_class)
+            behind = store.neighbor(name, "behind", same_class)
+        return ahead, behind
+    return timed(lookup)
+
+
+@benchmark("rank_ladder.python")
+def bench_rank_python(data):
+    return timed(rank_ladder, data.ladder, False)
+
+
+@benchmark("rank_ladder.numpy")
+def bench_rank_numpy(data):
+    if data_processor.numpy is None:
+        return None
+    return timed(rank_ladder, data.ladder, True)
+
+
+@benchmark("snapshot.build")
+def bench_snapshot_build(data):
+    return timed(LadderSnapshot, LEAGUE, data.ladder, 1)
+
+
+@benchmark("snapshot.top_all")
+def bench_snapshot_top(data):
+    return timed(data.snapshot.top, None, 10)
+
+
+@benchmark("snapshot.find_character")
+def bench_snapshot_find(data):
+    return timed(data.snapshot.find_character, data.target['character']['name'], 5)
+
+
+@benchmark("snapshot.changes_since")
+def bench_snapshot_changes(data):
+    next_snapshot, snapshot = data.next_snapshot, data.snapshot
+    return timed(next_snapshot.changes_since, snapshot)
+
+
+@benchmark("snapshot.json_body")
+def bench_snapshot_json(data):
+    data.snapshot._json_body = None
+    return timed(data.snapshot.json_body)
+
+
+@benchmark("route.top")
+def bench_route_top(data):
+    client = data.client
+    return timed(client.get, f"/top/{LEAGUE}?limit=10")
+
+
+@benchmark("route.character")
+def bench_route_character(data):
+    client = data.client
+    return timed(client.get, f"/character/{LEAGUE}/{data.target['character']['name']}?neighbors=5")
+
+
+@benchmark("route.snapshot_gzip")
+def bench_route_snapshot(data):
+    client = data.client
+    # A new crawl invalidates the cached compressed body, so measure that cold path.
+    data.snapshot._encoded_bodies = {}
+    return timed(client.get, f"/snapshot/{LEAGUE}", headers={"Accept-Encoding": "gzip"})
+
+
+@benchmark("route.ladder_range_1000")
+def bench_route_range(data):
+    client = data.client
+
+    def stream():
+        response = client.get(f"/ladder-range/{LEAGUE}?from=0&to=1000")
+        for _ in response.response:
+            pass
+    return timed(stream)
+
+
+def run(rows_list, repeat, only=None):
+    results = []
+    for rows in rows_list:
+        print(f"Generating {rows} rows...", file=sys.stderr)
+        data = Dataset(rows)
+        for name, func in BENCHMARKS:
+            if only and not any(part in name for part in only):
+                continue
+            func(data) # Warm-up, also builds any lazily derived data
+            times = []
+            for _ in range(repeat):
+                gc.collect()
+                elapsed = func(data)
+                if elapsed is None:
+                    break
+                times.append(elapsed)
+            if times:
+                results.append({"benchmark": name, "rows": rows, "seconds": min(times), "runs": len(times)})
+                print(f"  {name:<40} {rows:>9} {min(times) * 1000:>10.2f} ms", file=sys.stderr)
+        del data
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": getattr(data_processor.numpy, "__version__", None),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
+
+
+def compare(results, baseline_path):
+    """Prints each result relative to the same benchmark in a baseline file."""
+    with open(baseline_path) as f:
+        baseline = {(r["benchmark"], r["rows"]): r["seconds"] for r in json.load(f)["results"]}
+    print(f"{'benchmark':<40} {'rows':>9} {'baseline':>12} {'current':>12} {'change':>8}")
+    for r in results:
+        before = baseline.get((r["benchmark"], r["rows"]))
+        if before is None:
+            continue
+        change = (r["seconds"] - before) / before * 100 if before else 0.0
+        print(f"{r['benchmark']:<40} {r['rows']:>9} {before * 1000:>9.2f} ms {r['seconds'] * 1000:>9.2f} ms {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best time is reported")
+    parser.add_argument("--only", nargs="+", help="Only run benchmarks whose name contains one of these strings")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON to PATH ('-' for stdout)")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against results written earlier with --json")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat, args.only)
+    report = {"meta": metadata(), "results": results}
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    elif args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
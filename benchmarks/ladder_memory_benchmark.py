@@ -0,0 +1,135 @@
+"""
+Compares the memory used by a ladder held as a list of nested entry dicts with
+the same ladder in a CompactLadder.
+
+Rows are shaped like the public ladder endpoint's entries, including the
+fields the clients ignore, and are parsed from JSON so that no strings are
+shared between rows, just like a real response. The dict baseline keeps only
+the fields CompactLadder keeps (the layout of CompactLadder.entry), so the
+ratio measures the column layout alone; the raw rows with every field are
+reported separately.
+
+Usage:
+    python benchmarks/ladder_memory_benchmark.py --rows 15000 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from compact_ladder import CompactLadder
+from data_processor import CLASS_TO_BASE
+
+
+def synthetic_ladder_json(rows, seed=0):
+    """A JSON array of `rows` ladder entries in the API's layout."""
+    rng = random.Random(seed)
+    classes = sorted(CLASS_TO_BASE)
+    entries = []
+    for i in range(rows):
+        entries.append({
+            "rank": i + 1,
+            "dead": rng.random() < 0.05,
+            "public": True,
+            "character": {
+                "id": "%064x" % rng.getrandbits(256),
+                "name": f"Character_{i}_{rng.randrange(10**6)}",
+                "level": max(1, 100 - i // 1500),
+                "class": rng.choice(classes),
+                "experience": 4250334444 - i * 1000,
+                "depth": {"default": rng.randrange(300), "solo": rng.randrange(300)}
+            },
+            "account": {
+                "name": f"Account_{rng.randrange(10**6)}#{rng.randrange(10**4):04d}",
+                "realm": "pc",
+                "challenges": {"set": "Settlers", "completed": rng.randrange(41), "max": 40}
+            }
+        })
+    return json.dumps(entries)
+
+
+def kept_fields(entry):
+    """The fields of a raw entry that CompactLadder keeps, in CompactLadder.entry's layout."""
+    char_data = entry['character']
+    kept = {
+        'rank': entry['rank'],
+        'dead': entry.get('dead', False),
+        'retired': entry.get('retired', False),
+        'public': entry.get('public', False),
+        'character': {
+            'name': char_data['name'],
+            'level': char_data['level'],
+            'class': char_data['class'],
+            'experience': char_data['experience']
+        }
+    }
+    if entry.get('account'):
+        kept['account'] = {'name': entry['account']['name']}
+    return kept
+
+
+def traced(build):
+    """Returns (object, bytes still allocated by it once build() returns)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def measure(rows):
+    body = synthetic_ladder_json(rows)
+
+    raw, raw_bytes = traced(lambda: json.loads(body))
+    del raw
+
+    def build_dicts():
+        # Parse then keep the same fields as CompactLadder, dropping the raw rows.
+        return [kept_fields(entry) for entry in json.loads(body)]
+    dicts, dict_bytes = traced(build_dicts)
+    del dicts
+
+    def build_compact():
+        # Parse then convert, dropping the raw rows like the crawler and the GUI do.
+        return CompactLadder(json.loads(body))
+    compact, compact_bytes = traced(build_compact)
+    assert len(compact) == rows
+
+    return {
+        "rows": rows,
+        "raw_bytes": raw_bytes,
+        "dict_bytes": dict_bytes,
+        "compact_bytes": compact_bytes,
+        "dict_bytes_per_row": round(dict_bytes / rows, 1),
+        "compact_bytes_per_row": round(compact_bytes / rows, 1),
+        "ratio": round(dict_bytes / compact_bytes, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[15000, 100000])
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(rows) for rows in args.rows]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'rows':>8} {'raw rows':>16} {'list of dicts':>16} {'CompactLadder':>16} {'ratio':>7}")
+    for r in results:
+        print(f"{r['rows']:>8} {r['raw_bytes'] / 2**20:>13.1f} MB {r['dict_bytes'] / 2**20:>13.1f} MB "
+              f"{r['compact_bytes'] / 2**20:>13.1f} MB {r['ratio']:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
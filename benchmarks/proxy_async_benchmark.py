@@ -0,0 +1,145 @@
+"""
+Measures proxy throughput with sync vs. gevent (PROXY_ASYNC=1) gunicorn workers
+while the upstream GGG API is slow.
+
+A local stub stands in for www.pathofexile.com and answers every ladder request
+after a fixed delay. The proxy is started with its cache disabled so that every
+request goes upstream, then hammered with concurrent clients.
+
+Usage:
+    python benchmarks/proxy_async_benchmark.py --latency 0.3 --requests 200 --concurrency 20
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_slow_upstream(latency):
+    """Starts a threaded HTTP server that mimics the public ladder endpoint with a fixed delay."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Allow keep-alive, like the real API
+
+        def do_GET(self):
+            time.sleep(latency)
+            query = parse_qs(urlparse(self.path).query)
+            limit = int(query.get("limit", [200])[0])
+            offset = int(query.get("offset", [0])[0])
+            entries = [{
+                "rank": offset + i + 1,
+                "dead": False,
+                "character": {"name": f"Char{offset + i}", "level": 90, "class": "Slayer", "experience": 1_000_000_000 - offset - i},
+                "account": {"name": f"Account#{offset + i}"}
+            } for i in range(limit)]
+            body = json.dumps({"total": 15000, "entries": entries}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_proxy(upstream_url, async_mode, workers):
+    port = free_port()
+    env = dict(os.environ,
+               GGG_WEB_BASE_URL=upstream_url,
+               PROXY_ASYNC="1" if async_mode else "0",
+               WEB_CONCURRENCY=str(workers),
+               LADDER_CACHE_TTL="0",
+               CRAWLER_ENABLED="0",
+               RATE_LIMIT_STATE_FILE="")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "proxy_server:app"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            requests.get(f"{base_url}/cache-stats", timeout=1)
+            return process, base_url
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Proxy did not start in time.")
+
+
+def run_load(base_url, total_requests, concurrency):
+    local = threading.local()
+
+    def one_request(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        response = session.get(f"{base_url}/public-ladder/Bench", params={"limit": 200, "offset": (i * 200) % 15000})
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one_request, range(total_requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total_requests,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(total_requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated upstream latency in seconds.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="Gunicorn worker processes.")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    upstream = start_slow_upstream(args.latency)
+    upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}"
+    results = {"latency_s": args.latency, "concurrency": args.concurrency, "workers": args.workers, "modes": {}}
+    for mode, async_mode in (("sync", False), ("gevent", True)):
+        process, base_url = start_proxy(upstream_url, async_mode, args.workers)
+        try:
+            results["modes"][mode] = run_load(base_url, args.requests, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+        stats = results["modes"][mode]
+        print(f"{mode:>7}: {stats['requests_per_s']:>7} req/s   p50 {stats['p50_ms']:>8} ms   p99 {stats['p99_ms']:>8} ms")
+    upstream.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Replays the desktop and web clients' access patterns against the proxy, with
+the simulated GGG API (benchmarks/ggg_simulator.py) standing in upstream, and
+reports client-side latency, throughput and how many calls reached "GGG".
+
+Each virtual user runs one scenario in a loop:
+
+    full_scan  the desktop app's ladder fetch: /public-ladder chunk by chunk to 15,000
+    top        the web page's class leaderboard: /top
+    search     a character search: /character, falling back to a chunk scan
+               while the snapshot is being built
+    race       race mode: a chunk scan down to the tracked character, repeated
+               every --race-interval seconds (60 s, like the desktop refresh)
+
+By default a proxy is started with gunicorn and pointed at an in-process
+simulator; extra proxy settings (LADDER_CACHE_TTL, CRAWLER_CHUNK_DELAY, ...)
+are passed through from the environment. Use --proxy-url to load an already
+running proxy instead (its upstream URLs are then up to you, and upstream call
+counts are read from --simulator-url if given).
+
+Usage:
+    python -m benchmarks.proxy_load --duration 120 --users full_scan=2 top=5 search=5 race=10
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.ggg_simulator import add_simulator_arguments, simulator_from_arguments
+from ladder_snapshot import CHUNK_SIZE, PUBLIC_LADDER_DEPTH
+
+DEFAULT_USERS = {"full_scan": 2, "top": 5, "search": 5, "race": 10}
+SCAN_RETRIES = 3 # Per chunk, on 429, like the web client
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_proxy(upstream_url, workers):
+    port = free_port()
+    env = dict(os.environ,
+               GGG_WEB_BASE_URL=upstream_url,
+               GGG_API_BASE_URL=upstream_url,
+               GGG_CLIENT_ID="simulator",
+               GGG_CLIENT_SECRET="simulator",
+               WEB_CONCURRENCY=str(workers),
+               RATE_LIMIT_STATE_FILE=os.environ.get("RATE_LIMIT_STATE_FILE",
+                                                    os.path.join(tempfile.mkdtemp(), "ratelimit.json")))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "proxy_server:app"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            requests.get(f"{base_url}/cache-stats", timeout=1)
+            return process, base_url
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Proxy did not start in time.")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class LoadRecorder:
+    """Collects the latency and status of every request and scenario run, from all user threads."""
+    def __init__(self):
+        self.requests = defaultdict(list) # route -> [(seconds, status)]
+        self.operations = defaultdict(list) # scenario -> [(seconds, succeeded)]
+        self._lock = threading.Lock()
+
+    def request(self, route, seconds, status):
+        with self._lock:
+            self.requests[route].append((seconds, status))
+
+    def operation(self, scenario, seconds, succeeded):
+        with self._lock:
+            self.operations[scenario].append((seconds, succeeded))
+
+    def summary(self, elapsed):
+        def describe(samples):
+            latencies = sorted(seconds for seconds, _ in samples)
+            return {
+                "count": len(samples),
+                "per_s": round(len(samples) / elapsed, 2),
+                "p50_ms": round(percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 1) if latencies else None
+            }
+        with self._lock:
+            routes = {}
+            for route, samples in sorted(self.requests.items()):
+                statuses = defaultdict(int)
+                for _, status in samples:
+                    statuses[str(status)] += 1
+                routes[route] = dict(describe(samples), statuses=dict(statuses))
+            scenarios = {scenario: dict(describe(samples), failed=sum(1 for _, ok in samples if not ok))
+                         for scenario, samples in sorted(self.operations.items())}
+            total = sum(len(samples) for samples in self.requests.values())
+        return {"requests": total, "requests_per_s": round(total / elapsed, 1), "routes": routes, "scenarios": scenarios}
+
+
+class VirtualUser(threading.Thread):
+    """One simulated client running a scenario until the stop event is set."""
+    def __init__(self, scenario, base_url, league, names, recorder, stop_event, args, seed):
+        super().__init__(name=f"{scenario}-{seed}", daemon=True)
+        self.scenario = scenario
+        self.base_url = base_url
+        self.league = league
+        self.names = names
+        self.recorder = recorder
+        self.stop_event = stop_event
+        self.args = args
+        self.rng = random.Random(seed)
+        self.session = requests.Session()
+
+    def get(self, route, path, **params):
+        started = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=60)
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            response, status = None, "error"
+        self.recorder.request(route, time.perf_counter() - started, status)
+        return response
+
+    def ladder_chunk(self, offset):
+        """One /public-ladder chunk, waiting out 429s like the clients do. Returns entries or None."""
+        for _ in range(SCAN_RETRIES + 1):
+            response = self.get("/public-ladder", f"/public-ladder/{self.league}", limit=CHUNK_SIZE, offset=offset)
+            if response is None:
+                return None
+            if response.status_code != 429:
+                return response.json().get('entries') if response.ok else None
+            retry_after = int(response.headers.get('Retry-After') or 5)
+            if self.stop_event.wait(min(retry_after, 30)):
+                return None
+        return None
+
+    def scan(self, target_name=None):
+        """Scans chunks from the top, stopping at target_name if given. Returns True on success."""
+        for offset in range(0, PUBLIC_LADDER_DEPTH, CHUNK_SIZE):
+            if self.stop_event.is_set():
+                return False
+            entries = self.ladder_chunk(offset)
+            if entries is None:
+                return False
+            if target_name and any(e['character']['name'] == target_name for e in entries):
+                return True
+            if len(entries) < CHUNK_SIZE:
+                return target_name is None
+        return target_name is None
+
+    def full_scan(self):
+        return self.scan()
+
+    def top(self):
+        ascendancy = self.rng.choice(["", "Necromancer", "Slayer", "Deadeye", "Witch"])
+        params = {"limit": 10}
+        if ascendancy:
+            params["ascendancy"] = ascendancy
+        response = self.get("/top", f"/top/{self.league}", **params)
+        return response is not None and response.status_code in (200, 202)
+
+    def search(self, name=None):
+        name = name or self.rng.choice(self.names)
+        response = self.get("/character", f"/character/{self.league}/{name}", neighbors=5)
+        if response is not None and response.status_code == 200:
+            return True
+        return self.scan(name) # Snapshot not ready (or crawler disabled): scan like the desktop app
+
+    def race(self):
+        return self.scan(self.race_target)
+
+    def run(self):
+        self.race_target = self.rng.choice(self.names)
+        # Spread the users out so they do not all start in the same instant.
+        if self.stop_event.wait(self.rng.uniform(0, self.args.ramp_up)):
+            return
+        while not self.stop_event.is_set():
+            started = time.perf_counter()
+            succeeded = getattr(self, self.scenario)()
+            elapsed = time.perf_counter() - started
+            if not self.stop_event.is_set():
+                self.recorder.operation(self.scenario, elapsed, succeeded)
+            pause = self.args.race_interval - elapsed if self.scenario == "race" else self.rng.expovariate(1 / self.args.think_time)
+            self.stop_event.wait(max(0.0, pause))
+
+
+def parse_users(values):
+    users = dict(DEFAULT_USERS) if not values else {}
+    for value in values or []:
+        scenario, _, count = value.partition("=")
+        if scenario not in DEFAULT_USERS or not count.isdigit():
+            raise argparse.ArgumentTypeError(f"Invalid --users entry '{value}'; expected one of {', '.join(DEFAULT_USERS)}=N.")
+        users[scenario] = int(count)
+    return users
+
+
+def upstream_stats(simulator, simulator_url):
+    if simulator is not None:
+        return simulator.stats()
+    if simulator_url:
+        try:
+            return requests.get(f"{simulator_url}/_stats", timeout=5).json()
+        except requests.exceptions.RequestException:
+            return None
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=120, help="Seconds to run the load for.")
+    parser.add_argument("--users", nargs="+", metavar="SCENARIO=N", help="Virtual users per scenario.")
+    parser.add_argument("--race-interval", type=float, default=60, help="Seconds between race-mode refreshes.")
+    parser.add_argument("--think-time", type=float, default=5, help="Mean pause between other users' actions.")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Users start at random times within this many seconds.")
+    parser.add_argument("--league", default="Standard")
+    parser.add_argument("--workers", type=int, default=1, help="Gunicorn worker processes for the started proxy.")
+    parser.add_argument("--proxy-url", help="Load this running proxy instead of starting one.")
+    parser.add_argument("--simulator-url", help="With --proxy-url: the simulator it uses, for upstream call counts.")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    add_simulator_arguments(parser)
+    args = parser.parse_args()
+    users = parse_users(args.users)
+
+    simulator = process = None
+    if args.proxy_url:
+        base_url = args.proxy_url.rstrip("/")
+        first_chunk = requests.get(f"{base_url}/public-ladder/{args.league}", params={"limit": CHUNK_SIZE}, timeout=60).json()
+        names = [e['character']['name'] for e in first_chunk.get('entries', [])]
+        if not names:
+            sys.exit(f"Could not read the ladder of '{args.league}' through {base_url}: {first_chunk}")
+    else:
+        simulator = simulator_from_arguments(args).start()
+        if args.league not in simulator.leagues:
+            sys.exit(f"League '{args.league}' is not one of the simulated leagues ({args.leagues}).")
+        names = [e['character']['name'] for e in simulator.leagues[args.league].entries[:PUBLIC_LADDER_DEPTH]]
+        process, base_url = start_proxy(simulator.url, args.workers)
+
+    recorder = LoadRecorder()
+    stop_event = threading.Event()
+    threads = [VirtualUser(scenario, base_url, args.league, names, recorder, stop_event, args, seed=i)
+               for i, (scenario, count) in enumerate((s, c) for s, c in users.items() for _ in range(c))]
+    print(f"Running {len(threads)} users against {base_url} for {args.duration:.0f}s...", file=sys.stderr)
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        stop_event.wait(args.duration)
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=65)
+        elapsed = time.perf_counter() - started
+
+        results = {
+            "duration_s": round(elapsed, 1),
+            "users": users,
+            "client": recorder.summary(elapsed),
+            "upstream": upstream_stats(simulator, args.simulator_url)
+        }
+        try:
+            results["proxy_cache"] = requests.get(f"{base_url}/cache-stats", timeout=5).json()
+        except (requests.exceptions.RequestException, ValueError):
+            results["proxy_cache"] = None
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if simulator is not None:
+            simulator.stop()
+
+    client = results["client"]
+    print(f"{client['requests']} requests in {results['duration_s']}s ({client['requests_per_s']} req/s)")
+    print(f"{'route':<16} {'count':>7} {'req/s':>8} {'p50':>10} {'p99':>10}  statuses")
+    for route, stats in client["routes"].items():
+        print(f"{route:<16} {stats['count']:>7} {stats['per_s']:>8} {stats['p50_ms']:>7} ms {stats['p99_ms']:>7} ms  {stats['statuses']}")
+    print(f"{'scenario':<16} {'count':>7} {'per s':>8} {'p50':>10} {'p99':>10}  failed")
+    for scenario, stats in client["scenarios"].items():
+        print(f"{scenario:<16} {stats['count']:>7} {stats['per_s']:>8} {stats['p50_ms']:>7} ms {stats['p99_ms']:>7} ms  {stats['failed']}")
+    upstream = results["upstream"]
+    if upstream:
+        print(f"Upstream calls: {upstream['total']} ({upstream['rate_limited']} rate limited)")
+        for endpoint, stats in upstream["endpoints"].items():
+            print(f"  {endpoint:<14} {stats['total']:>7}  {stats['statuses']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
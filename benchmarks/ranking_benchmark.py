@@ -0,0 +1,73 @@
+"""
+Compares the pure-Python and NumPy engines of data_processor.rank_ladder
+(global, ascendancy and base-class ranks, level progress and active flags for
+a whole ladder) and checks that both return the same values.
+
+Requires NumPy.
+
+Usage:
+    python benchmarks/ranking_benchmark.py --rows 15000 100000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import data_processor
+from benchmarks.synthetic import synthetic_ladder
+from data_processor import rank_ladder
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(rows, repeat):
+    ladder = synthetic_ladder(rows)
+    python_result = rank_ladder(ladder, use_numpy=False)
+    numpy_result = rank_ladder(ladder, use_numpy=True)
+    for column, values in python_result.items():
+        if list(values) != numpy_result[column].tolist():
+            raise AssertionError(f"Engines disagree on '{column}' for {rows} rows")
+
+    python_seconds = best_time(lambda: rank_ladder(ladder, use_numpy=False), repeat)
+    numpy_seconds = best_time(lambda: rank_ladder(ladder, use_numpy=True), repeat)
+    return {
+        "rows": rows,
+        "python_ms": round(python_seconds * 1000, 2),
+        "numpy_ms": round(numpy_seconds * 1000, 2),
+        "speedup": round(python_seconds / numpy_seconds, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[15000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per engine; the best time is reported")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if data_processor.numpy is None:
+        sys.exit("NumPy is not installed; run `pip install numpy` first.")
+
+    results = [measure(rows, args.repeat) for rows in args.rows]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'rows':>8} {'python':>11} {'numpy':>11} {'speedup':>8}")
+    for r in results:
+        print(f"{r['rows']:>8} {r['python_ms']:>8.1f} ms {r['numpy_ms']:>8.1f} ms {r['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
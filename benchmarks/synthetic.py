@@ -0,0 +1,85 @@
+"""
+Deterministic synthetic ladders for the benchmarks.
+
+The same rows, seed and options always give the same ladder, so results from
+different commits measure the same data. Rows follow the API's entry layout
+and are in ladder order: experience never increases down the ladder, and each
+level is derived from the experience, so the data is always consistent.
+"""
+import bisect
+import math
+import random
+
+from compact_ladder import CompactLadder
+from data_processor import BASE_CLASSES, STANDARD_ASCENDANCIES, TEMPORARY_ASCENDANCIES, XP_THRESHOLDS
+
+SIZES = (1_000, 15_000, 100_000, 1_000_000)
+CHUNK_SIZE = 200
+
+MAX_EXPERIENCE = XP_THRESHOLDS[-1]
+
+
+def class_weights(rng, include_event=False):
+    """
+    A popularity weight for every class. A few ascendancies dominate, as on a
+    real ladder, and unascended base classes are rare. Temporary ascendancies
+    only appear when include_event is set.
+    """
+    ascendancies = list(STANDARD_ASCENDANCIES) + (list(TEMPORARY_ASCENDANCIES) if include_event else [])
+    rng.shuffle(ascendancies)
+    weights = {name: 1.0 / (position + 2) for position, name in enumerate(ascendancies)}
+    for base_class in BASE_CLASSES:
+        weights[base_class] = 0.005
+    return weights
+
+
+def synthetic_entries(rows, seed=0, dead_rate=0.03, retired_rate=0.01, include_event=False):
+    """Yields `rows` ladder entries in ladder order."""
+    rng = random.Random(seed)
+    weights = class_weights(rng, include_event)
+    classes = list(weights)
+    cumulative = []
+    total = 0.0
+    for name in classes:
+        total += weights[name]
+        cumulative.append(total)
+
+    experience = MAX_EXPERIENCE
+    for i in range(rows):
+        # Experience falls quickly at the very top and flattens out further down,
+        # leaving rank 15,000 around level 91 and rank 1,000,000 around level 84.
+        target = int(MAX_EXPERIENCE * (1 - 0.12 * math.log10(i + 1)) * (0.995 + 0.005 * rng.random()))
+        experience = max(0, min(experience, target))
+        level = min(100, bisect.bisect_right(XP_THRESHOLDS, experience))
+        char_class = classes[bisect.bisect_left(cumulative, rng.random() * total)]
+        yield {
+            "rank": i + 1,
+            "dead": rng.random() < dead_rate,
+            "retired": rng.random() < retired_rate,
+            "public": True,
+            "character": {
+                "id": "%064x" % rng.getrandbits(256),
+                "name": f"Exile_{i}_{rng.randrange(36 ** 4):x}",
+                "level": level,
+                "class": char_class,
+                "experience": experience
+            },
+            "account": {"name": f"Account_{rng.randrange(10 ** 6)}#{rng.randrange(10 ** 4):04d}"}
+        }
+
+
+def synthetic_ladder(rows, **options):
+    """The same ladder as synthetic_entries, held in a CompactLadder."""
+    return CompactLadder(synthetic_entries(rows, **options))
+
+
+def synthetic_chunks(rows, chunk_size=CHUNK_SIZE, **options):
+    """Yields the ladder as lists of raw entries, the way the API pages it."""
+    chunk = []
+    for entry in synthetic_entries(rows, **options):
+        chunk.append(entry)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
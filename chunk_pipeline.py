@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from fetch_trace import fetch_trace
+
+# Entries per ladder request, the most the GGG API returns at once.
+CHUNK_SIZE = 200
+
+# Chunk requests kept in flight at most, and at the start of every scan. The shared
+# request budget still spaces requests out; the window only overlaps their latency.
+MAX_WINDOW = 4
+INITIAL_WINDOW = 2
+
+# How often (in seconds) a caller waiting for its next chunk checks the stop event.
+STOP_POLL_INTERVAL = 0.1
+
+
+class ChunkPipeline:
+    """
+    Fetches consecutive ladder chunks with several requests in flight and hands
+    them to the caller in offset order, as (offset, data) pairs, so processing
+    one chunk overlaps with fetching the next ones.
+
+    The number of requests in flight adapts to rate-limit feedback: it halves
+    whenever the request budget is paused after a 429 from the proxy, and grows
+    back by one after a window's worth of chunks arrive without one.
+
+    Iteration ends after a chunk with an error or fewer than `chunk_size`
+    entries, at `end`, or as soon as `stop_event` is set. Leaving the loop early
+    (or closing the pipeline) cancels the requests not sent yet, including those
+    waiting for the request budget; responses to those already in flight are
+    discarded. A pipeline is iterated only once.
+    """
+    def __init__(self, fetch_chunk, start=0, end=None, chunk_size=CHUNK_SIZE, stop_event=None, budget=None, max_window=MAX_WINDOW):
+        self.fetch_chunk = fetch_chunk # fetch_chunk(offset, limit, cancelled) -> ladder response dict
+        self.start = start
+        self.end = end # None scans until the ladder runs out
+        self.chunk_size = chunk_size
+        self.stop_event = stop_event
+        self.budget = budget
+        self.max_window = max_window
+        self.window = min(INITIAL_WINDOW, max_window)
+        self._closed = threading.Event()
+        self._executor = None
+        self._pending = {} # offset -> Future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _stopped(self):
+        return self._closed.is_set() or (self.stop_event is not None and self.stop_event.is_set())
+
+    def _before_end(self, offset):
+        return self.end is None or offset < self.end
+
+    def _penalties(self):
+        return self.budget.penalties if self.budget is not None else 0
+
+    def _fetch(self, offset):
+        # Requests still queued when the caller stops are not sent at all.
+        if self._stopped():
+            return None
+        return self.fetch_chunk(offset, self.chunk_size, self._stopped)
+
+    def __iter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_window, thread_name_prefix="ladder-chunk")
+        # Requests made by the workers count toward the caller's traced operation.
+        fetch = fetch_trace.carried(self._fetch)
+        next_offset = submit_offset = self.start
+        penalties = self._penalties()
+        clean_chunks = 0
+        try:
+            while not self._stopped() and self._before_end(next_offset):
+                while len(self._pending) < self.window and self._before_end(submit_offset):
+                    self._pending[submit_offset] = self._executor.submit(fetch, submit_offset)
+                    submit_offset += self.chunk_size
+
+                future = self._pending[next_offset]
+                with fetch_trace.phase("chunk_wait"):
+                    while not self._stopped() and not wait([future], timeout=STOP_POLL_INTERVAL).done:
+                        pass
+                if self._stopped():
+                    return
+                del self._pending[next_offset]
+                data = future.result()
+                if data is None:
+                    return
+
+                current_penalties = self._penalties()
+                if current_penalties > penalties:
+                    self.window = max(1, self.window // 2)
+                    clean_chunks = 0
+                else:
+                    clean_chunks += 1
+                    if clean_chunks >= self.window and self.window < self.max_window:
+                        self.window += 1
+                        clean_chunks = 0
+                penalties = current_penalties
+
+                yield next_offset, data
+
+                entries = data.get('entries') if isinstance(data, dict) else None
+                if not entries or data.get('error') or len(entries) < self.chunk_size:
+                    return
+                next_offset += self.chunk_size
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops the pipeline, cancelling requests that have not been sent."""
+        self._closed.set()
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,99 @@
+from array import array
+
+# Bits of CompactLadder.flags
+DEAD = 1
+RETIRED = 2
+PUBLIC = 4
+
+
+class CompactLadder:
+    """
+    A column-oriented store for ladder rows.
+
+    Instead of one nested dict per row (plus a dict for the character and one
+    for the account), every field lives in its own column: ranks, levels and
+    experience in typed arrays, classes as small integer codes into a shared
+    table, and the state flags packed into one byte. Only the fields the
+    clients use are kept.
+
+    It behaves like a read-only list of ladder entries: len(), indexing,
+    slicing and iteration return ordinary entry dicts built on demand, so code
+    written against the raw API response works unchanged.
+    """
+    def __init__(self, entries=()):
+        self.ranks = array('I')
+        self.ascendancy_ranks = array('I') # 0 when not stamped
+        self.levels = array('B')
+        self.experience = array('Q')
+        self.class_codes = array('B')
+        self.flags = array('B')
+        self.names = []
+        self.accounts = []
+        self.class_names = [] # code -> class name
+        self._class_codes = {} # class name -> code
+        self.extend(entries)
+
+    def class_code(self, class_name):
+        """Returns the code of a class, adding it to the class table if it is new."""
+        code = self._class_codes.get(class_name)
+        if code is None:
+            code = len(self.class_names)
+            self._class_codes[class_name] = code
+            self.class_names.append(class_name)
+        return code
+
+    def extend(self, entries):
+        """Appends raw ladder entries (as returned by the API) in ladder order."""
+        for entry in entries:
+            char_data = entry['character']
+            self.ranks.append(entry.get('rank') or len(self.ranks) + 1)
+            self.ascendancy_ranks.append(entry.get('ascendancy_rank') or 0)
+            self.levels.append(char_data['level'])
+            self.experience.append(char_data.get('experience') or 0)
+            self.class_codes.append(self.class_code(char_data['class']))
+            self.flags.append((DEAD if entry.get('dead') else 0)
+                              | (RETIRED if entry.get('retired') else 0)
+                              | (PUBLIC if entry.get('public') else 0))
+            self.names.append(char_data['name'])
+            self.accounts.append((entry.get('account') or {}).get('name'))
+        return self
+
+    def class_name(self, position):
+        return self.class_names[self.class_codes[position]]
+
+    def entry(self, position):
+        """Builds the entry dict for one row, in the API's layout."""
+        flags = self.flags[position]
+        entry = {
+            'rank': self.ranks[position],
+            'dead': bool(flags & DEAD),
+            'retired': bool(flags & RETIRED),
+            'public': bool(flags & PUBLIC),
+            'character': {
+                'name': self.names[position],
+                'level': self.levels[position],
+                'class': self.class_names[self.class_codes[position]],
+                'experience': self.experience[position]
+            }
+        }
+        if self.ascendancy_ranks[position]:
+            entry['ascendancy_rank'] = self.ascendancy_ranks[position]
+        if self.accounts[position] is not None:
+            entry['account'] = {'name': self.accounts[position]}
+        return entry
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.entry(p) for p in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ladder position out of range")
+        return self.entry(index)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.entry(position)
@@ -1,3 +1,13 @@
+import bisect
+from array import array
+
+from compact_ladder import CompactLadder, DEAD, RETIRED
+
+try:
+    import numpy # Optional; enables the vectorized ranking engine
+except ImportError:
+    numpy = None
+
 STANDARD_ASCENDANCIES = [
     "Ascendant", "Assassin", "Berserker", "Champion", "Chieftain", "Deadeye",
     "Elementalist", "Gladiator", "Guardian", "Hierophant", "Inquisitor",
@@ -33,7 +43,192 @@ CLASS_TO_BASE = {
     "Blind Prophet": "Templar", "Wildspeaker": "Ranger", "Whisperer": "Witch", 
     "Architect of Chaos": "Shadow"
 }
- 
+
+# Cumulative XP required to reach each level (Index 0 = Level 1, Index 99 = Level 100)
+XP_THRESHOLDS = [
+    0, 525, 1760, 3781, 7184, 12186, 19324, 29377, 43181, 61693, 
+    85990, 117506, 157384, 207736, 269997, 346462, 439268, 551295, 685171, 843709, 
+    1030734, 1249629, 1504995, 1800847, 2142652, 2535122, 2984677, 3496798, 4080655, 4742836, 
+    5490247, 6334393, 7283446, 8348398, 9541110, 10874351, 12361842, 14018289, 15859432, 17905634, 
+    20171471, 22679999, 25456123, 28517857, 31897771, 35621447, 39721017, 44225461, 49176560, 54607467, 
+    60565335, 67094245, 74247659, 82075627, 90631041, 99984974, 110197515, 121340161, 133497202, 146749362, 
+    161191120, 176922628, 194049893, 212684946, 232956711, 255001620, 278952403, 304972236, 333233648, 363906163, 
+    397194041, 433312945, 472476370, 514937180, 560961898, 610815862, 664824416, 723298169, 786612664, 855129128, 
+    929261318, 1009443795, 1096169525, 1189918242, 1291270350, 1400795257, 1519130326, 1646943474, 1784977296, 1934009687, 
+    2094900291, 2268549086, 2455921256, 2658074992, 2876116901, 3111280300, 3364828162, 3638186694, 3932818530, 4250334444
+]
+
+def build_character_info(entry, group, asc_rank=0):
+    """Flattens a raw ladder entry into the row format used by both result views."""
+    char_data = entry['character']
+    return {
+        'ascendancy': char_data['class'], # Keep the specific name for display
+        'group': group,
+        'level': char_data['level'],
+        'xp': char_data['experience'],
+        'name': char_data['name'],
+        'global_rank': entry['rank'],
+        'asc_rank': asc_rank,
+        'account_name': (entry.get('account') or {}).get('name'),
+        'dead': entry.get('dead', False),
+        'retired': entry.get('retired', False)
+    }
+
+def level_progress(level, experience):
+    """Fraction (0.0 - 1.0) of the way from the character's current level to the next."""
+    if level >= 100:
+        return 1.0
+    if experience <= 0:
+        return 0.0
+    idx = bisect.bisect_right(XP_THRESHOLDS, experience) - 1
+    if idx >= len(XP_THRESHOLDS) - 1:
+        return 1.0
+    start_xp = XP_THRESHOLDS[idx]
+    end_xp = XP_THRESHOLDS[idx + 1]
+    return (experience - start_xp) / (end_xp - start_xp)
+
+class LadderAggregator:
+    """
+    Builds the top-N view of a ladder incrementally, one chunk at a time.
+
+    For every class it keeps the best `limit` characters by level, and for every
+    base class the best `limit` by global rank, together with how many characters
+    of each have been seen. Adding a chunk costs O(chunk) regardless of how much
+    of the ladder was already scanned, and results() matches process_ladder_data
+    over the same entries for any limit up to the aggregator's own.
+    """
+    def __init__(self, limit=5):
+        self.limit = max(limit, 0)
+        self.class_counts = {}
+        self.base_counts = {}
+        self._seen = 0
+        # group -> sorted list of (sort key, arrival order, entry), at most `limit` long
+        self._class_top = {}
+        self._base_top = {}
+
+    def _offer(self, tops, group, key, entry):
+        top = tops.setdefault(group, [])
+        if top and len(top) >= self.limit and (key, self._seen) >= top[-1][:2]:
+            return # Cannot make the cut; the common case deep into the ladder.
+        bisect.insort(top, (key, self._seen, entry))
+        if len(top) > self.limit:
+            top.pop()
+
+    def add(self, entries):
+        """Adds the next chunk of ladder entries, in ladder order."""
+        for entry in entries:
+            char_class = entry['character']['class']
+            self.class_counts[char_class] = self.class_counts.get(char_class, 0) + 1
+            self._offer(self._class_top, char_class, -entry['character']['level'], entry)
+            base_class = CLASS_TO_BASE.get(char_class)
+            if base_class:
+                self.base_counts[base_class] = self.base_counts.get(base_class, 0) + 1
+                self._offer(self._base_top, base_class, entry['rank'], entry)
+            self._seen += 1
+        return self
+
+    def count(self, group):
+        """Characters seen so far in an ascendancy, or in all of a base class's ascendancies."""
+        if group in BASE_CLASSES:
+            return self.base_counts.get(group, 0)
+        return self.class_counts.get(group, 0)
+
+    def is_satisfied(self, groups, limit=None):
+        """True once every one of `groups` has at least `limit` characters."""
+        limit = self.limit if limit is None else limit
+        return all(self.count(group) >= limit for group in groups)
+
+    def results(self, selected_ascendancy=None, limit=None):
+        """The current top-N list, in the same format and order as process_ladder_data."""
+        limit = self.limit if limit is None else min(limit, self.limit)
+        if selected_ascendancy in BASE_CLASSES:
+            top = self._base_top.get(selected_ascendancy, [])[:limit]
+            return [build_character_info(entry, selected_ascendancy, i + 1) for i, (_, _, entry) in enumerate(top)]
+
+        groups = [selected_ascendancy] if selected_ascendancy else ALL_ASCENDANCY_NAMES
+        results = []
+        for ascendancy in sorted(groups):
+            top = self._class_top.get(ascendancy, [])[:limit]
+            results.extend(build_character_info(entry, ascendancy, i + 1) for i, (_, _, entry) in enumerate(top))
+        return results
+
+class ClassCountIndex:
+    """
+    How many characters of each class every ladder chunk holds, with cumulative
+    counts per chunk offset cached on top, so the ascendancy rank of a character
+    at any offset can be stamped from the chunks around it instead of by
+    re-counting the ladder from the top.
+
+    Chunks are recorded whenever they are fetched and may be refreshed in any
+    order; updating a chunk only invalidates the cumulative counts after it.
+    Counts for chunks that were not fetched recently may be stale, so the
+    ascendancy ranks stamped from them are a close estimate rather than exact.
+    """
+    def __init__(self, chunk_size=200):
+        self.chunk_size = chunk_size
+        self.refresh_cursor = 0 # Next chunk offset to re-fetch when refreshing lazily
+        self._chunks = {} # offset -> {class: count}
+        self._cumulative = {0: {}} # offset -> {class: count} over all chunks before it
+
+    def __contains__(self, offset):
+        return offset in self._chunks
+
+    def update(self, offset, entries):
+        counts = {}
+        for entry in entries:
+            asc = entry['character']['class']
+            counts[asc] = counts.get(asc, 0) + 1
+        self._chunks[offset] = counts
+        for cached in [o for o in self._cumulative if o > offset]:
+            del self._cumulative[cached]
+
+    def first_missing(self, end):
+        """Returns the first chunk offset before `end` that has no counts yet, or None."""
+        for offset in range(0, end, self.chunk_size):
+            if offset not in self._chunks:
+                return offset
+        return None
+
+    def missing(self, end):
+        """Returns every chunk offset before `end` that has no counts yet."""
+        return [offset for offset in range(0, end, self.chunk_size) if offset not in self._chunks]
+
+    def counts_before(self, offset):
+        """Returns {class: count} over every chunk before `offset`, which must all be known."""
+        start = max(o for o in self._cumulative if o <= offset)
+        counts = self._cumulative[start]
+        for chunk_offset in range(start, offset, self.chunk_size):
+            counts = dict(counts)
+            for asc, count in self._chunks[chunk_offset].items():
+                counts[asc] = counts.get(asc, 0) + count
+            self._cumulative[chunk_offset + self.chunk_size] = counts
+        return counts
+
+    def stamp(self, offset, entries, ladder=None):
+        """
+        Stamps 'rank' and 'ascendancy_rank' on the entries of the chunk at `offset`.
+        `ladder` is the same rows as a CompactLadder, if the caller already has one.
+        """
+        counts = self.counts_before(offset)
+        ranks = rank_ladder(entries if ladder is None else ladder)
+        for i, (entry, ascendancy_rank) in enumerate(zip(entries, _as_list(ranks["ascendancy_rank"]))):
+            entry['rank'] = offset + i + 1
+            entry['ascendancy_rank'] = counts.get(entry['character']['class'], 0) + ascendancy_rank
+
+    def stale_chunks(self, end, count, skip=()):
+        """
+        Picks up to `count` known chunk offsets before `end` to re-fetch, continuing
+        from where the previous call stopped and wrapping around to the top.
+        """
+        known = [o for o in range(0, end, self.chunk_size) if o in self._chunks and o not in skip]
+        if not known:
+            return []
+        position = next((i for i, o in enumerate(known) if o >= self.refresh_cursor), 0)
+        picked = [known[(position + i) % len(known)] for i in range(min(count, len(known)))]
+        self.refresh_cursor = picked[-1] + self.chunk_size
+        return picked
+
+
 def process_ladder_data(all_fetched_entries, selected_ascendancy=None, limit=5):
     """
     Filters the top characters for each Ascendancy from the raw ladder data,
@@ -41,74 +236,116 @@ def process_ladder_data(all_fetched_entries, selected_ascendancy=None, limit=5):
     If a selected_ascendancy is provided, it only returns data for that one.
     The number of characters per ascendancy is controlled by the limit parameter.
     """
-    
-    # Determine if we are filtering by a base class (Class Ranking) or a specific ascendancy
-    is_base_filter = selected_ascendancy in BASE_CLASSES
-    
-    if is_base_filter:
-        # Aggregate all matching subclasses into one group named after the base class
-        ascendancy_groups = {selected_ascendancy: []}
-    else:
-        # Standard behavior: separate groups for every individual class/ascendancy
-        ascendancies_to_process = [selected_ascendancy] if selected_ascendancy else ALL_ASCENDANCY_NAMES
-        ascendancy_groups = {asc: [] for asc in ascendancies_to_process}
-    
-    # 1. Core Grouping Logic
-    for index, entry in enumerate(all_fetched_entries):
-        char_data = entry['character']
-        actual_class = char_data['class']
-        
-        if is_base_filter:
-            # Check if this character's parent matches the selected base class
-            if CLASS_TO_BASE.get(actual_class) == selected_ascendancy:
-                target_group = selected_ascendancy
-            else:
-                continue
+    return LadderAggregator(limit).add(all_fetched_entries).results(selected_ascendancy)
+
+def rank_ladder(entries, use_numpy=None):
+    """
+    Computes, for a whole ladder in ladder order, each row's global rank, rank
+    within its class ('ascendancy_rank'), rank within its base class
+    ('base_class_rank', 0 for classes without one), level progress and whether
+    it is still active (neither dead nor retired).
+
+    `entries` is a CompactLadder or a list of raw entries. The NumPy engine is
+    used when NumPy is installed, unless use_numpy says otherwise; both return
+    the same values, as lists or NumPy arrays respectively.
+    """
+    ladder = entries if isinstance(entries, CompactLadder) else CompactLadder(entries)
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy:
+        return _rank_ladder_numpy(ladder)
+    return _rank_ladder_python(ladder)
+
+def stamp_ladder_ranks(ladder, use_numpy=None):
+    """
+    Sets the rank of every row of a CompactLadder to its position and the
+    ascendancy rank to its position among the rows of the same class, in
+    ladder order, with rank_ladder's engine.
+    """
+    ranks = rank_ladder(ladder, use_numpy)
+    ladder.ranks = _uint_column(ranks["rank"])
+    ladder.ascendancy_ranks = _uint_column(ranks["ascendancy_rank"])
+    return ladder
+
+def _as_list(values):
+    """A rank_ladder column as a list of plain ints."""
+    return values if isinstance(values, list) else values.tolist()
+
+def _uint_column(values):
+    """A rank_ladder column as a CompactLadder column of unsigned ints."""
+    if isinstance(values, list):
+        return array('I', values)
+    return array('I', values.astype(numpy.uintc).tobytes())
+
+def _base_codes(ladder):
+    """Maps each class code of a ladder to a base class index, or -1."""
+    return [BASE_CLASSES.index(CLASS_TO_BASE[name]) if name in CLASS_TO_BASE else -1 for name in ladder.class_names]
+
+def _rank_ladder_python(ladder):
+    base_codes = _base_codes(ladder)
+    class_counts = [0] * len(ladder.class_names)
+    base_counts = [0] * len(BASE_CLASSES)
+    ascendancy_ranks = []
+    base_class_ranks = []
+    for code in ladder.class_codes:
+        class_counts[code] += 1
+        ascendancy_ranks.append(class_counts[code])
+        base_code = base_codes[code]
+        if base_code >= 0:
+            base_counts[base_code] += 1
+            base_class_ranks.append(base_counts[base_code])
         else:
-            if actual_class not in ascendancy_groups:
-                continue
-            target_group = actual_class
-        
-        character_info = {
-            'ascendancy': actual_class, # Keep the specific name for display
-            'group': target_group,
-            'level': char_data['level'],
-            'xp': char_data['experience'],
-            'name': char_data['name'],
-            'global_rank': entry['rank'],
-            'asc_rank': 0, # Temporarily set to 0, will be re-assigned after sorting
-            'dead': entry.get('dead', False),
-            'retired': entry.get('retired', False)
-        }
-        ascendancy_groups[target_group].append(character_info)
-
-    # 2. Final Consolidation and Sorting
-    final_ladder_list = []
-    for asc_list in ascendancy_groups.values():
-        final_ladder_list.extend(asc_list)
-        
-    # If base class ranking, sort by global rank. Otherwise, group by ascendancy name then level.
-    if is_base_filter: # For base classes, sort by global rank
-        final_ladder_list.sort(key=lambda x: x['global_rank'])
-    else:
-        final_ladder_list.sort(key=lambda x: (x['ascendancy'], -x['level']))
-
-    # Re-assign asc_rank after final sort and before applying the limit.
-    # This ensures asc_rank reflects the rank within the *final, sorted* list
-    # for the specific group (either individual ascendancy or aggregated base class).
-    if is_base_filter:
-        for i, char_info in enumerate(final_ladder_list):
-            char_info['asc_rank'] = i + 1
-    else: # For individual ascendancies, re-rank within their sorted groups
-        current_asc = None
-        rank_in_group = 0
-        for i, char_info in enumerate(final_ladder_list):
-            if char_info['ascendancy'] != current_asc:
-                current_asc = char_info['ascendancy']
-                rank_in_group = 1
-            else:
-                rank_in_group += 1
-            char_info['asc_rank'] = rank_in_group
-
-    # Return the top 'limit' characters for each individual group/ascendancy
-    return [c for c in final_ladder_list if c['asc_rank'] <= limit]
\ No newline at end of file
+            base_class_ranks.append(0)
+
+    return {
+        "rank": list(range(1, len(ladder) + 1)),
+        "ascendancy_rank": ascendancy_ranks,
+        "base_class_rank": base_class_ranks,
+        "progress": [level_progress(level, xp) for level, xp in zip(ladder.levels, ladder.experience)],
+        "active": [not flags & (DEAD | RETIRED) for flags in ladder.flags]
+    }
+
+def _group_ranks(codes):
+    """1-based position of every element among the elements with the same code, in order."""
+    if len(codes) == 0:
+        return numpy.zeros(0, dtype=numpy.int64)
+    order = numpy.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    # Index of the first element of each run of equal codes, repeated over the run.
+    run_starts = numpy.flatnonzero(numpy.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    run_lengths = numpy.diff(numpy.r_[run_starts, len(codes)])
+    ranks = numpy.empty(len(codes), dtype=numpy.int64)
+    ranks[order] = numpy.arange(len(codes)) - numpy.repeat(run_starts, run_lengths) + 1
+    return ranks
+
+def _rank_ladder_numpy(ladder):
+    n = len(ladder)
+    class_codes = numpy.frombuffer(ladder.class_codes, dtype=numpy.uint8)
+    levels = numpy.frombuffer(ladder.levels, dtype=numpy.uint8)
+    experience = numpy.frombuffer(ladder.experience, dtype=numpy.uint64).astype(numpy.int64)
+    flags = numpy.frombuffer(ladder.flags, dtype=numpy.uint8)
+
+    # Small integer codes let the stable argsort in _group_ranks use a radix sort.
+    base_codes = numpy.array(_base_codes(ladder) or [-1], dtype=numpy.int8)[class_codes]
+    base_class_ranks = numpy.zeros(n, dtype=numpy.int64)
+    has_base = base_codes >= 0
+    base_class_ranks[has_base] = _group_ranks(base_codes[has_base])
+
+    thresholds = numpy.array(XP_THRESHOLDS, dtype=numpy.int64)
+    idx = numpy.searchsorted(thresholds, experience, side='right') - 1
+    in_table = (idx >= 0) & (idx < len(thresholds) - 1)
+    start_xp = thresholds[numpy.clip(idx, 0, len(thresholds) - 1)]
+    end_xp = thresholds[numpy.clip(idx + 1, 0, len(thresholds) - 1)]
+    progress = numpy.zeros(n, dtype=numpy.float64)
+    progress[in_table] = (experience[in_table] - start_xp[in_table]) / (end_xp[in_table] - start_xp[in_table])
+    progress[idx >= len(thresholds) - 1] = 1.0
+    progress[experience <= 0] = 0
+    progress[levels >= 100] = 1.0
+
+    return {
+        "rank": numpy.arange(1, n + 1),
+        "ascendancy_rank": _group_ranks(class_codes),
+        "base_class_rank": base_class_ranks,
+        "progress": progress,
+        "active": (flags & (DEAD | RETIRED)) == 0
+    }
@@ -0,0 +1,181 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+# Optionally, the desktop app keeps league lists, top-N results and ladder chunks on
+# disk, so a restart or a switch back to an earlier view shows them at once. Off by
+# default; set to "1" to enable.
+DISK_CACHE_ENABLED = os.environ.get("LADDER_DISK_CACHE", "0") == "1"
+# Directory of the cache database. Defaults to the platform's per-user app data directory.
+DISK_CACHE_DIR = os.environ.get("LADDER_DISK_CACHE_DIR")
+# Upper bound on the size of the cached values (compressed), in megabytes. The least
+# recently used entries are evicted beyond it.
+DISK_CACHE_MAX_MB = int(os.environ.get("LADDER_DISK_CACHE_MAX_MB", 100))
+# Cached data older than this many seconds is not shown at all, not even while it is refetched.
+DISK_CACHE_MAX_AGE = int(os.environ.get("LADDER_DISK_CACHE_MAX_AGE", 86400))
+# The league list rarely changes, so a cached one younger than this many seconds is
+# used without asking the proxy. Ladder data is revalidated after MAX_REUSE_AGE.
+LEAGUES_FRESH_AGE = int(os.environ.get("LADDER_DISK_CACHE_LEAGUES_FRESH_AGE", 3600))
+
+# Eviction removes entries until the cache is this fraction of its limit, so it
+# does not run again on every write once the cache is full.
+EVICTION_LOW_WATER = 0.9
+
+
+def default_cache_dir():
+    """The per-user app data directory of the desktop app on this platform."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "PoELadderTracker")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Application Support"), "PoELadderTracker")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "poeladdertracker")
+
+
+class DiskCache:
+    """
+    A persistent key-value cache in one SQLite file. Values are JSON-compatible
+    objects, stored compressed with the time they were fetched, which callers
+    use to decide whether to show them as they are or fetch them again.
+
+    The total size is bounded: once the stored values exceed `max_bytes`, the
+    least recently read or written entries are evicted. One connection is shared
+    by all threads and guarded by a lock, so every method is thread-safe.
+    Database errors are printed and treated as cache misses; the cache never
+    stops the app from working.
+    """
+    def __init__(self, path, max_bytes=DISK_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                used_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at)")
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    def get(self, key, max_age=DISK_CACHE_MAX_AGE):
+        """Returns (fetched at, value) for `key`, or None if it is missing or older than `max_age` seconds."""
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value, fetched_at FROM cache WHERE key = ? AND fetched_at >= ?", (key, now - max_age)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE cache SET used_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"Disk Cache Error: Could not read '{key}': {e}")
+            return None
+        value = self._decode(key, row[0])
+        return None if value is None else (row[1], value)
+
+    def items(self, prefix, max_age=DISK_CACHE_MAX_AGE):
+        """Returns [(key, fetched at, value)] for the keys starting with `prefix`, oldest first."""
+        now = time.time()
+        # Keys are matched as a range rather than with LIKE, so '_' and '%' in league names need no escaping.
+        bounds = (prefix, prefix + "\uffff", now - max_age)
+        try:
+            with self._lock:
+                rows = self._conn.execute("SELECT key, fetched_at, value FROM cache WHERE key >= ? AND key < ? AND fetched_at >= ? ORDER BY fetched_at",
+                                          bounds).fetchall()
+                self._conn.execute("UPDATE cache SET used_at = ? WHERE key >= ? AND key < ? AND fetched_at >= ?", (now,) + bounds)
+        except sqlite3.Error as e:
+            print(f"Disk Cache Error: Could not read '{prefix}*': {e}")
+            return []
+        items = []
+        for key, fetched_at, blob in rows:
+            value = self._decode(key, blob)
+            if value is not None:
+                items.append((key, fetched_at, value))
+        return items
+
+    def _decode(self, key, blob):
+        """Returns the value stored in `blob`, or None after deleting the row if it is corrupt."""
+        try:
+            return json.loads(zlib.decompress(blob))
+        except (zlib.error, ValueError) as e:
+            print(f"Disk Cache Error: Dropping corrupt entry '{key}': {e}")
+            self.delete(key)
+            return None
+
+    def delete(self, key):
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._size -= row[0]
+        except sqlite3.Error as e:
+            print(f"Disk Cache Error: Could not delete '{key}': {e}")
+
+    def put(self, key, value, fetched_at=None):
+        """Stores `value` under `key`, fetched at `fetched_at` (default: now), evicting old entries if the cache is full."""
+        now = time.time()
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"), 1)
+        try:
+            with self._lock:
+                old = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+                self._conn.execute("INSERT OR REPLACE INTO cache (key, value, fetched_at, used_at, size) VALUES (?, ?, ?, ?, ?)",
+                                   (key, blob, fetched_at or now, now, len(blob)))
+                self._size += len(blob) - (old[0] if old else 0)
+                if self._size > self.max_bytes:
+                    self._evict()
+        except sqlite3.Error as e:
+            print(f"Disk Cache Error: Could not write '{key}': {e}")
+
+    def _evict(self):
+        """Deletes the least recently used entries until the cache is below its low-water mark."""
+        target = self.max_bytes * EVICTION_LOW_WATER
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY used_at"):
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", evicted)
+
+    def clear(self):
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache")
+                self._size = 0
+        except sqlite3.Error as e:
+            print(f"Disk Cache Error: Could not clear the cache: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_disk_cache = None
+_disk_cache_opened = False
+_disk_cache_lock = threading.Lock()
+
+
+def disk_cache():
+    """Returns the desktop app's DiskCache, opening it on first use, or None if it is disabled or cannot be opened."""
+    global _disk_cache, _disk_cache_opened
+    with _disk_cache_lock:
+        if not _disk_cache_opened:
+            _disk_cache_opened = True
+            if DISK_CACHE_ENABLED:
+                directory = DISK_CACHE_DIR or default_cache_dir()
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                    _disk_cache = DiskCache(os.path.join(directory, "cache.sqlite3"))
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Disk Cache Error: Could not open the cache in {directory}, continuing without it: {e}")
+        return _disk_cache
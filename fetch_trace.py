@@ -0,0 +1,167 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# Most recent phase timings kept for trace export.
+MAX_TRACE_EVENTS = 20000
+
+# Display order of the phases in summaries.
+PHASES = ("total", "chunk_wait", "rate_limit_wait", "request", "decode", "processing", "ui_delay", "widgets")
+
+_NULL_CONTEXT = nullcontext()
+
+
+class FetchTrace:
+    """
+    Per-phase timings of the desktop app's fetch pipeline: time waiting for the
+    next ladder chunk, waiting for the request budget, request latency, JSON
+    decoding, processing, the delay before Tk runs a scheduled UI update, and
+    the UI update itself.
+
+    Phases are attributed to the operation ("fetch", "search", "race_refresh")
+    running on the current thread. UI callbacks wrapped with deferred() keep the
+    operation of the thread that scheduled them.
+
+    Off by default. While disabled, phase() and operation() return a shared
+    no-op context manager and deferred() returns the callback unchanged, so
+    instrumented code pays for one attribute check.
+    """
+    def __init__(self, max_events=MAX_TRACE_EVENTS):
+        self.enabled = False
+        self._events = deque(maxlen=max_events) # (operation, phase, start, duration, thread id)
+        self._totals = {} # (operation, phase) -> [count, total seconds, max seconds]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def operation(self, name):
+        """Context manager marking the current thread as running `name`, and timing it as its 'total' phase."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed(name, "total")
+
+    def phase(self, name):
+        """Context manager timing one phase of the current thread's operation."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed(None, name)
+
+    def traced(self, operation):
+        """Decorator running a function as operation(...)."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.operation(operation):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def deferred(self, callback, phase="widgets"):
+        """
+        Wraps a callback that a worker thread hands to Tk's after(). The wait until
+        the main loop runs it is recorded as 'ui_delay', and the call itself as `phase`.
+        """
+        if not self.enabled:
+            return callback
+        operation = self.current_operation()
+        scheduled = time.perf_counter()
+
+        def run(*args, **kwargs):
+            started = time.perf_counter()
+            self.record("ui_delay", scheduled, started - scheduled, operation)
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                self.record(phase, started, time.perf_counter() - started, operation)
+        return run
+
+    def carried(self, func):
+        """Wraps a function handed to a worker thread, so the phases it records count toward the current operation."""
+        if not self.enabled:
+            return func
+        operation = self.current_operation()
+
+        def run(*args, **kwargs):
+            previous = self.current_operation()
+            self._local.operation = operation
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.operation = previous
+        return run
+
+    def current_operation(self):
+        return getattr(self._local, 'operation', None)
+
+    @contextmanager
+    def _timed(self, operation, phase):
+        previous = self.current_operation()
+        if operation:
+            self._local.operation = operation
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, started, time.perf_counter() - started, operation or previous)
+            self._local.operation = previous
+
+    def record(self, phase, started, duration, operation=None):
+        """Adds one timing. `started` is a time.perf_counter() value."""
+        operation = operation or self.current_operation() or "other"
+        with self._lock:
+            self._events.append((operation, phase, started, duration, threading.get_ident()))
+            totals = self._totals.get((operation, phase))
+            if totals is None:
+                totals = self._totals[(operation, phase)] = [0, 0.0, 0.0]
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] = max(totals[2], duration)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._totals = {}
+
+    def summary(self):
+        """Returns one dict per (operation, phase) with count, total, mean and max in milliseconds."""
+        with self._lock:
+            totals = {key: list(values) for key, values in self._totals.items()}
+        order = {phase: i for i, phase in enumerate(PHASES)}
+        rows = []
+        for (operation, phase), (count, total, longest) in sorted(totals.items(), key=lambda item: (item[0][0], order.get(item[0][1], len(order)), item[0][1])):
+            rows.append({
+                "operation": operation,
+                "phase": phase,
+                "count": count,
+                "total_ms": round(total * 1000, 2),
+                "mean_ms": round(total / count * 1000, 2),
+                "max_ms": round(longest * 1000, 2)
+            })
+        return rows
+
+    def export(self, path):
+        """
+        Writes the recorded timings as a Chrome trace event file (viewable in
+        chrome://tracing or https://ui.perfetto.dev), with the summary alongside.
+        """
+        with self._lock:
+            events = list(self._events)
+        trace_events = [{
+            "name": phase,
+            "cat": operation,
+            "ph": "X",
+            "ts": round((started - self._origin) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": thread_id
+        } for operation, phase, started, duration, thread_id in events]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms", "summary": self.summary()}, f)
+        return len(trace_events)
+
+
+fetch_trace = FetchTrace()
@@ -1,29 +1,25 @@
 import customtkinter
 import threading
 import time
-import bisect
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tkinter import filedialog
 # Use the new singleton API client
-from api import GGGAPIClient
-from data_processor import process_ladder_data, ALL_ASCENDANCY_NAMES, STANDARD_ASCENDANCIES, TEMPORARY_ASCENDANCIES, BASE_CLASSES, CLASS_TO_BASE
+from api import GGGAPIClient, PRIORITY_BULK, PRIORITY_SEARCH
+from fetch_trace import fetch_trace
+from disk_cache import LEAGUES_FRESH_AGE
+from ladder_store import MAX_REUSE_AGE, ladder_store
+from race_tracker import find_characters
+from results_table import ResultsTable
+from data_processor import LadderAggregator, level_progress, ALL_ASCENDANCY_NAMES, STANDARD_ASCENDANCIES, TEMPORARY_ASCENDANCIES, BASE_CLASSES
 
 CHUNK_SIZE = 200
 DROPDOWN_SEPARATOR = "──────────"
+# Leagues fetched at the same time in the league comparison window.
+MAX_LEAGUE_WORKERS = 4
+# How often the timing panel redraws its table, in milliseconds.
+TIMING_PANEL_REFRESH_MS = 1000
  
-# Cumulative XP required to reach each level (Index 0 = Level 1, Index 99 = Level 100)
-XP_THRESHOLDS = [
-    0, 525, 1760, 3781, 7184, 12186, 19324, 29377, 43181, 61693, 
-    85990, 117506, 157384, 207736, 269997, 346462, 439268, 551295, 685171, 843709, 
-    1030734, 1249629, 1504995, 1800847, 2142652, 2535122, 2984677, 3496798, 4080655, 4742836, 
-    5490247, 6334393, 7283446, 8348398, 9541110, 10874351, 12361842, 14018289, 15859432, 17905634, 
-    20171471, 22679999, 25456123, 28517857, 31897771, 35621447, 39721017, 44225461, 49176560, 54607467, 
-    60565335, 67094245, 74247659, 82075627, 90631041, 99984974, 110197515, 121340161, 133497202, 146749362, 
-    161191120, 176922628, 194049893, 212684946, 232956711, 255001620, 278952403, 304972236, 333233648, 363906163, 
-    397194041, 433312945, 472476370, 514937180, 560961898, 610815862, 664824416, 723298169, 786612664, 855129128, 
-    929261318, 1009443795, 1096169525, 1189918242, 1291270350, 1400795257, 1519130326, 1646943474, 1784977296, 1934009687, 
-    2094900291, 2268549086, 2455921256, 2658074992, 2876116901, 3111280300, 3364828162, 3638186694, 3932818530, 4250334444
-]
-
 class RaceModeWindow(customtkinter.CTkToplevel):
     def __init__(self, master, target_character_entry):
         super().__init__(master)
@@ -31,6 +27,7 @@ class RaceModeWindow(customtkinter.CTkToplevel):
         self.target_entry = target_character_entry
         self.auto_refresh_job = None
         self.xp_history = {}
+        self.store = None # LadderStore of the league being raced
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.title("Race Mode")
@@ -130,7 +127,7 @@ class RaceModeWindow(customtkinter.CTkToplevel):
 
         self.update_header_info()
         self.toggle_auto_refresh() # Set initial button state
-        self.refresh_data_thread() # Initial data load
+        self.show_stored_data() # Initial data load
 
     def toggle_view_mode(self, choice):
         if choice == "Ladders":
@@ -225,6 +222,22 @@ class RaceModeWindow(customtkinter.CTkToplevel):
             self.after_cancel(self.auto_refresh_job)
         self.destroy()
 
+    def show_stored_data(self):
+        """
+        Shows the character from what the main window's search just fetched, without
+        a request of its own, and leaves the next update to auto-refresh. Refreshes
+        right away if the store has nothing recent on the character.
+        """
+        league_id = self.master_app._get_league_id_from_name(self.master_app.get_selected_league())
+        self.store = ladder_store(league_id)
+        stored = self.store.around(self.target_entry['character']['name'])
+        if stored is None:
+            self.refresh_data_thread()
+            return
+        entry, surrounding_entries = stored
+        self.process_and_display_data(surrounding_entries, entry)
+        self.on_refresh_complete()
+
     def refresh_data_thread(self):
         if self.auto_refresh_job:
             self.after_cancel(self.auto_refresh_job)
@@ -233,80 +246,23 @@ class RaceModeWindow(customtkinter.CTkToplevel):
         thread = threading.Thread(target=self.refresh_data, daemon=True)
         thread.start()
 
+    @fetch_trace.traced("race_refresh")
     def refresh_data(self):
         selected_league_input = self.master_app.get_selected_league()
         deep_search = self.master_app.deep_search_check.get() == 1
         league_id = self.master_app._get_league_id_from_name(selected_league_input)
-        target_name = self.target_entry['character']['name'].lower()
+        target_name = self.target_entry['character']['name']
 
-        # Scan from the top to ensure accurate Ascendancy Rank
-        current_offset = 0
-        ascendancy_counts = {asc: 0 for asc in ALL_ASCENDANCY_NAMES}
-        found_entry = None
-        surrounding_entries = []
-        prev_chunk = []
-
-        while True:
-            if not self.winfo_exists(): return
-
-            data = GGGAPIClient.fetch_ladder(league_id, limit=CHUNK_SIZE, offset=current_offset, deep_search=deep_search)
-            
-            if not data or 'entries' not in data:
-                break
+        store = self.store = ladder_store(league_id)
+        found = find_characters(store, {target_name: self.target_entry.get('rank')}, deep_search, stopped=lambda: not self.winfo_exists())
+        if found is None: return # Window closed
 
-            entries = data['entries']
-            if not entries:
-                break
-
-            for i, entry in enumerate(entries):
-                char_data = entry['character']
-                asc = char_data['class']
-                
-                if asc in ascendancy_counts:
-                    ascendancy_counts[asc] += 1
-                
-                # Stamp ranks on every entry so neighbors have data
-                entry['ascendancy_rank'] = ascendancy_counts.get(asc)
-                entry['rank'] = current_offset + i + 1
-                
-                if char_data['name'].lower() == target_name:
-                    found_entry = entry
-                    
-                    # Construct context for neighbors
-                    context = []
-                    if prev_chunk:
-                        context.extend(prev_chunk[-10:])
-                    context.extend(entries)
-                    
-                    # If near end, try to fetch next chunk for "Behind" neighbor
-                    if i >= len(entries) - 2:
-                         next_data = GGGAPIClient.fetch_ladder(league_id, limit=10, offset=current_offset + CHUNK_SIZE, deep_search=deep_search)
-                         if next_data and 'entries' in next_data:
-                             # Process ranks for next chunk context
-                             for n_i, n_entry in enumerate(next_data['entries']):
-                                 n_asc = n_entry['character']['class']
-                                 if n_asc in ascendancy_counts:
-                                     ascendancy_counts[n_asc] += 1
-                                 n_entry['ascendancy_rank'] = ascendancy_counts.get(n_asc)
-                                 n_entry['rank'] = current_offset + CHUNK_SIZE + n_i + 1
-                             context.extend(next_data['entries'])
-
-                    surrounding_entries = context
-            
-            if found_entry:
-                break
-
-            prev_chunk = entries
-            current_offset += CHUNK_SIZE
-            
-            time.sleep(0.1) # Prevent UI freeze during deep scans
-            if current_offset >= 15000 and not deep_search:
-                break
-            if current_offset > 20000: # Safety cap
-                break
-
-        if found_entry:
-            self.after(0, self.process_and_display_data, surrounding_entries, found_entry)
+        if found.get('error'):
+            error_message = f"Error: {found.get('message', 'Unknown API error')}"
+            self.after(0, self.global_ahead_labels[0].configure, {"text": error_message})
+        elif target_name in found['characters']:
+            found_entry, surrounding_entries = found['characters'][target_name]
+            self.after(0, fetch_trace.deferred(self.process_and_display_data), surrounding_entries, found_entry)
         else:
             error_message = "Character not found in ladder."
             self.after(0, self.global_ahead_labels[0].configure, {"text": error_message})
@@ -314,6 +270,10 @@ class RaceModeWindow(customtkinter.CTkToplevel):
 
     def on_refresh_complete(self):
         self.refresh_button.configure(state="normal", text="Refresh")
+        # Replace any refresh already scheduled (e.g. by toggle_auto_refresh), so on_close can cancel it
+        if self.auto_refresh_job:
+            self.after_cancel(self.auto_refresh_job)
+            self.auto_refresh_job = None
         # Schedule next refresh if auto-refresh is enabled
         if self.auto_refresh_var.get() == "on":
             self.auto_refresh_job = self.after(60000, self.refresh_data_thread)
@@ -429,22 +389,7 @@ class RaceModeWindow(customtkinter.CTkToplevel):
                 else:
                     status_label.grid_remove()
                     progress_bar.grid()
-                    # Calculate Level Progress
-                    lvl = neighbor_entry['character']['level']
-                    curr_xp = neighbor_xp
-                    
-                    if lvl >= 100:
-                        progress = 1.0
-                    elif curr_xp > 0:
-                        idx = bisect.bisect_right(XP_THRESHOLDS, curr_xp) - 1
-                        if idx >= 0 and idx < len(XP_THRESHOLDS) - 1:
-                            start_xp = XP_THRESHOLDS[idx]
-                            end_xp = XP_THRESHOLDS[idx + 1]
-                            progress = (curr_xp - start_xp) / (end_xp - start_xp) if end_xp > start_xp else 0
-                        else:
-                            progress = 1.0 if idx >= len(XP_THRESHOLDS) - 1 else 0
-                    else:
-                        progress = 0
+                    progress = level_progress(neighbor_entry['character']['level'], neighbor_xp)
                     progress_bar.set(progress)
             else:
                 name_label.configure(text="N/A")
@@ -455,29 +400,14 @@ class RaceModeWindow(customtkinter.CTkToplevel):
                 progress_bar.grid()
                 progress_bar.set(0)
 
-        # Helper to find neighbors in cached data if live data fails
-        def get_fallback_neighbor(target_list, target_name, direction="ahead"):
-            try:
-                # Find index of self in the cached list
-                idx = next(i for i, e in enumerate(target_list) if e['character']['name'] == target_name)
-                if direction == "ahead":
-                    return target_list[idx - 1] if idx > 0 else None
-                else:
-                    return target_list[idx + 1] if idx < len(target_list) - 1 else None
-            except (StopIteration, ValueError):
-                return None
-
-        cached_entries = self.master_app.all_fetched_entries
-        cached_asc_entries = [e for e in cached_entries if e['character']['class'] == my_ascendancy]
-
         # --- Process Global Ladder ---
         try:
             global_idx = surrounding_entries.index(my_new_entry)
             global_ahead = surrounding_entries[global_idx - 1] if global_idx > 0 else None
-            if not global_ahead: global_ahead = get_fallback_neighbor(cached_entries, my_original_name, "ahead")
+            if not global_ahead: global_ahead = self.store.neighbor(my_original_name, "ahead")
             
             global_behind = surrounding_entries[global_idx + 1] if global_idx < len(surrounding_entries) - 1 else None
-            if not global_behind: global_behind = get_fallback_neighbor(cached_entries, my_original_name, "behind")
+            if not global_behind: global_behind = self.store.neighbor(my_original_name, "behind")
 
             update_row_data(self.global_ahead_labels, global_ahead, my_new_xp)
             update_row_data(self.global_behind_labels, global_behind, my_new_xp)
@@ -491,10 +421,10 @@ class RaceModeWindow(customtkinter.CTkToplevel):
         try:
             asc_idx = asc_entries.index(my_new_entry)
             asc_ahead = asc_entries[asc_idx - 1] if asc_idx > 0 else None
-            if not asc_ahead: asc_ahead = get_fallback_neighbor(cached_asc_entries, my_original_name, "ahead")
+            if not asc_ahead: asc_ahead = self.store.neighbor(my_original_name, "ahead", same_class=True)
             
             asc_behind = asc_entries[asc_idx + 1] if asc_idx < len(asc_entries) - 1 else None
-            if not asc_behind: asc_behind = get_fallback_neighbor(cached_asc_entries, my_original_name, "behind")
+            if not asc_behind: asc_behind = self.store.neighbor(my_original_name, "behind", same_class=True)
             
             update_row_data(self.asc_ahead_labels, asc_ahead, my_new_xp, 'ascendancy_rank')
             update_row_data(self.asc_behind_labels, asc_behind, my_new_xp, 'ascendancy_rank')
@@ -509,6 +439,434 @@ class RaceModeWindow(customtkinter.CTkToplevel):
         text = f"Tracking: {name}  |  Asc: #{asc_rank}"
         self.tracking_label.configure(text=text)
 
+class RaceGroupWindow(customtkinter.CTkToplevel):
+    """
+    Race mode for a group of characters, such as a party or a guild race, in any
+    mix of ascendancies. Every refresh finds all of them in one shared pass over
+    the ladder (see race_tracker.find_characters), so tracking the group costs
+    about as many requests as tracking one character.
+    """
+    COLUMNS = ("Character", "Class", "Level", "Rank", "Asc Rank", "XP/h", "Ahead (Asc)", "Behind (Asc)")
+
+    def __init__(self, master, names=()):
+        super().__init__(master)
+        self.master_app = master
+        self.auto_refresh_job = None
+        self.refreshing = False
+        self.last_ranks = {} # name -> last known rank
+        self.xp_history = {} # name -> (xp, time, rate per hour)
+        self.cells = {} # name -> labels of its row, in COLUMNS order
+        self.store = None # LadderStore of the league being raced
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.title("Group Race")
+        self.geometry("980x420")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        # --- Options Frame (Row 0) ---
+        self.options_frame = customtkinter.CTkFrame(self)
+        self.options_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
+        self.options_frame.grid_columnconfigure(0, weight=1)
+
+        self.names_entry = customtkinter.CTkEntry(self.options_frame, placeholder_text="Character names, separated by commas")
+        self.names_entry.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+        if names:
+            self.names_entry.insert(0, ", ".join(names))
+        self.names_entry.bind("<Return>", self.refresh_data_thread)
+
+        self.refresh_button = customtkinter.CTkButton(self.options_frame, text="Track", command=self.refresh_data_thread)
+        self.refresh_button.grid(row=0, column=1, padx=(0, 10), pady=10)
+
+        self.auto_refresh_var = customtkinter.StringVar(value="on")
+        self.auto_refresh_check = customtkinter.CTkCheckBox(self.options_frame, text="Auto Refresh", variable=self.auto_refresh_var, onvalue="on", offvalue="off", command=self.toggle_auto_refresh)
+        self.auto_refresh_check.grid(row=0, column=2, padx=(0, 10), pady=10)
+
+        self.always_on_top_var = customtkinter.StringVar(value="off")
+        self.always_on_top_check = customtkinter.CTkCheckBox(self.options_frame, text="Always on Top", command=self.toggle_always_on_top, variable=self.always_on_top_var, onvalue="on", offvalue="off")
+        self.always_on_top_check.grid(row=0, column=3, padx=(0, 10), pady=10)
+
+        # --- Results Frame (Row 1) ---
+        self.results_frame = customtkinter.CTkScrollableFrame(self)
+        self.results_frame.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="nsew")
+        self.results_frame.grid_columnconfigure(0, weight=1)
+        for col, title in enumerate(self.COLUMNS):
+            customtkinter.CTkLabel(self.results_frame, text=title, anchor="w", text_color="#4da6ff", font=customtkinter.CTkFont(weight="bold")).grid(row=0, column=col, padx=5, sticky="w")
+
+        # --- Status Bar (Row 2) ---
+        self.status_label = customtkinter.CTkLabel(self, text="Enter the characters to race.", text_color="gray")
+        self.status_label.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="w")
+
+        if names:
+            self.refresh_data_thread()
+
+    def toggle_always_on_top(self):
+        self.attributes("-topmost", self.always_on_top_var.get() == "on")
+
+    def toggle_auto_refresh(self):
+        if self.auto_refresh_var.get() == "off":
+            if self.auto_refresh_job:
+                self.after_cancel(self.auto_refresh_job)
+                self.auto_refresh_job = None
+        elif not self.auto_refresh_job and not self.refreshing and self.last_ranks:
+            self.auto_refresh_job = self.after(60000, self.refresh_data_thread)
+
+    def on_close(self):
+        if self.auto_refresh_job:
+            self.after_cancel(self.auto_refresh_job)
+        self.destroy()
+
+    def get_names(self):
+        names = []
+        for name in self.names_entry.get().split(","):
+            name = name.strip()
+            if name and name.lower() not in (n.lower() for n in names):
+                names.append(name)
+        return names
+
+    def refresh_data_thread(self, event=None):
+        if self.refreshing:
+            return
+        names = self.get_names()
+        if not names:
+            self.status_label.configure(text="Enter at least one character name.")
+            return
+        if self.auto_refresh_job:
+            self.after_cancel(self.auto_refresh_job)
+            self.auto_refresh_job = None
+
+        self._build_rows(names)
+        self.refreshing = True
+        self.refresh_button.configure(state="disabled", text="Refreshing...")
+        self.status_label.configure(text=f"Refreshing {len(names)} characters...")
+        last_ranks = {name: self.last_ranks.get(name) for name in names}
+        thread = threading.Thread(target=self.refresh_data, args=(last_ranks,), daemon=True)
+        thread.start()
+
+    def _build_rows(self, names):
+        """Keeps one row of labels per character, adding and removing rows as the list changes."""
+        for name in [n for n in self.cells if n not in names]:
+            for label in self.cells.pop(name):
+                label.destroy()
+            self.last_ranks.pop(name, None)
+        for row, name in enumerate(names, start=1):
+            if name not in self.cells:
+                self.cells[name] = [customtkinter.CTkLabel(self.results_frame, text=name if col == 0 else "--", anchor="w")
+                                    for col in range(len(self.COLUMNS))]
+            for col, label in enumerate(self.cells[name]):
+                label.grid(row=row, column=col, padx=5, pady=2, sticky="w")
+
+    @fetch_trace.traced("race_refresh")
+    def refresh_data(self, last_ranks):
+        started = time.time()
+        deep_search = self.master_app.deep_search_check.get() == 1
+        league_id = self.master_app._get_league_id_from_name(self.master_app.get_selected_league())
+        store = self.store = ladder_store(league_id)
+        found = find_characters(store, last_ranks, deep_search, stopped=lambda: not self.winfo_exists())
+        if found is None: return # Window closed
+        self.after(0, fetch_trace.deferred(self.show_results), last_ranks, found, time.time() - started)
+
+    def show_results(self, last_ranks, found, elapsed):
+        self.refreshing = False
+        if not self.winfo_exists():
+            return
+        if found.get('error'):
+            # Rows keep the last results; the next refresh tries again.
+            self.status_label.configure(text=f"Error: {found.get('message', 'Unknown API error')}")
+            self.on_refresh_complete()
+            return
+        found = found['characters']
+        current_time = time.time()
+        for name in last_ranks:
+            cells = self.cells.get(name)
+            if cells is None:
+                continue # Removed from the list meanwhile
+            if name not in found:
+                cells[1].configure(text="Not found in ladder.")
+                for label in cells[2:]:
+                    label.configure(text="--")
+                continue
+
+            entry, surrounding_entries = found[name]
+            character = entry['character']
+            self.last_ranks[name] = entry['rank']
+            xp = int(character['experience'])
+
+            # XP per hour since the last refresh; kept while the character is idle for up to 5 minutes.
+            last_xp, last_time, rate = self.xp_history.get(name, (xp, current_time, 0))
+            if xp > last_xp and current_time > last_time:
+                rate = (xp - last_xp) / (current_time - last_time) * 3600
+            elif current_time - last_time > 300:
+                rate = 0
+            if xp != last_xp or rate == 0:
+                self.xp_history[name] = (xp, current_time, rate)
+
+            same_class = [e for e in surrounding_entries if e['character']['class'] == character['class']]
+            index = same_class.index(entry)
+            ahead = same_class[index - 1] if index > 0 else self.store.neighbor(character['name'], "ahead", same_class=True)
+            behind = same_class[index + 1] if index < len(same_class) - 1 else self.store.neighbor(character['name'], "behind", same_class=True)
+
+            status = " 💀" if entry.get('dead') else (" ♿" if entry.get('retired') else "")
+            rate_text = f"{rate/1_000_000:.2f} m/h".replace('.', ',') if rate >= 1_000_000 else f"{int(rate):,}/h"
+            values = (f"{character['name']}{status}", character['class'], character['level'], f"#{entry['rank']}",
+                      f"#{entry.get('ascendancy_rank', '?')}", rate_text, self._format_neighbor(ahead, xp), self._format_neighbor(behind, xp))
+            for label, value in zip(cells, values):
+                label.configure(text=value)
+
+        self.status_label.configure(text=f"Found {len(found)} of {len(last_ranks)} characters in {elapsed:.1f}s.")
+        self.on_refresh_complete()
+
+    def on_refresh_complete(self):
+        self.refresh_button.configure(state="normal", text="Refresh")
+        if self.auto_refresh_var.get() == "on":
+            self.auto_refresh_job = self.after(60000, self.refresh_data_thread)
+
+    def _format_neighbor(self, neighbor_entry, xp):
+        if not neighbor_entry:
+            return "N/A"
+        gap = int(neighbor_entry['character']['experience']) - xp
+        return f"{neighbor_entry['character']['name']} ({gap:+,} XP)"
+
+class LeagueCompareWindow(customtkinter.CTkToplevel):
+    """
+    Shows the top characters per ascendancy of several leagues side by side.
+    The leagues are fetched concurrently by a small worker pool whose requests
+    all go through the API client's shared request budget, so a comparison
+    takes about as long as its slowest league rather than the sum of all.
+    """
+    def __init__(self, master):
+        super().__init__(master)
+        self.master_app = master
+        self.stop_event = threading.Event()
+        self.league_vars = {}
+        self.groups = []
+        self.limit = 10
+        self.cells = {}
+        self.status_labels = {}
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.title("Compare Leagues")
+        self.geometry("1100x750")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        # --- Options Frame (Row 0) ---
+        self.options_frame = customtkinter.CTkFrame(self)
+        self.options_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
+
+        self.leagues_frame = customtkinter.CTkFrame(self.options_frame, fg_color="transparent")
+        self.leagues_frame.grid(row=0, column=0, columnspan=5, padx=10, pady=(10, 5), sticky="ew")
+        selected_league = self.master_app.get_selected_league()
+        for i, league in enumerate(self.master_app.all_leagues_data):
+            name = league.get('text', league['id'])
+            var = customtkinter.IntVar(value=1 if name == selected_league else 0)
+            customtkinter.CTkCheckBox(self.leagues_frame, text=name, variable=var).grid(row=i // 4, column=i % 4, padx=5, pady=3, sticky="w")
+            self.league_vars[name] = (var, league['id'])
+
+        self.ascendancy_menu = customtkinter.CTkOptionMenu(self.options_frame, values=["All"] + STANDARD_ASCENDANCIES + [DROPDOWN_SEPARATOR] + BASE_CLASSES)
+        self.ascendancy_menu.grid(row=1, column=0, padx=10, pady=10, sticky="w")
+
+        self.limit_menu = customtkinter.CTkOptionMenu(self.options_frame, values=["5", "10", "20"], width=70)
+        self.limit_menu.set("10")
+        self.limit_menu.grid(row=1, column=1, padx=(0, 10), pady=10, sticky="w")
+
+        self.compare_button = customtkinter.CTkButton(self.options_frame, text="Compare", command=self.start_compare_thread)
+        self.compare_button.grid(row=1, column=2, padx=(0, 10), pady=10)
+
+        self.stop_button = customtkinter.CTkButton(self.options_frame, text="Stop", command=self.stop_event.set, state="disabled")
+        self.stop_button.grid(row=1, column=3, padx=(0, 10), pady=10)
+
+        # --- Results Frame (Row 1) ---
+        self.results_frame = customtkinter.CTkScrollableFrame(self)
+        self.results_frame.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="nsew")
+
+        # --- Status Bar (Row 2) ---
+        self.status_label = customtkinter.CTkLabel(self, text="Select leagues to compare.", text_color="gray")
+        self.status_label.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="w")
+
+    def on_close(self):
+        self.stop_event.set()
+        self.destroy()
+
+    def start_compare_thread(self):
+        leagues = [(name, league_id) for name, (var, league_id) in self.league_vars.items() if var.get() == 1]
+        if not leagues:
+            self.status_label.configure(text="Select at least one league.")
+            return
+
+        ascendancy = self.ascendancy_menu.get()
+        if ascendancy == "All" or ascendancy == DROPDOWN_SEPARATOR:
+            ascendancy = None
+        self.limit = int(self.limit_menu.get())
+
+        if ascendancy:
+            self.groups = [ascendancy]
+        elif any("Phrecia" in name for name, _ in leagues):
+            self.groups = sorted(set(STANDARD_ASCENDANCIES) | set(TEMPORARY_ASCENDANCIES))
+        else:
+            self.groups = sorted(STANDARD_ASCENDANCIES)
+        self._build_grid([name for name, _ in leagues])
+
+        self.stop_event.clear()
+        self.compare_button.configure(state="disabled")
+        self.stop_button.configure(state="normal")
+        self.status_label.configure(text=f"Fetching {len(leagues)} leagues...")
+        thread = threading.Thread(target=self.compare_leagues, args=(leagues, ascendancy, self.limit), daemon=True)
+        thread.start()
+
+    def _build_grid(self, league_names):
+        """Lays out one column per league and one row per group, so groups line up across leagues."""
+        for widget in self.results_frame.winfo_children():
+            widget.destroy()
+        self.cells = {}
+        self.status_labels = {}
+
+        for col, name in enumerate(league_names, start=1):
+            self.results_frame.grid_columnconfigure(col, weight=1, uniform="league")
+            customtkinter.CTkLabel(self.results_frame, text=name, font=customtkinter.CTkFont(weight="bold")).grid(row=0, column=col, padx=5, sticky="w")
+            self.status_labels[name] = customtkinter.CTkLabel(self.results_frame, text="Queued", text_color="gray")
+            self.status_labels[name].grid(row=1, column=col, padx=5, sticky="w")
+
+        for row, group in enumerate(self.groups, start=2):
+            customtkinter.CTkLabel(self.results_frame, text=group, anchor="nw", text_color="#4da6ff", font=customtkinter.CTkFont(weight="bold")).grid(row=row, column=0, padx=5, pady=(6, 0), sticky="nw")
+            for col, name in enumerate(league_names, start=1):
+                cell = customtkinter.CTkLabel(self.results_frame, text="", anchor="nw", justify="left")
+                cell.grid(row=row, column=col, padx=5, pady=(6, 0), sticky="nw")
+                self.cells[(name, group)] = cell
+
+    def compare_leagues(self, leagues, ascendancy, limit):
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=MAX_LEAGUE_WORKERS) as pool:
+            futures = {pool.submit(self.fetch_league_top, league_id, name, ascendancy, limit): name for name, league_id in leagues}
+            for future in as_completed(futures):
+                results, message = future.result()
+                self.after(0, self.show_league_results, futures[future], results, message)
+        self.after(0, self.on_compare_complete, len(leagues), time.time() - started)
+
+    def fetch_league_top(self, league_id, league_name, ascendancy, limit):
+        """Fetches one league's top-N on a worker thread. Returns (results, status message)."""
+        if self.stop_event.is_set():
+            return None, "Stopped"
+        started = time.time()
+        self.after(0, self.set_league_status, league_name, "Fetching...")
+
+        # One request when the proxy has a snapshot of the league.
+        top = GGGAPIClient.fetch_top(league_id, ascendancy, limit)
+        if top and 'results' in top:
+            return top['results'], f"Done in {time.time() - started:.1f}s"
+
+        relevant_asc = [ascendancy] if ascendancy else (TEMPORARY_ASCENDANCIES if "Phrecia" in league_name else STANDARD_ASCENDANCIES)
+        aggregator = LadderAggregator(limit)
+        offset = 0
+        while offset < 15000 and not aggregator.is_satisfied(relevant_asc) and not self.stop_event.is_set():
+            self.after(0, self.set_league_status, league_name, f"Scanning {offset}...")
+            data = GGGAPIClient.fetch_ladder(league_id, limit=CHUNK_SIZE, offset=offset, priority=PRIORITY_BULK, cancelled=self.stop_event.is_set)
+            if data and isinstance(data, dict) and data.get('error') == 'cancelled':
+                break
+            if data and isinstance(data, dict) and data.get('error'):
+                return None, f"Error: {data.get('message', 'Unknown API error')}"
+            if data is None or not data.get('entries', []):
+                break
+            aggregator.add(data['entries'])
+            offset += CHUNK_SIZE
+
+        status = "Stopped" if self.stop_event.is_set() else f"Done in {time.time() - started:.1f}s"
+        return aggregator.results(ascendancy, limit), status
+
+    def set_league_status(self, league_name, text):
+        if self.winfo_exists() and league_name in self.status_labels:
+            self.status_labels[league_name].configure(text=text)
+
+    def show_league_results(self, league_name, results, message):
+        if not self.winfo_exists():
+            return
+        self.set_league_status(league_name, message)
+        by_group = {}
+        for char in results or []:
+            by_group.setdefault(char.get('group', char['ascendancy']), []).append(char)
+
+        for group in self.groups:
+            lines = []
+            for char in by_group.get(group, [])[:self.limit]:
+                marker = " 💀" if char.get('dead') else (" ♿" if char.get('retired') else "")
+                lines.append(f"{char['asc_rank']}. {char['name']} ({char['level']}) #{char['global_rank']}{marker}")
+            # Pad every cell to the same height so the rows stay aligned across leagues.
+            lines += ["—"] * (self.limit - len(lines))
+            self.cells[(league_name, group)].configure(text="\n".join(lines))
+
+    def on_compare_complete(self, league_count, elapsed):
+        if not self.winfo_exists():
+            return
+        self.compare_button.configure(state="normal")
+        self.stop_button.configure(state="disabled")
+        self.status_label.configure(text=f"Compared {league_count} leagues in {elapsed:.1f}s.")
+
+class TimingPanel(customtkinter.CTkToplevel):
+    """
+    Debug panel (F12 in the main window) showing how long each phase of fetches,
+    searches and race refreshes took: waiting for the request budget, request
+    latency, JSON decoding, processing, pauses between chunks, the delay before
+    Tk ran the UI update, and the UI update itself. Timings are only collected
+    while the panel is open, and can be exported as a trace file.
+    """
+    def __init__(self, master):
+        super().__init__(master)
+        self.refresh_job = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.title("Fetch Timings")
+        self.geometry("760x440")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.table = customtkinter.CTkTextbox(self, font=customtkinter.CTkFont(family="Courier", size=12), wrap="none")
+        self.table.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="nsew")
+
+        self.buttons_frame = customtkinter.CTkFrame(self, fg_color="transparent")
+        self.buttons_frame.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="ew")
+        customtkinter.CTkButton(self.buttons_frame, text="Clear", command=self.clear).pack(side="left")
+        customtkinter.CTkButton(self.buttons_frame, text="Export Trace...", command=self.export_trace).pack(side="left", padx=10)
+
+        self.status_label = customtkinter.CTkLabel(self, text="Recording. Timings appear as you fetch, search or refresh race mode.", text_color="gray")
+        self.status_label.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="w")
+
+        fetch_trace.enabled = True
+        self.refresh()
+
+    def refresh(self):
+        lines = [f"{'operation':<14}{'phase':<17}{'count':>7}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+        for row in fetch_trace.summary():
+            lines.append(f"{row['operation']:<14}{row['phase']:<17}{row['count']:>7}{row['total_ms']:>12.1f}{row['mean_ms']:>10.1f}{row['max_ms']:>10.1f}")
+        self.table.configure(state="normal")
+        self.table.delete("1.0", "end")
+        self.table.insert("1.0", "\n".join(lines))
+        self.table.configure(state="disabled")
+        self.refresh_job = self.after(TIMING_PANEL_REFRESH_MS, self.refresh)
+
+    def clear(self):
+        fetch_trace.clear()
+        if self.refresh_job:
+            self.after_cancel(self.refresh_job)
+        self.refresh()
+
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(parent=self, title="Export Trace", defaultextension=".json",
+                                            initialfile="ladder-tracker-trace.json", filetypes=[("Trace files", "*.json")])
+        if not path:
+            return
+        try:
+            count = fetch_trace.export(path)
+        except OSError as e:
+            self.status_label.configure(text=f"Export failed: {e}")
+            return
+        self.status_label.configure(text=f"Exported {count} timings. Open the file in chrome://tracing or ui.perfetto.dev.")
+
+    def on_close(self):
+        fetch_trace.enabled = False
+        if self.refresh_job:
+            self.after_cancel(self.refresh_job)
+        self.destroy()
+
 class App(customtkinter.CTk):
     def __init__(self):
         super().__init__()
@@ -521,14 +879,15 @@ class App(customtkinter.CTk):
 
         self.stop_search_event = threading.Event()
         self.current_limit = 10
-        self.all_fetched_entries = []
+        self.ladder_store = None # LadderStore of the league last fetched or searched
+        self.ladder_aggregator = LadderAggregator(self.current_limit)
         self.current_offset = 0
         self.all_leagues_data = [] # To store full league objects for ID lookup
         self.found_character_for_race_mode = None
         self.race_mode_window = None
-        self.ascendancy_frames = {}
-        self.displayed_character_names = set()
-        self.results_initialized = False
+        self.group_race_window = None
+        self.compare_window = None
+        self.timing_panel = None
 
         # --- Options Frame ---
         self.options_frame = customtkinter.CTkFrame(self)
@@ -558,7 +917,10 @@ class App(customtkinter.CTk):
         self.deep_search_check.bind("<Button-1>", self.on_deep_search_toggle)
 
         self.fetch_button = customtkinter.CTkButton(self.options_frame, text="Fetch Characters", command=self.start_fetch_thread)
-        self.fetch_button.grid(row=4, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+        self.fetch_button.grid(row=4, column=0, padx=10, pady=10, sticky="ew")
+
+        self.compare_button = customtkinter.CTkButton(self.options_frame, text="Compare Leagues", command=self.launch_compare_window)
+        self.compare_button.grid(row=4, column=1, padx=10, pady=10, sticky="ew")
 
         # --- Search Frame ---
         self.search_frame = customtkinter.CTkFrame(self)
@@ -566,7 +928,7 @@ class App(customtkinter.CTk):
         self.search_frame.grid_columnconfigure(0, weight=1)
 
         self.char_name_label = customtkinter.CTkLabel(self.search_frame, text="Character Name")
-        self.char_name_label.grid(row=0, column=0, columnspan=4, padx=10, pady=(10,0), sticky="w")
+        self.char_name_label.grid(row=0, column=0, columnspan=5, padx=10, pady=(10,0), sticky="w")
         self.char_name_entry = customtkinter.CTkEntry(self.search_frame)
         self.char_name_entry.grid(row=1, column=0, padx=10, pady=(0,10), sticky="ew")
         self.char_name_entry.bind("<Return>", self.start_search_thread)
@@ -578,11 +940,16 @@ class App(customtkinter.CTk):
         self.stop_search_button.grid(row=1, column=2, padx=(0,5), pady=(0,10))
 
         self.race_mode_button = customtkinter.CTkButton(self.search_frame, text="Race Mode", command=self.launch_race_mode_thread, state="disabled")
-        self.race_mode_button.grid(row=1, column=3, padx=(0,10), pady=(0,10))
+        self.race_mode_button.grid(row=1, column=3, padx=(0,5), pady=(0,10))
+
+        self.group_race_button = customtkinter.CTkButton(self.search_frame, text="Group Race", command=self.launch_group_race_window)
+        self.group_race_button.grid(row=1, column=4, padx=(0,10), pady=(0,10))
         
         # --- Results Frame (replaces Textbox) ---
+        # Messages go in results_frame; character lists in results_table, which shares its cell.
         self.results_frame = customtkinter.CTkScrollableFrame(self)
         self.results_frame.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="nsew")
+        self.results_table = ResultsTable(self, on_name_click=self.open_poe_ninja)
 
         # --- Show More Button ---
         self.show_more_button = customtkinter.CTkButton(self, text="Show More", command=self.start_show_more_thread, state="disabled")
@@ -598,6 +965,7 @@ class App(customtkinter.CTk):
 
         self._is_narrow_layout = False
         self.bind("<Configure>", self.on_resize)
+        self.bind("<F12>", self.toggle_timing_panel)
 
         self.load_leagues()
 
@@ -630,9 +998,10 @@ class App(customtkinter.CTk):
             self.char_name_entry.grid(row=1, column=0, columnspan=3, padx=(10,5), pady=(0,5), sticky="ew")
             self.search_button.grid(row=1, column=3, columnspan=1, padx=(5,10), pady=(0,5), sticky="ew")
 
-            # Row 2: Stop and Race Mode buttons
+            # Row 2: Stop and the race buttons
             self.stop_search_button.grid(row=2, column=0, columnspan=2, padx=(10,5), pady=(5,10), sticky="ew")
-            self.race_mode_button.grid(row=2, column=2, columnspan=2, padx=(5,10), pady=(5,10), sticky="ew")
+            self.race_mode_button.grid(row=2, column=2, columnspan=1, padx=5, pady=(5,10), sticky="ew")
+            self.group_race_button.grid(row=2, column=3, columnspan=1, padx=(5,10), pady=(5,10), sticky="ew")
             
             self._is_narrow_layout = True
 
@@ -644,7 +1013,8 @@ class App(customtkinter.CTk):
             self.char_name_entry.grid(row=1, column=0, columnspan=1, padx=10, pady=(0,10), sticky="ew")
             self.search_button.grid(row=1, column=1, columnspan=1, padx=(0,5), pady=(0,10), sticky="")
             self.stop_search_button.grid(row=1, column=2, columnspan=1, padx=(0,5), pady=(0,10), sticky="")
-            self.race_mode_button.grid(row=1, column=3, columnspan=1, padx=(0,10), pady=(0,10), sticky="")
+            self.race_mode_button.grid(row=1, column=3, columnspan=1, padx=(0,5), pady=(0,10), sticky="")
+            self.group_race_button.grid(row=1, column=4, columnspan=1, padx=(0,10), pady=(0,10), sticky="")
             
             self._is_narrow_layout = False
 
@@ -752,7 +1122,8 @@ class App(customtkinter.CTk):
                 league_display_names.sort()
                 self.league_menu.configure(values=league_display_names)
 
-                if league_display_names:
+                # A refreshed list replacing a cached one keeps the league the user picked.
+                if league_display_names and self.league_menu.get() not in league_display_names:
                     self.league_menu.set(league_display_names[0])
                     self.on_league_change(league_display_names[0])
                 self.status_label.configure(text="Ready.")
@@ -772,21 +1143,37 @@ class App(customtkinter.CTk):
                 self.search_button.configure(state="disabled")
                 self.all_leagues_data = [] # Clear data on error
 
+        # A league list from an earlier session is shown at once, and only fetched
+        # again in the background once it is older than LEAGUES_FRESH_AGE.
+        cached = GGGAPIClient.cached_leagues()
+        if cached:
+            update_ui(cached[1])
+            if time.time() - cached[0] < LEAGUES_FRESH_AGE:
+                return
+
         def task():
-            self.status_label.configure(text="Fetching leagues...")
+            if not cached:
+                self.status_label.configure(text="Fetching leagues...")
             leagues = GGGAPIClient.fetch_leagues()
+            if cached and not isinstance(leagues, list):
+                # Keep the cached list rather than replacing it with an error.
+                self.after(0, self.status_label.configure, {"text": "Could not refresh the league list; showing the saved one."})
+                return
             self.after(0, update_ui, leagues)
         thread = threading.Thread(target=task, daemon=True)
         thread.start()
 
     def start_fetch_thread(self):
         self.current_limit = 10
-        self.all_fetched_entries = []
+        self.ladder_aggregator = LadderAggregator(self.current_limit)
         self.current_offset = 0
         self.fetch_and_display_data_thread(clear_results=True)
 
     def start_show_more_thread(self):
         self.current_limit += 50
+        # The aggregator only kept the previous top-N, so rebuild it once for the larger limit.
+        scanned = self.ladder_store.entries(0, self.current_offset) if self.ladder_store else []
+        self.ladder_aggregator = LadderAggregator(self.current_limit).add(scanned)
         self.fetch_and_display_data_thread(clear_results=False)
 
     def fetch_and_display_data_thread(self, clear_results=True):
@@ -807,9 +1194,9 @@ class App(customtkinter.CTk):
     def _clear_results_frame(self):
         for widget in self.results_frame.winfo_children():
             widget.destroy()
-        self.ascendancy_frames = {}
-        self.displayed_character_names = set()
-        self.results_initialized = False
+        self.results_table.clear()
+        self.results_table.grid_forget()
+        self.results_frame.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="nsew")
 
     def display_message(self, message, title=""):
         self._clear_results_frame()
@@ -822,141 +1209,26 @@ class App(customtkinter.CTk):
         message_label.pack(pady=5, padx=10, anchor="w", fill="x")
 
     def display_results(self, final_results, league):
-        # Define colors and fonts
-        HOVER_COLOR = ("gray92", "gray20")
-        ASC_SEPARATOR_COLOR = "#4da6ff"
-        ROW_SEPARATOR_COLOR = ("gray65", "gray40")
-        HEADER_SEPARATOR_COLOR = ("gray85", "gray60")
-        
-        asc_col_width = 140
-        lvl_col_width = 60
-        rank_col_width = 120
-        progress_col_width = 100
-
-        if not self.results_initialized:
-            # --- Table Header ---
-            table_header_frame = customtkinter.CTkFrame(self.results_frame, fg_color="transparent", height=30)
-            table_header_frame.pack(fill="x", padx=5, pady=(0, 5))
-            
-            # Pack Right-aligned columns first
-            customtkinter.CTkLabel(table_header_frame, text="RANK (Asc/Global)", width=rank_col_width, anchor="e", font=customtkinter.CTkFont(weight="bold"), text_color=ASC_SEPARATOR_COLOR).pack(side="right", padx=10)
-            customtkinter.CTkLabel(table_header_frame, text="PROGRESS", width=progress_col_width, anchor="center", font=customtkinter.CTkFont(weight="bold"), text_color=ASC_SEPARATOR_COLOR).pack(side="right", padx=10)
-
-            # Pack Left-aligned columns
-            customtkinter.CTkLabel(table_header_frame, text="ASCENDANCY", width=asc_col_width, anchor="w", font=customtkinter.CTkFont(weight="bold"), text_color=ASC_SEPARATOR_COLOR).pack(side="left", padx=10)
-            customtkinter.CTkLabel(table_header_frame, text="LEVEL", width=lvl_col_width, anchor="center", font=customtkinter.CTkFont(weight="bold"), text_color=ASC_SEPARATOR_COLOR).pack(side="left", padx=10)
-            customtkinter.CTkLabel(table_header_frame, text="CHARACTER NAME", anchor="w", font=customtkinter.CTkFont(weight="bold"), text_color=ASC_SEPARATOR_COLOR).pack(side="left", padx=10, expand=True, fill="x")
-
-            # --- Header Separator ---
-            customtkinter.CTkFrame(self.results_frame, height=3, fg_color=HEADER_SEPARATOR_COLOR, corner_radius=0).pack(fill="x", padx=5)
-            self.results_initialized = True
-
-        # Create lookup for account names from raw entries
-        char_to_acc = {e['character']['name']: e.get('account', {}).get('name') for e in self.all_fetched_entries}
-
-        for char in final_results:
-            if char['name'] in self.displayed_character_names:
-                continue
-            
-            group_name = char.get('group', char['ascendancy'])
-            
-            # Ensure we have a frame for this ascendancy
-            if group_name not in self.ascendancy_frames:
-                # If this is not the first ascendancy frame, add a separator before it
-                if self.ascendancy_frames:
-                    customtkinter.CTkFrame(self.results_frame, height=2, fg_color=ASC_SEPARATOR_COLOR).pack(fill="x", padx=5, pady=5)
-                
-                frame = customtkinter.CTkFrame(self.results_frame, fg_color="transparent", corner_radius=0)
-                frame.pack(fill="x")
-                self.ascendancy_frames[group_name] = frame
-            
-            asc_frame = self.ascendancy_frames[group_name]
-            
-            # If frame already has children (rows), add a row separator
-            if len(asc_frame.winfo_children()) > 0:
-                customtkinter.CTkFrame(asc_frame, height=2, fg_color=ROW_SEPARATOR_COLOR, corner_radius=0).pack(fill="x", padx=5)
-
-            row_frame = customtkinter.CTkFrame(asc_frame, fg_color="transparent", corner_radius=6)
-            row_frame.pack(fill="x", padx=5, pady=1)
-
-            # Labels inside the row - Pack Right-aligned first
-            rank_str = f"{char['asc_rank']} / {char['global_rank']}"
-            rank_label = customtkinter.CTkLabel(row_frame, text=rank_str, width=rank_col_width, anchor="e")
-            rank_label.pack(side="right", padx=10, pady=4)
-
-            # This list will hold all widgets in the row for the hover effect
-            hover_widgets = [row_frame, rank_label]
-
-            # Progress Bar or Status Icon
-            if char.get('dead'):
-                status_label = customtkinter.CTkLabel(row_frame, text="💀", width=progress_col_width, anchor="center", text_color="#FF5252", font=customtkinter.CTkFont(size=16))
-                status_label.pack(side="right", padx=10, pady=4)
-                hover_widgets.append(status_label)
-            elif char.get('retired'):
-                status_label = customtkinter.CTkLabel(row_frame, text="♿", width=progress_col_width, anchor="center", text_color="gray", font=customtkinter.CTkFont(size=16))
-                status_label.pack(side="right", padx=10, pady=4)
-                hover_widgets.append(status_label)
-            else:
-                progress_bar = customtkinter.CTkProgressBar(row_frame, width=progress_col_width, height=8, progress_color="#2CC985")
-                progress_bar.pack(side="right", padx=10, pady=4)
-                lvl, xp = char['level'], char['xp']
-                prog = 1.0 if lvl >= 100 else (xp - XP_THRESHOLDS[lvl-1]) / (XP_THRESHOLDS[lvl] - XP_THRESHOLDS[lvl-1])
-                progress_bar.set(prog)
-                hover_widgets.append(progress_bar)
-
-            # Pack Left-aligned
-            asc_label = customtkinter.CTkLabel(row_frame, text=char['ascendancy'], width=asc_col_width, anchor="w")
-            asc_label.pack(side="left", padx=10, pady=4)
-            hover_widgets.append(asc_label)
-
-            lvl_label = customtkinter.CTkLabel(row_frame, text=char['level'], width=lvl_col_width, anchor="center")
-            lvl_label.pack(side="left", padx=10, pady=4)
-            hover_widgets.append(lvl_label)
-
-            name_label = customtkinter.CTkLabel(row_frame, text=char['name'], anchor="w")
-            name_label.pack(side="left", padx=10, pady=4, expand=True, fill="x")
-            hover_widgets.append(name_label)
-
-            # Make name clickable if account name is available
-            acc_name = char_to_acc.get(char['name'])
-            if acc_name:
-                name_label.configure(text_color="#4da6ff", cursor="hand2")
-                name_label.bind("<Button-1>", lambda e, l=league, a=acc_name, c=char['name']: self.open_poe_ninja(l, a, c))
-
-            # Hover effect
-            def on_enter(e, wf=row_frame): wf.configure(fg_color=HOVER_COLOR)
-            def on_leave(e, wf=row_frame): wf.configure(fg_color="transparent")
-
-            for widget in hover_widgets:
-                widget.bind("<Enter>", on_enter)
-                widget.bind("<Leave>", on_leave)
-            
-            self.displayed_character_names.add(char['name'])
+        if not self.results_table.winfo_manager():
+            self.results_frame.grid_forget()
+            self.results_table.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="nsew")
+        self.results_table.set_results(final_results, league)
 
     def _should_stop_fetching(self, ascendancy):
         """Helper to determine if the data fetching loop should stop."""
         if self.current_offset >= 15000: return True
         if ascendancy:
-            # Count characters that match the specific ascendancy OR map to the selected base class
-            count = 0
-            for entry in self.all_fetched_entries:
-                char_class = entry['character']['class']
-                if char_class == ascendancy or CLASS_TO_BASE.get(char_class) == ascendancy:
-                    count += 1
-            return count >= self.current_limit
-        
-        ascendancy_counts = {asc: 0 for asc in ALL_ASCENDANCY_NAMES}
-        for entry in self.all_fetched_entries:
-            char_class = entry['character']['class']
-            if char_class in ascendancy_counts: ascendancy_counts[char_class] += 1
+            # A base class counts the characters of all of its ascendancies
+            return self.ladder_aggregator.is_satisfied([ascendancy], self.current_limit)
         
         selected_league = self.get_selected_league() or ""
         if "Phrecia" in selected_league:
             relevant_asc = TEMPORARY_ASCENDANCIES
         else:
             relevant_asc = STANDARD_ASCENDANCIES
-        return all(ascendancy_counts[asc] >= self.current_limit for asc in relevant_asc)
+        return self.ladder_aggregator.is_satisfied(relevant_asc, self.current_limit)
 
+    @fetch_trace.traced("fetch")
     def fetch_and_display_data(self):
         selected_league_input = self.get_selected_league()
         deep_search = self.deep_search_check.get() == 1
@@ -971,36 +1243,77 @@ class App(customtkinter.CTk):
         if ascendancy == "All" or ascendancy == DROPDOWN_SEPARATOR:
             ascendancy = None
  
-        api_error = False
-        while not self._should_stop_fetching(ascendancy) and not self.stop_search_event.is_set():
-            self.status_label.configure(text=f"Fetching characters {self.current_offset} to {self.current_offset + CHUNK_SIZE}...")
-            data = GGGAPIClient.fetch_ladder(league_id, limit=CHUNK_SIZE, offset=self.current_offset, deep_search=deep_search)
-            
-            if data and isinstance(data, dict) and data.get('error'):
-                self.after(0, self.display_message, f"Error: {data.get('message', 'Unknown API error')}", "API Error")
-                api_error = True
-                break
+        # The proxy keeps precomputed per-group orderings, so "All" and every
+        # "Show More" need a single request. Scan chunk by chunk only as a fallback.
+        if not deep_search:
+            # The same list from the disk cache is shown at once while a fresh one is fetched.
+            cached = GGGAPIClient.cached_top(league_id, ascendancy, self.current_limit)
+            if cached:
+                self.after(0, fetch_trace.deferred(self.display_results), cached[1]['results'], selected_league_input)
+                if time.time() - cached[0] < MAX_REUSE_AGE:
+                    self.status_label.configure(text=f"Done. Showing top {self.current_limit} for {ascendancy if ascendancy else 'all ascendancies'}.")
+                    self.after(0, self.reset_button_states)
+                    return
+                self.status_label.configure(text="Showing saved results, refreshing...")
+            top = GGGAPIClient.fetch_top(league_id, ascendancy, self.current_limit)
+            if top and 'results' in top:
+                self.after(0, fetch_trace.deferred(self.display_results), top['results'], selected_league_input)
+                self.status_label.configure(text=f"Done. Showing top {self.current_limit} for {ascendancy if ascendancy else 'all ascendancies'}.")
+                self.after(0, self.reset_button_states)
+                return
 
-            if data is None or not data.get('entries', []):
-                self.status_label.configure(text="No more data from API.")
-                break
-            
-            self.all_fetched_entries.extend(data['entries'])
-            self.current_offset += CHUNK_SIZE
+        api_error = False
+        self.ladder_store = ladder_store(league_id)
+        # Chunks the store already has from the top down (possibly from an earlier
+        # session) give a first result at once. The scan below still fetches the
+        # stale ones again, and shows its result when it is done.
+        showing_saved = False
+        if self.current_offset == 0:
+            saved_end = self.ladder_store.first_missing(15000)
+            saved = self.ladder_store.entries(0, 15000 if saved_end is None else saved_end)
+            if saved:
+                with fetch_trace.phase("processing"):
+                    saved_results = LadderAggregator(self.current_limit).add(saved).results(ascendancy, self.current_limit)
+                self.after(0, fetch_trace.deferred(self.display_results), saved_results, selected_league_input)
+                self.status_label.configure(text="Showing saved results, refreshing...")
+                showing_saved = True
+        if not self._should_stop_fetching(ascendancy):
+            # Chunks are requested a few at a time, paced by the shared request budget,
+            # and arrive here in order; leaving the loop cancels the ones not sent yet.
+            # Chunks another view (such as race mode) fetched recently are reused.
+            with GGGAPIClient.iter_ladder_chunks(league_id, start=self.current_offset, end=15000, chunk_size=CHUNK_SIZE,
+                                                 deep_search=deep_search, stop_event=self.stop_search_event,
+                                                 priority=PRIORITY_BULK, store=self.ladder_store) as chunks:
+                for offset, data in chunks:
+                    if data and isinstance(data, dict) and data.get('error'):
+                        self.after(0, self.display_message, f"Error: {data.get('message', 'Unknown API error')}", "API Error")
+                        api_error = True
+                        break
+
+                    if data is None or not data.get('entries', []):
+                        self.status_label.configure(text="No more data from API.")
+                        break
+
+                    self.status_label.configure(text=f"Fetched characters {offset} to {offset + CHUNK_SIZE}...")
+                    with fetch_trace.phase("processing"):
+                        self.ladder_aggregator.add(data['entries'])
+                        self.current_offset = offset + CHUNK_SIZE
+
+                        # Live update for "All" or Base Class views, unless saved results are showing
+                        final_results = None if showing_saved else self.ladder_aggregator.results(ascendancy, self.current_limit)
+                    if final_results is not None:
+                        self.after(0, fetch_trace.deferred(self.display_results), final_results, selected_league_input)
+                    if self._should_stop_fetching(ascendancy):
+                        break
 
-            # Live update for "All" or Base Class views
-            final_results = process_ladder_data(self.all_fetched_entries, selected_ascendancy=ascendancy, limit=self.current_limit)
-            self.after(0, self.display_results, final_results, selected_league_input)
-            time.sleep(0.5)
-        
         if self.stop_search_event.is_set():
             self.after(0, self.status_label.configure, {"text": "Fetch stopped."})
             # If nothing was displayed, show a message. Otherwise, the partial results are fine.
-            if not self.results_frame.winfo_children():
+            if not len(self.results_table.model):
                 self.after(0, self.display_message, "The fetch operation was cancelled by the user.", "Fetch Stopped")
         elif not api_error:
-            final_results = process_ladder_data(self.all_fetched_entries, selected_ascendancy=ascendancy, limit=self.current_limit)
-            self.after(0, self.display_results, final_results, selected_league_input)
+            final_results = self.ladder_aggregator.results(ascendancy, self.current_limit)
+            self.after(0, fetch_trace.deferred(self.display_results), final_results, selected_league_input)
             self.status_label.configure(text=f"Done. Showing top {self.current_limit} for {ascendancy if ascendancy else 'all ascendancies'}.")
 
         self.after(0, self.reset_button_states)
@@ -1039,6 +1352,40 @@ class App(customtkinter.CTk):
         )
         self.race_mode_window.focus()
 
+    def launch_group_race_window(self):
+        if self.group_race_window is not None and self.group_race_window.winfo_exists():
+            self.group_race_window.focus()
+            return
+
+        if not self.all_leagues_data:
+            self.status_label.configure(text="Leagues are not loaded yet.")
+            return
+
+        # Start the group with the character just searched for, if any.
+        names = [self.found_character_for_race_mode['character']['name']] if self.found_character_for_race_mode else []
+        self.group_race_window = RaceGroupWindow(master=self, names=names)
+        self.group_race_window.focus()
+
+    def launch_compare_window(self):
+        if self.compare_window is not None and self.compare_window.winfo_exists():
+            self.compare_window.focus()
+            return
+
+        if not self.all_leagues_data:
+            self.status_label.configure(text="Leagues are not loaded yet.")
+            return
+
+        self.compare_window = LeagueCompareWindow(master=self)
+        self.compare_window.focus()
+
+    def toggle_timing_panel(self, event=None):
+        if self.timing_panel is not None and self.timing_panel.winfo_exists():
+            self.timing_panel.on_close()
+            return
+        self.timing_panel = TimingPanel(master=self)
+        self.timing_panel.focus()
+
+    @fetch_trace.traced("search")
     def search_character(self):
         selected_league_input = self.get_selected_league()
         deep_search = self.deep_search_check.get() == 1
@@ -1051,42 +1398,54 @@ class App(customtkinter.CTk):
         char_name_to_find = self.char_name_entry.get().strip()
 
         current_offset = 0
-        self.all_fetched_entries = [] # Clear cache for new search
+        self.ladder_store = ladder_store(league_id)
         found_entry = None
         ascendancy_counts = {asc: 0 for asc in ALL_ASCENDANCY_NAMES}
 
-        while not self.stop_search_event.is_set():
-            self.after(0, self.status_label.configure, {"text": f"Searching... Scanned {current_offset} characters so far."})
-            data = GGGAPIClient.fetch_ladder(league_id, limit=CHUNK_SIZE, offset=current_offset, deep_search=deep_search)
-
-            if data and isinstance(data, dict) and data.get('error'):
-                self.after(0, self.display_message, f"Error: {data.get('message', 'Unknown API error')}", "API Error")
-                break
-
-            entries = data.get('entries', [])
-            if not entries: break
-            
-            self.all_fetched_entries.extend(entries)
-            self.current_offset = current_offset + CHUNK_SIZE
-
-            for i, entry in enumerate(data['entries']):
-                if self.stop_search_event.is_set(): break
-                char_data = entry['character']
-                ascendancy = char_data['class']
-                
-                if ascendancy in ascendancy_counts: ascendancy_counts[ascendancy] += 1
-
-                entry['ascendancy_rank'] = ascendancy_counts.get(ascendancy)
-                entry['rank'] = current_offset + i + 1
-
-                if entry['character']['name'].lower() == char_name_to_find.lower():
-                    found_entry = entry
-            
-            if found_entry: break
-
-            current_offset += CHUNK_SIZE
-            if current_offset >= 15000 and not deep_search: break
-            time.sleep(0.1)
+        # Try the proxy's name index first; it answers in one request regardless of rank.
+        # Fall back to scanning if the snapshot is still being built or for deep searches.
+        scan_needed = True
+        if not deep_search:
+            lookup = GGGAPIClient.find_character(league_id, char_name_to_find)
+            if lookup and lookup.get('entry'):
+                found_entry = lookup['entry']
+                # Race mode opens straight from the lookup's neighbours.
+                self.ladder_store.put_lookup(lookup)
+                scan_needed = False
+            elif lookup and lookup.get('error') == 'not_found':
+                # The snapshot covers the whole public ladder, so scanning would not find it either.
+                current_offset = 15000
+                scan_needed = False
+
+        if scan_needed:
+            with GGGAPIClient.iter_ladder_chunks(league_id, end=None if deep_search else 15000, chunk_size=CHUNK_SIZE,
+                                                 deep_search=deep_search, stop_event=self.stop_search_event,
+                                                 priority=PRIORITY_SEARCH, store=self.ladder_store) as chunks:
+                for offset, data in chunks:
+                    if data and isinstance(data, dict) and data.get('error'):
+                        self.after(0, self.display_message, f"Error: {data.get('message', 'Unknown API error')}", "API Error")
+                        break
+
+                    entries = data.get('entries', [])
+                    if not entries: break
+
+                    current_offset = self.current_offset = offset + CHUNK_SIZE
+                    self.after(0, self.status_label.configure, {"text": f"Searching... Scanned {current_offset} characters so far."})
+
+                    with fetch_trace.phase("processing"):
+                        for i, entry in enumerate(entries):
+                            if self.stop_search_event.is_set(): break
+                            char_data = entry['character']
+                            ascendancy = char_data['class']
+
+                            if ascendancy in ascendancy_counts: ascendancy_counts[ascendancy] += 1
+
+                            entry['ascendancy_rank'] = ascendancy_counts.get(ascendancy)
+                            entry['rank'] = offset + i + 1
+
+                            if entry['character']['name'].lower() == char_name_to_find.lower():
+                                found_entry = entry
+                    if found_entry: break
 
         if self.stop_search_event.is_set():
             self.after(0, self.status_label.configure, {"text": "Search stopped."})
@@ -1099,12 +1458,12 @@ class App(customtkinter.CTk):
                       f"Class: {char_data['class']}\n\n"
                       f"Global Rank: {found_entry['rank']}\n"
                       f"Ascendancy Rank: {found_entry['ascendancy_rank']}")
-            self.after(0, self.display_message, result, "Character Found")
+            self.after(0, fetch_trace.deferred(self.display_message), result, "Character Found")
             self.after(0, self.status_label.configure, {"text": f"Search complete. Found {char_name_to_find}."})
             self.after(0, self.race_mode_button.configure, {"state": "normal"})
         else:
             message = f"Character '{char_name_to_find}' not found after scanning {current_offset} entries."
-            self.after(0, self.display_message, message, "Search Complete")
+            self.after(0, fetch_trace.deferred(self.display_message), message, "Search Complete")
             self.after(0, self.status_label.configure, {"text": "Search complete. Character not found."})
 
         self.after(0, self.reset_button_states)
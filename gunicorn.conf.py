@@ -0,0 +1,18 @@
+import os
+
+# Gunicorn picks this file up automatically from the working directory.
+# Command-line flags (such as --bind in the Procfile) take precedence.
+
+# Keep a single worker while the ladder crawler is enabled: every worker runs its
+# own crawler, so more workers multiply the upstream load, and /ladder-delta
+# version tokens are only known to the worker that issued them.
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+
+# Set PROXY_ASYNC=1 to serve with gevent workers. Every upstream GGG call then
+# yields to the event loop while it waits, so one worker can serve many slow
+# ladder, leagues and token requests at once. In this mode concurrency is bounded
+# by the rate-limit governor, not by the number of workers.
+if os.environ.get("PROXY_ASYNC", "0") == "1":
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get("PROXY_WORKER_CONNECTIONS", 1000))
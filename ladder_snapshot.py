@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from compact_ladder import CompactLadder, DEAD, RETIRED
+from data_processor import ALL_ASCENDANCY_NAMES, BASE_CLASSES, CLASS_TO_BASE, build_character_info, stamp_ladder_ranks
+
+# GGG's public ladder endpoint only exposes the top 15,000 entries of a league.
+PUBLIC_LADDER_DEPTH = 15000
+CHUNK_SIZE = 200
+# Snapshot versions whose changes are remembered for ladder deltas (12 x 5 minutes by default).
+DELTA_HISTORY = 12
+
+
+def delta_key(ladder, position):
+    """The fields of a row whose change makes it part of a ladder delta."""
+    return (ladder.ranks[position], ladder.ascendancy_ranks[position], ladder.experience[position],
+            ladder.levels[position], ladder.flags[position] & (DEAD | RETIRED))
+
+
+class LadderSnapshot:
+    """
+    An immutable, fully ranked copy of a league's public ladder. `entries` is a
+    CompactLadder whose ranks are already stamped; a list of raw entries is
+    converted as-is.
+    """
+    def __init__(self, league_id, entries, version, total=None, fetched_at=None, epoch=""):
+        if not isinstance(entries, CompactLadder):
+            entries = CompactLadder(entries)
+        self.league_id = league_id
+        self.entries = entries
+        self.version = version
+        # Opaque token clients hand back to /ladder-delta. The epoch ties it to the
+        # crawler that produced it, since versions restart in every server worker.
+        self.version_token = f"{epoch}.{version}" if epoch else str(version)
+        self.total = total if total is not None else len(entries)
+        self.fetched_at = fetched_at or time.time()
+        self._json_body = None
+        self._etag = None
+        self._encoded_bodies = {}
+
+        # Indexes for constant-time lookups, built once per snapshot.
+        # They are built straight from the columns, without materializing any entry.
+        self.name_index = {} # lower-cased name -> position in entries
+        for position, name in enumerate(entries.names):
+            self.name_index.setdefault(name.lower(), position)
+        code_positions = [[] for _ in entries.class_names]
+        for position, code in enumerate(entries.class_codes):
+            code_positions[code].append(position)
+        # class -> positions of its characters, in ladder order
+        self.class_positions = {entries.class_names[code]: positions for code, positions in enumerate(code_positions) if positions}
+
+        # Precomputed per-group orderings for top-N queries. Ascendancies are ordered
+        # by level (stable, so ties keep ladder order) and base classes by global rank,
+        # exactly like process_ladder_data.
+        self.ascendancy_order = {}
+        self.base_class_positions = {}
+        for char_class, positions in self.class_positions.items():
+            self.ascendancy_order[char_class] = sorted(positions, key=lambda p: -entries.levels[p])
+            base_class = CLASS_TO_BASE.get(char_class)
+            if base_class:
+                self.base_class_positions.setdefault(base_class, []).extend(positions)
+        for positions in self.base_class_positions.values():
+            positions.sort()
+
+    def find_character(self, name, neighbors=1):
+        """
+        Looks a character up by name (case-insensitive) and returns it together
+        with up to `neighbors` entries on each side, both on the global ladder and
+        within its ascendancy. 'ahead' lists are in ladder order, so their last
+        element is the nearest neighbour. Returns None if the name is unknown.
+        """
+        position = self.name_index.get(name.lower())
+        if position is None:
+            return None
+
+        entry = self.entries[position]
+        # ascendancy_rank is 1-based, so it doubles as the index into class_positions.
+        class_index = entry['ascendancy_rank'] - 1
+        class_positions = self.class_positions[entry['character']['class']]
+        asc_ahead = class_positions[max(0, class_index - neighbors):class_index]
+        asc_behind = class_positions[class_index + 1:class_index + 1 + neighbors]
+
+        return {
+            "league": self.league_id,
+            "version": self.version,
+            "entry": entry,
+            "rank": entry['rank'],
+            "ascendancy_rank": entry['ascendancy_rank'],
+            "ahead": self.entries[max(0, position - neighbors):position],
+            "behind": self.entries[position + 1:position + 1 + neighbors],
+            "ascendancy_ahead": [self.entries[p] for p in asc_ahead],
+            "ascendancy_behind": [self.entries[p] for p in asc_behind]
+        }
+
+    def top(self, selected_ascendancy=None, limit=5):
+        """
+        Returns the top `limit` characters per group in the same format and order
+        as process_ladder_data, straight from the precomputed orderings.
+        A base class aggregates all of its ascendancies into one group.
+        """
+        if selected_ascendancy in BASE_CLASSES:
+            positions = self.base_class_positions.get(selected_ascendancy, [])[:limit]
+            return [build_character_info(self.entries[p], selected_ascendancy, i + 1) for i, p in enumerate(positions)]
+
+        groups = [selected_ascendancy] if selected_ascendancy else ALL_ASCENDANCY_NAMES
+        results = []
+        for ascendancy in sorted(groups):
+            positions = self.ascendancy_order.get(ascendancy, [])[:limit]
+            results.extend(build_character_info(self.entries[p], ascendancy, i + 1) for i, p in enumerate(positions))
+        return results
+
+    def group_size(self, group):
+        """Number of characters in an ascendancy or (aggregated) base class group."""
+        if group in BASE_CLASSES:
+            return len(self.base_class_positions.get(group, []))
+        return len(self.class_positions.get(group, []))
+
+    def changes_since(self, previous):
+        """
+        Compares this snapshot with an older one of the same league. Returns the
+        lower-cased names of entries that are new or whose rank, experience,
+        level, dead or retired state changed, and the names that dropped off.
+        """
+        changed = set()
+        for name, position in self.name_index.items():
+            old_position = previous.name_index.get(name)
+            if old_position is None or delta_key(previous.entries, old_position) != delta_key(self.entries, position):
+                changed.add(name)
+        removed = set(previous.name_index) - set(self.name_index)
+        return frozenset(changed), frozenset(removed)
+
+    def to_dict(self):
+        return {
+            "league": self.league_id,
+            "version": self.version,
+            "version_token": self.version_token,
+            "fetched_at": self.fetched_at,
+            "total": self.total,
+            "entries": self.entries[:]
+        }
+
+    def json_body(self):
+        """Serializes the snapshot once; every later request reuses the bytes."""
+        if self._json_body is None:
+            self._json_body = json.dumps(self.to_dict(), separators=(',', ':')).encode('utf-8')
+        return self._json_body
+
+    def etag(self):
+        """A content hash of the serialized snapshot, identical across server workers."""
+        if self._etag is None:
+            self._etag = hashlib.sha1(self.json_body()).hexdigest()
+        return self._etag
+
+    def encoded_body(self, encoding, compress):
+        """Returns the body compressed with `encoding` (or raw if None), compressing only once."""
+        if not encoding:
+            return self.json_body()
+        if encoding not in self._encoded_bodies:
+            self._encoded_bodies[encoding] = compress(self.json_body(), encoding)
+        return self._encoded_bodies[encoding]
+
+
+class LadderCrawler:
+    """
+    Keeps an in-memory LadderSnapshot for every active league by walking the
+    public ladder in the background.
+
+    A league becomes active when a client touches it (or when it is pinned) and
+    stops being crawled once nobody has asked for it for idle_timeout seconds.
+    fetch_chunk(league_id, offset, limit) must return a (payload, status_code)
+    tuple, which lets the crawler share the proxy's cache and retry logic.
+
+    Snapshots, their history and the epoch of the version tokens are kept per
+    process, so the proxy has to run as a single server worker while the crawler
+    is enabled. Every further worker would crawl the same leagues again and
+    answer other workers' /ladder-delta tokens with a resync.
+    """
+    def __init__(self, fetch_chunk, refresh_interval=300, idle_timeout=900,
+                 chunk_delay=0.5, depth=PUBLIC_LADDER_DEPTH, pinned_leagues=(), history_size=DELTA_HISTORY):
+        self.fetch_chunk = fetch_chunk
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        self.chunk_delay = chunk_delay
+        self.depth = depth
+        self.pinned_leagues = set(pinned_leagues)
+        self.history_size = history_size
+        self.poll_interval = 5
+        self.epoch = os.urandom(4).hex()
+        self._snapshots = {}
+        self._history = {} # league -> deque of (version, changed names, removed names)
+        self._last_touched = {}
+        self._retry_at = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def touch(self, league_id):
+        """Marks a league as active so the crawler keeps its snapshot fresh."""
+        with self._lock:
+            self._last_touched[league_id] = time.time()
+            needs_snapshot = league_id not in self._snapshots
+        self._ensure_started()
+        if needs_snapshot:
+            self._wake.set()
+
+    def get_snapshot(self, league_id):
+        with self._lock:
+            return self._snapshots.get(league_id)
+
+    def delta(self, league_id, since_token):
+        """
+        Returns what changed in a league between the snapshot identified by
+        since_token and the current one: the current entries that changed and the
+        names that dropped off the ladder. Returns None when the token is unknown,
+        from another crawler or older than the remembered history, in which case
+        the client has to resync from the full snapshot.
+        """
+        epoch, _, version = since_token.rpartition(".")
+        try:
+            since = int(version)
+        except ValueError:
+            return None
+        with self._lock:
+            snapshot = self._snapshots.get(league_id)
+            history = list(self._history.get(league_id, ()))
+        if snapshot is None or epoch != self.epoch or since > snapshot.version:
+            return None
+
+        newer = [item for item in history if item[0] > since]
+        if len(newer) != snapshot.version - since:
+            return None # Some of the versions in between are no longer remembered.
+
+        changed = set()
+        removed = set()
+        for _version, changed_names, removed_names in newer:
+            changed |= changed_names
+            removed |= removed_names
+        positions = sorted(snapshot.name_index[name] for name in changed if name in snapshot.name_index)
+        removed = (removed | changed) - set(snapshot.name_index)
+        return {
+            "league": league_id,
+            "since": since_token,
+            "version": snapshot.version,
+            "version_token": snapshot.version_token,
+            "total": snapshot.total,
+            "changed": [snapshot.entries[p] for p in positions],
+            "removed": sorted(removed)
+        }
+
+    def _ensure_started(self):
+        # Started lazily so that forked server workers each run their own thread.
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="LadderCrawler", daemon=True)
+                    self._thread.start()
+
+    def _due_leagues(self):
+        now = time.time()
+        due = []
+        with self._lock:
+            for league_id in self.pinned_leagues | set(self._last_touched):
+                is_pinned = league_id in self.pinned_leagues
+                if not is_pinned and now - self._last_touched[league_id] > self.idle_timeout:
+                    # Nobody is watching this league anymore; free its memory.
+                    self._last_touched.pop(league_id, None)
+                    self._snapshots.pop(league_id, None)
+                    self._history.pop(league_id, None)
+                    continue
+                if now < self._retry_at.get(league_id, 0):
+                    continue
+                snapshot = self._snapshots.get(league_id)
+                if snapshot is None or now - snapshot.fetched_at >= self.refresh_interval:
+                    due.append(league_id)
+        return due
+
+    def _run(self):
+        while True:
+            for league_id in self._due_leagues():
+                self.crawl(league_id)
+            self._wake.wait(timeout=self.poll_interval)
+            self._wake.clear()
+
+    def crawl(self, league_id):
+        """
+        Walks the whole public ladder of a league and swaps in a new snapshot.
+        On any upstream error the previous snapshot is kept and the league is
+        retried after a back-off.
+        """
+        started = time.time()
+        entries = CompactLadder()
+        total = None
+        for offset in range(0, self.depth, CHUNK_SIZE):
+            payload, status = self.fetch_chunk(league_id, offset, CHUNK_SIZE)
+            if status != 200:
+                retry_in = payload.get('retry_after', 60) if status == 429 else self.refresh_interval
+                print(f"PROXY: Crawler stopped on '{league_id}' at offset {offset} (HTTP {status}). Retrying in {retry_in}s.")
+                with self._lock:
+                    self._retry_at[league_id] = time.time() + retry_in
+                return None
+
+            chunk = payload.get('entries', [])
+            total = payload.get('total', total)
+            # Rows are copied into columns, so cached responses are never mutated.
+            entries.extend(chunk)
+            if len(chunk) < CHUNK_SIZE:
+                break
+            time.sleep(self.chunk_delay)
+
+        stamp_ladder_ranks(entries)
+        previous = self.get_snapshot(league_id)
+        version = previous.version + 1 if previous else 1
+        snapshot = LadderSnapshot(league_id, entries, version, total=total, epoch=self.epoch)
+        # Only this thread swaps snapshots, so the diff can run outside the lock.
+        changes = snapshot.changes_since(previous) if previous else None
+        with self._lock:
+            self._snapshots[league_id] = snapshot
+            self._retry_at.pop(league_id, None)
+            history = self._history.setdefault(league_id, deque(maxlen=self.history_size))
+            if changes is None:
+                history.clear()
+            else:
+                history.append((version,) + changes)
+        print(f"PROXY: Crawled {len(entries)} entries for '{league_id}' in {time.time() - started:.1f}s (version {version}).")
+        return snapshot
@@ -0,0 +1,244 @@
+import bisect
+import threading
+import time
+
+from chunk_pipeline import CHUNK_SIZE
+from compact_ladder import CompactLadder
+from data_processor import ClassCountIndex
+from disk_cache import DISK_CACHE_MAX_AGE, disk_cache
+
+# Chunks fetched less than this many seconds ago are reused instead of fetched
+# again. Matches the proxy's own ladder cache, so reuse never shows older data.
+MAX_REUSE_AGE = 60
+
+
+class LadderStore:
+    """
+    The ladder of one league as far as the desktop app has fetched it, shared
+    by every view: chunks fetched by the main window's scans and searches can
+    be reused by race mode and the other way round.
+
+    It keeps the freshest copy of every chunk, compacted, with the time it was
+    fetched, and indexes over them by character name and by class, so finding a
+    character or its neighbours does not scan any lists. Characters found
+    through the proxy's name index are kept too, with the neighbours the proxy
+    returned. A ClassCountIndex over the chunks stamps ascendancy ranks on the
+    entries the store hands out. All methods are thread-safe.
+
+    With a DiskCache, every chunk stored is written through to it, and
+    load_from_disk() brings back the chunks of an earlier session with the
+    time they were fetched, so they are shown at once but fetched again
+    before they are reused.
+    """
+    def __init__(self, league_id, chunk_size=CHUNK_SIZE, disk=None):
+        self.league_id = league_id
+        self.chunk_size = chunk_size
+        self.disk = disk
+        self._class_counts = ClassCountIndex(chunk_size)
+        self._lock = threading.RLock()
+        self._chunks = {} # offset -> (fetched at, CompactLadder)
+        self._by_name = {} # lower-case name -> (fetched at, offset, position) of its freshest row
+        self._by_class = None # class -> sorted [(offset, position)], rebuilt on demand after changes
+        self._lookups = {} # lower-case name -> (fetched at, entry, entries around it in ladder order)
+        self._lookup_ascendancy_ranks = {} # lower-case name -> ascendancy rank from the latest lookup showing it
+
+    def put(self, offset, entries, fetched_at=None):
+        """Stores a freshly fetched chunk, stamping 'rank' on its entries. Returns the entries."""
+        fetched_at = fetched_at or time.time()
+        for i, entry in enumerate(entries):
+            entry['rank'] = offset + i + 1
+        self._store(offset, entries, fetched_at)
+        if self.disk is not None:
+            self.disk.put(self._disk_key(offset), entries, fetched_at)
+        return entries
+
+    def _store(self, offset, entries, fetched_at):
+        chunk = CompactLadder(entries)
+        with self._lock:
+            self._class_counts.update(offset, entries)
+            self._chunks[offset] = (fetched_at, chunk)
+            for position, name in enumerate(chunk.names):
+                self._by_name[name.lower()] = (fetched_at, offset, position)
+            self._by_class = None
+
+    def _disk_key(self, offset):
+        return f"chunk/{self.league_id}/{offset}"
+
+    def load_from_disk(self, max_age=DISK_CACHE_MAX_AGE):
+        """Stores the chunks of this league that the disk cache has from the last `max_age` seconds. Returns how many."""
+        if self.disk is None:
+            return 0
+        prefix = self._disk_key("")
+        loaded = 0
+        # Oldest first, so a character seen in several chunks ends up at its freshest row.
+        for key, fetched_at, entries in self.disk.items(prefix, max_age):
+            offset = key[len(prefix):]
+            if offset.isdigit() and entries:
+                self._store(int(offset), entries, fetched_at)
+                loaded += 1
+        return loaded
+
+    def put_lookup(self, lookup):
+        """Stores a character found through the proxy's name index (GGGAPIClient.find_character)."""
+        entry = lookup['entry']
+        around = {e['character']['name']: e for e in lookup.get('ascendancy_ahead', []) + lookup.get('ahead', [])
+                  + [entry] + lookup.get('behind', []) + lookup.get('ascendancy_behind', [])}
+        entries = sorted(around.values(), key=lambda e: e['rank'])
+        with self._lock:
+            self._lookups[entry['character']['name'].lower()] = (time.time(), entry, entries)
+            for around_entry in entries:
+                if around_entry.get('ascendancy_rank') is not None:
+                    self._lookup_ascendancy_ranks[around_entry['character']['name'].lower()] = around_entry['ascendancy_rank']
+
+    def lookup_ascendancy_rank(self, name):
+        """
+        Returns the ascendancy rank a proxy name lookup gave a character (or one
+        of its neighbours), or None. A stand-in while the class counts above the
+        character are incomplete.
+        """
+        with self._lock:
+            return self._lookup_ascendancy_ranks.get(name.lower())
+
+    def _entries(self, offset):
+        """
+        Builds the entry dicts of a stored chunk. Chunks can arrive in any order,
+        so ascendancy ranks are stamped here, once the counts above are known.
+        """
+        chunk = self._chunks[offset][1]
+        entries = list(chunk)
+        if self._class_counts.first_missing(offset) is None:
+            self._class_counts.stamp(offset, entries, chunk)
+        return entries
+
+    def chunk(self, offset, max_age=MAX_REUSE_AGE):
+        """Returns the entries of the chunk at `offset`, or None if it is missing or older than `max_age` seconds."""
+        with self._lock:
+            stored = self._chunks.get(offset)
+            if stored is None or time.time() - stored[0] > max_age:
+                return None
+            return self._entries(offset)
+
+    def entries(self, start=0, end=None):
+        """
+        Returns the stored entries from `start` up to `end` in ladder order,
+        leaving out rows of characters that were stored again elsewhere since.
+        """
+        with self._lock:
+            entries = []
+            for offset in sorted(self._chunks):
+                if offset < start or (end is not None and offset >= end):
+                    continue
+                fetched_at = self._chunks[offset][0]
+                entries.extend(entry for position, entry in enumerate(self._entries(offset))
+                               if self._by_name.get(entry['character']['name'].lower()) == (fetched_at, offset, position))
+            return entries
+
+    def first_missing(self, end):
+        """Returns the first chunk offset before `end` that was never stored, or None."""
+        with self._lock:
+            return self._class_counts.first_missing(end)
+
+    def missing(self, end):
+        """Returns every chunk offset before `end` that was never stored."""
+        with self._lock:
+            return self._class_counts.missing(end)
+
+    def stamp(self, offset, entries):
+        """Stamps 'rank' and 'ascendancy_rank' on entries of the chunk at `offset`; every chunk above must be stored."""
+        with self._lock:
+            self._class_counts.stamp(offset, entries)
+
+    def stale_chunks(self, end, count, skip=()):
+        """Picks up to `count` stored chunk offsets before `end` to fetch again, in rotation (see ClassCountIndex)."""
+        with self._lock:
+            return self._class_counts.stale_chunks(end, count, skip)
+
+    def _locate(self, name):
+        """Returns (fetched at, offset, position) of the freshest row of a character, or None."""
+        location = self._by_name.get(name.lower())
+        if location is None:
+            return None
+        # The chunk was fetched again since, and the character has moved out of it.
+        if self._chunks[location[1]][0] != location[0]:
+            return None
+        return location
+
+    def around(self, name, max_age=MAX_REUSE_AGE):
+        """
+        Returns (entry, entries around it in ladder order) for a character from
+        the freshest data younger than `max_age` seconds, or None.
+        """
+        now = time.time()
+        with self._lock:
+            location = self._locate(name)
+            lookup = self._lookups.get(name.lower())
+            if location and now - location[0] <= max_age and not (lookup and lookup[0] > location[0]):
+                fetched_at, offset, position = location
+                entries = []
+                for chunk_offset in (offset - self.chunk_size, offset, offset + self.chunk_size):
+                    stored = self._chunks.get(chunk_offset)
+                    if stored and now - stored[0] <= max_age:
+                        if chunk_offset == offset:
+                            entry_index = len(entries) + position
+                        entries.extend(self._entries(chunk_offset))
+                return entries[entry_index], entries
+            if lookup and now - lookup[0] <= max_age:
+                return lookup[1], lookup[2]
+        return None
+
+    def _class_index(self):
+        if self._by_class is None:
+            by_class = {}
+            for offset in sorted(self._chunks):
+                fetched_at, chunk = self._chunks[offset]
+                for position, name in enumerate(chunk.names):
+                    # Rows of characters that have since been seen elsewhere are left out.
+                    if self._by_name.get(name.lower()) == (fetched_at, offset, position):
+                        by_class.setdefault(chunk.class_name(position), []).append((offset, position))
+            self._by_class = by_class
+        return self._by_class
+
+    def neighbor(self, name, direction="ahead", same_class=False):
+        """
+        Returns the entry right ahead of (or behind) a character on the global
+        ladder, or within its class with `same_class`, from the stored chunks.
+        Returns None if the character or that neighbour is not stored.
+        """
+        with self._lock:
+            location = self._locate(name)
+            if location is None:
+                return None
+            _, offset, position = location
+            if same_class:
+                rows = self._class_index().get(self._chunks[offset][1].class_name(position), [])
+                index = bisect.bisect_left(rows, (offset, position)) + (-1 if direction == "ahead" else 1)
+                if not 0 <= index < len(rows):
+                    return None
+                offset, position = rows[index]
+            else:
+                position += -1 if direction == "ahead" else 1
+                if position < 0:
+                    offset, position = offset - self.chunk_size, self.chunk_size - 1
+                elif position >= self.chunk_size:
+                    offset, position = offset + self.chunk_size, 0
+            stored = self._chunks.get(offset)
+            if stored is None or position >= len(stored[1]):
+                return None
+            return self._entries(offset)[position]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def ladder_store(league_id):
+    """
+    Returns the desktop app's LadderStore of a league, creating it on first use
+    with the chunks the disk cache kept from earlier sessions.
+    """
+    with _stores_lock:
+        store = _stores.get(league_id)
+        if store is None:
+            store = _stores[league_id] = LadderStore(league_id, disk=disk_cache())
+            store.load_from_disk()
+        return store
@@ -1,11 +1,27 @@
+import gzip
+import hashlib
+import json
+import math
 import os
 import sys
 import requests
+import threading
 import time
-from flask import Flask, jsonify, request, render_template, send_from_directory
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, g, jsonify, request, render_template, send_from_directory, stream_with_context
 from dotenv import load_dotenv
-from urllib.parse import urlencode
-from data_processor import STANDARD_ASCENDANCIES, TEMPORARY_ASCENDANCIES, BASE_CLASSES
+from urllib.parse import urlencode, urlparse
+from requests.adapters import HTTPAdapter
+from data_processor import STANDARD_ASCENDANCIES, TEMPORARY_ASCENDANCIES, BASE_CLASSES, ALL_ASCENDANCY_NAMES
+from ladder_snapshot import LadderCrawler, CHUNK_SIZE, PUBLIC_LADDER_DEPTH
+from rate_limit import RateLimitGovernor, RateLimitExceeded, default_state_path
+from metrics import MetricsRegistry
+
+try:
+    import brotli # Optional; gzip is used when it is not installed
+except ImportError:
+    brotli = None
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -29,16 +45,235 @@ CLIENT_SECRET = os.environ.get("GGG_CLIENT_SECRET", "your_client_secret_here")
 CONTACT_EMAIL = os.environ.get("GGG_CONTACT_EMAIL", "your.email@example.com")
 
 # --- GGG API Details ---
-TOKEN_URL = "https://www.pathofexile.com/oauth/token"
-API_BASE_URL = "https://api.pathofexile.com"
+# The base URLs can be overridden to point the proxy at a local stand-in for testing.
+WEB_BASE_URL = os.environ.get("GGG_WEB_BASE_URL", "https://www.pathofexile.com")
+TOKEN_URL = f"{WEB_BASE_URL}/oauth/token"
+API_BASE_URL = os.environ.get("GGG_API_BASE_URL", "https://api.pathofexile.com")
+
+# --- Ladder Cache Settings ---
+# How long (in seconds) a ladder chunk fetched from GGG is served from memory.
+# GGG only refreshes the ladder every few minutes, so a short TTL is safe.
+LADDER_CACHE_TTL = int(os.environ.get("LADDER_CACHE_TTL", 60))
+# Upper bound on cached chunks (one chunk = one league/endpoint/offset/limit tuple).
+LADDER_CACHE_MAX_ENTRIES = int(os.environ.get("LADDER_CACHE_MAX_ENTRIES", 1000))
+
+# --- Ladder Crawler Settings ---
+# Set CRAWLER_ENABLED=0 to disable the background snapshot crawler.
+CRAWLER_ENABLED = os.environ.get("CRAWLER_ENABLED", "1") != "0"
+# How often (in seconds) an active league's full snapshot is rebuilt.
+SNAPSHOT_REFRESH_INTERVAL = int(os.environ.get("SNAPSHOT_REFRESH_INTERVAL", 300))
+# A league stops being crawled after this many seconds without client requests.
+SNAPSHOT_IDLE_TIMEOUT = int(os.environ.get("SNAPSHOT_IDLE_TIMEOUT", 900))
+# Pause between upstream chunk requests while crawling, to stay within rate limits.
+CRAWLER_CHUNK_DELAY = float(os.environ.get("CRAWLER_CHUNK_DELAY", 0.5))
+# Comma-separated league IDs that are always crawled, e.g. "Standard,Hardcore".
+CRAWL_LEAGUES = [l.strip() for l in os.environ.get("CRAWL_LEAGUES", "").split(",") if l.strip()]
+# Number of past snapshot versions /ladder-delta can diff against before clients must resync.
+SNAPSHOT_DELTA_HISTORY = int(os.environ.get("SNAPSHOT_DELTA_HISTORY", 12))
+
+# --- Rate Limit Settings ---
+# Longest time (in seconds) a request may be held back to stay within GGG's limits.
+# Anything longer fails fast with HTTP 429 and a Retry-After estimate.
+RATE_LIMIT_MAX_WAIT = float(os.environ.get("RATE_LIMIT_MAX_WAIT", 1.0))
+# File used to share the rate-limit budget between server workers. Set to "" to keep it per process.
+RATE_LIMIT_STATE_FILE = os.environ.get("RATE_LIMIT_STATE_FILE", default_state_path())
+
+# --- Upstream Connection Settings ---
+# Keep-alive connections kept open per GGG host. Matched to how many upstream
+# calls one worker can have in flight: many with gevent workers, few with sync ones.
+UPSTREAM_POOL_SIZE = int(os.environ.get("UPSTREAM_POOL_SIZE", 20 if os.environ.get("PROXY_ASYNC", "0") == "1" else 4))
+UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get("UPSTREAM_CONNECT_TIMEOUT", 5))
+UPSTREAM_READ_TIMEOUT = float(os.environ.get("UPSTREAM_READ_TIMEOUT", 30))
+
+# --- Ladder Range Streaming Settings ---
+# Upstream chunk requests kept in flight ahead of the one being streamed.
+RANGE_PIPELINE_DEPTH = int(os.environ.get("RANGE_PIPELINE_DEPTH", 3))
+# Largest number of entries a single /ladder-range request may cover.
+MAX_RANGE_ENTRIES = 20000
+
+# --- Response Compression Settings ---
+# JSON responses smaller than this (in bytes) are sent uncompressed.
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+# Upper bound for the 'neighbors' parameter of /character lookups.
+MAX_LOOKUP_NEIGHBORS = 50
 
 # --- In-memory Token Cache ---
 # We will cache tokens separately for each scope, as GGG's API
 # seems to require different tokens for different services.
 token_cache = {}
+# One lock per scope, so concurrent requests wait for a single token refresh.
+token_locks = {}
+token_locks_guard = threading.Lock()
+
+
+class _InFlight:
+    """Tracks one upstream fetch that concurrent identical requests wait on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class LadderCache:
+    """
+    A thread-safe TTL cache for upstream ladder responses.
+    Concurrent misses for the same key are coalesced ("single-flight"): the first
+    caller fetches from GGG while the others wait for and share its result.
+    Only successful (HTTP 200) responses are cached.
+    """
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> (expires_at, result)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_fetch(self, key, fetch_func):
+        """
+        Returns the cached result for key, or calls fetch_func() to produce one.
+        fetch_func must return a (payload, status_code) tuple.
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+
+            flight = self._in_flight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            flight.done.wait()
+            return flight.result
+
+        result = ({"error": "Upstream fetch failed"}, 500)
+        try:
+            result = fetch_func()
+        finally:
+            with self._lock:
+                if result[1] == 200 and self.ttl > 0:
+                    self._entries[key] = (time.time() + self.ttl, result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                del self._in_flight[key]
+            flight.result = result
+            flight.done.set()
+        return result
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "in_flight": len(self._in_flight),
+                "ttl_seconds": self.ttl,
+            }
+
+ladder_cache = LadderCache(LADDER_CACHE_TTL, LADDER_CACHE_MAX_ENTRIES)
+
+# --- Pooled Upstream Sessions ---
+# One requests.Session per GGG host, so consecutive chunk requests reuse the same
+# TCP/TLS connection instead of paying a new handshake every time.
+upstream_sessions = {}
+upstream_sessions_lock = threading.Lock()
+
+def get_upstream_session(url):
+    """Returns the shared keep-alive session for the host of the given URL."""
+    host = urlparse(url).netloc
+    session = upstream_sessions.get(host)
+    if session is None:
+        with upstream_sessions_lock:
+            session = upstream_sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=UPSTREAM_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                upstream_sessions[host] = session
+    return session
+
+UPSTREAM_TIMEOUT = (UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT)
+rate_governor = RateLimitGovernor(RATE_LIMIT_STATE_FILE, max_wait=RATE_LIMIT_MAX_WAIT)
 
 app = Flask(__name__, static_folder=resource_path('static'), template_folder=resource_path('.'))
 
+# --- Metrics ---
+# Served in the Prometheus text format at /metrics.
+metrics = MetricsRegistry()
+route_requests = metrics.counter("proxy_http_requests_total", "Requests served, by route, method and status.", ("route", "method", "status"))
+route_latency = metrics.histogram("proxy_http_request_duration_seconds", "Time to produce a response (to the first byte for streamed ones), by route.", ("route",))
+upstream_responses = metrics.counter("proxy_upstream_responses_total", "GGG API calls, by endpoint and status (429 = rate limited by GGG).", ("endpoint", "status"))
+upstream_latency = metrics.histogram("proxy_upstream_request_duration_seconds", "GGG API call latency, by endpoint.", ("endpoint",))
+upstream_in_flight = metrics.gauge("proxy_upstream_in_flight", "GGG API calls currently waiting for a response, by endpoint.", ("endpoint",))
+rate_limit_wait = metrics.counter("proxy_rate_limit_wait_seconds_total", "Time spent sleeping for rate-limit budget before GGG calls, including retries after a 429.", ("endpoint",))
+rate_limit_rejections = metrics.counter("proxy_rate_limit_rejections_total", "GGG calls not made because the rate-limit budget was exhausted for too long.", ("endpoint",))
+token_refreshes = metrics.counter("proxy_token_refreshes_total", "Access token requests, by scope and result.", ("scope", "result"))
+
+@metrics.collector
+def collect_cache_metrics():
+    stats = ladder_cache.stats()
+    yield ("proxy_ladder_cache_lookups_total", "counter", "Ladder cache lookups, by result (coalesced = waited for an identical in-flight fetch).",
+           [({"result": result}, stats[result]) for result in ("hits", "misses", "coalesced")])
+    yield ("proxy_ladder_cache_hit_ratio", "gauge", "Share of ladder cache lookups answered without a new GGG call.", [({}, stats["hit_ratio"])])
+    yield ("proxy_ladder_cache_entries", "gauge", "Ladder chunks currently cached.", [({}, stats["entries"])])
+    yield ("proxy_ladder_cache_in_flight", "gauge", "Distinct ladder chunks currently being fetched from GGG.", [({}, stats["in_flight"])])
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+# Registered before every other after_request hook, so it runs last and includes compression.
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    route_requests.inc(route, request.method, str(response.status_code))
+    if started is not None:
+        route_latency.observe(time.perf_counter() - started, route)
+    return response
+
+def _upstream_call(endpoint, method, url, **kwargs):
+    """Sends one request to GGG on the pooled session, recording its latency and status."""
+    upstream_in_flight.inc(endpoint)
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = get_upstream_session(url).request(method, url, timeout=UPSTREAM_TIMEOUT, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        upstream_in_flight.dec(endpoint)
+        upstream_latency.observe(time.perf_counter() - started, endpoint)
+        upstream_responses.inc(endpoint, status)
+
+def _acquire_budget(endpoint):
+    """rate_governor.acquire(), recording the time slept and any rejection."""
+    started = time.perf_counter()
+    try:
+        rate_governor.acquire(endpoint)
+    except RateLimitExceeded:
+        rate_limit_rejections.inc(endpoint)
+        raise
+    finally:
+        rate_limit_wait.inc(endpoint, amount=time.perf_counter() - started)
+
 # --- Web App Routes ---
 
 @app.route('/')
@@ -69,6 +304,17 @@ def get_access_token(scope="service:leagues"):
     if cache_entry.get("access_token") and time.time() < cache_entry.get("token_expiry", 0):
         return cache_entry["access_token"]
 
+    with token_locks_guard:
+        scope_lock = token_locks.setdefault(scope, threading.Lock())
+    with scope_lock:
+        # Another request may have refreshed the token while we were waiting.
+        cache_entry = token_cache.get(scope, {})
+        if cache_entry.get("access_token") and time.time() < cache_entry.get("token_expiry", 0):
+            return cache_entry["access_token"]
+        return _request_access_token(scope)
+
+def _request_access_token(scope):
+    """Requests a new token for a scope from GGG and stores it in the token cache."""
     print(f"PROXY: Requesting new GGG access token for scope: '{scope}'")
     headers = {
         "User-Agent": f"OAuth2.0-Client/{CLIENT_ID} (contact: {CONTACT_EMAIL})",
@@ -84,9 +330,17 @@ def get_access_token(scope="service:leagues"):
     # New log to show exactly what credentials the server is using
     print(f"PROXY: Auth Payload: client_id='{CLIENT_ID}', client_secret='{'*' * len(CLIENT_SECRET)}'")
     
+    try:
+        _acquire_budget("oauth")
+    except RateLimitExceeded as e:
+        print(f"PROXY: Not requesting a token, {e}")
+        token_refreshes.inc(scope, "rate_limited")
+        return None
+
     try:
         # The requests library correctly URL-encodes dictionary data.
-        response = requests.post(TOKEN_URL, headers=headers, data=payload)
+        response = _upstream_call("oauth", "POST", TOKEN_URL, headers=headers, data=payload)
+        rate_governor.update("oauth", response.headers, response.status_code)
         response.raise_for_status()
         token_data = response.json()
         
@@ -98,11 +352,13 @@ def get_access_token(scope="service:leagues"):
         expires_in = token_data.get('expires_in') or 3600
         new_cache_entry["token_expiry"] = time.time() + expires_in - 60
         token_cache[scope] = new_cache_entry
+        token_refreshes.inc(scope, "success")
         
         print("PROXY: Access token obtained successfully.")
         return new_cache_entry["access_token"]
     except requests.exceptions.RequestException as e:
         print(f"PROXY: Error fetching access token: {e}")
+        token_refreshes.inc(scope, "failure")
         if e.response is not None:
             print(f"PROXY: GGG API Response: {e.response.text}")
         return None
@@ -124,95 +380,337 @@ def proxy_leagues():
         "Authorization": f"Bearer {token}",
         "User-Agent": f"OAuth {CLIENT_ID}/1.0.0 (contact: {CONTACT_EMAIL})"
     }
+    leagues_data, status = _fetch_upstream_json(f"{API_BASE_URL}/leagues", headers, "/leagues", "leagues", attempts=3)
+    if status != 200:
+        return _json_response(leagues_data, status)
+
+    # The /leagues endpoint returns a direct list, not an object with a 'result' key.
+    if not isinstance(leagues_data, list):
+        # This handles cases where the API might change or return an error object
+        raise TypeError("GGG API response for leagues was not a list as expected.")
+    return _json_response(leagues_data, 200)
+
+def _rate_limited_payload(retry_after):
+    retry_after = math.ceil(retry_after)
+    return {
+        "error": "rate_limited",
+        "message": f"GGG API rate limit reached. Please try again in {retry_after} seconds.",
+        "retry_after": retry_after
+    }
+
+def _json_response(payload, status):
+    """
+    jsonify() with HTTP caching support. Successful responses carry an ETag of
+    their content and are answered with 304 Not Modified when the client already
+    has that version. Rate-limited responses carry a Retry-After header.
+    """
+    response = jsonify(payload)
+    response.status_code = status
+    if status == 200:
+        return _make_conditional(response, hashlib.sha1(response.get_data()).hexdigest())
+    if status == 429 and isinstance(payload, dict) and payload.get('retry_after') is not None:
+        response.headers['Retry-After'] = str(payload['retry_after'])
+    return response
+
+def _make_conditional(response, etag):
+    # Weak, because the same content may be sent with different compression.
+    response.set_etag(etag, weak=True)
+    # Let browsers keep the body but revalidate it on every use.
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+def _preferred_encoding(accept_encoding):
+    """Picks the best compression the client accepts: brotli, then gzip."""
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+def _fetch_upstream_json(url, headers, route_name, endpoint, attempts=4):
+    """
+    Performs a GET against the GGG API, paced by the rate-limit governor.
+    Returns a (payload, status_code) tuple so results can be cached and shared.
+    Never sleeps longer than RATE_LIMIT_MAX_WAIT; if the budget is exhausted for
+    longer, a 429 payload with a retry estimate is returned instead.
+    """
     try:
-        # Implement retry logic for rate limiting
-        for attempt in range(3): # Try up to 3 times
-            response = requests.get(f"{API_BASE_URL}/leagues", headers=headers)
-            if response.status_code == 429:
-                # Rate limit exceeded, wait and retry
-                retry_after = int(response.headers.get("Retry-After", 5)) # Default to 5s
-                print(f"PROXY: Rate limit hit on /leagues. Waiting for {retry_after} seconds...")
-                time.sleep(retry_after)
-                continue # Go to the next attempt
-            
-            response.raise_for_status() # Raise an exception for other bad statuses
-            # Explicitly parse the response from GGG and extract the 'result' list.
-            # The GGG API returns an object like {"result": [...]}.
-            leagues_data = response.json()
-            # Add logging to see the actual response from GGG
-            # The /leagues endpoint returns a direct list, not an object with a 'result' key.
-            if not isinstance(leagues_data, list):
-                # This handles cases where the API might change or return an error object
-                raise TypeError("GGG API response for leagues was not a list as expected.")
-            return jsonify(leagues_data)
-
-        # If all retries fail, return the last error response
-        return jsonify({"error": "Rate limit exceeded after multiple retries"}), 429
+        for attempt in range(attempts):
+            try:
+                _acquire_budget(endpoint)
+            except RateLimitExceeded as e:
+                print(f"PROXY: Rate limit budget exhausted on {route_name}. Retry in {math.ceil(e.retry_after)}s.")
+                return _rate_limited_payload(e.retry_after), 429
 
+            response = _upstream_call(endpoint, "GET", url, headers=headers)
+            rate_governor.update(endpoint, response.headers, response.status_code)
+            if response.status_code == 429:
+                # The governor has recorded the restriction; the next acquire() decides
+                # whether it is short enough to wait out or whether to fail fast.
+                print(f"PROXY: Rate limit hit on {route_name} (Retry-After: {response.headers.get('Retry-After')}).")
+                continue
+            response.raise_for_status()
+            return response.json(), 200
+        return _rate_limited_payload(max(rate_governor.estimate_wait(endpoint), 1)), 429
+    except requests.exceptions.Timeout as e:
+        print(f"PROXY: Timed out forwarding request to GGG {route_name}: {e}")
+        return {"error": "upstream_timeout", "message": "The GGG API did not respond in time."}, 504
     except requests.exceptions.RequestException as e:
-        print(f"PROXY: Error forwarding request to GGG /leagues: {e}")
+        print(f"PROXY: Error forwarding request to GGG {route_name}: {e}")
         if e.response is not None:
             print(f"PROXY: GGG API Response: {e.response.text}")
-        return jsonify({"error": str(e)}), e.response.status_code if e.response else 500
+        return {"error": str(e)}, e.response.status_code if e.response is not None else 500
+
+def fetch_authenticated_ladder_chunk(league_id, offset, limit):
+    """Fetches one chunk from the authenticated (deep) ladder through the shared cache."""
+    def fetch():
+        token = get_access_token("service:leagues:ladder") # Dedicated token for deep search
+        if not token:
+            return {"error": "Could not authenticate with GGG API"}, 500
+
+        # Use the official, authenticated endpoint to access the full ladder.
+        url = f"{API_BASE_URL}/ladder/{league_id}?limit={limit}&offset={offset}"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "User-Agent": f"OAuth {CLIENT_ID}/1.0.0 (contact: {CONTACT_EMAIL})"
+        }
+        return _fetch_upstream_json(url, headers, "/ladder", "ladder")
+
+    return ladder_cache.get_or_fetch(("ladder", league_id, offset, limit), fetch)
 
 @app.route('/ladder/<path:league_id>', methods=['GET'])
 def proxy_ladder(league_id):
     """Proxies the request to fetch ladder data using the authenticated GGG endpoint."""
-    token = get_access_token("service:leagues:ladder") # Dedicated token for deep search
-    if not token:
-        return jsonify({"error": "Could not authenticate with GGG API"}), 500
-
     limit = request.args.get('limit', 200, type=int)
     offset = request.args.get('offset', 0, type=int)
 
-    # Use the official, authenticated endpoint to access the full ladder.
-    url = f"{API_BASE_URL}/ladder/{league_id}?limit={limit}&offset={offset}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "User-Agent": f"OAuth {CLIENT_ID}/1.0.0 (contact: {CONTACT_EMAIL})"
-    }
-    try:
-        for attempt in range(4):
-            response = requests.get(url, headers=headers)
-            if response.status_code == 429:
-                retry_after = response.headers.get("Retry-After")
-                wait_time = int(retry_after) + 1 if retry_after else 2 * (attempt + 1)
-                print(f"PROXY: Rate limit hit on /ladder. Waiting {wait_time}s...")
-                time.sleep(wait_time)
-                continue
-            response.raise_for_status()
-            return jsonify(response.json())
-        return jsonify({"error": "Rate limit exceeded after retries"}), 429
-    except requests.exceptions.RequestException as e:
-        print(f"PROXY: Error forwarding request to GGG /ladder: {e}")
-        if e.response is not None:
-            print(f"PROXY: GGG API Response: {e.response.text}")
-        return jsonify({"error": str(e)}), e.response.status_code if e.response else 500
+    payload, status = fetch_authenticated_ladder_chunk(league_id, offset, limit)
+    return _json_response(payload, status)
+
+def fetch_public_ladder_chunk(league_id, offset, limit):
+    """Fetches one public ladder chunk through the shared cache. Returns (payload, status_code)."""
+    def fetch():
+        url = f"{WEB_BASE_URL}/api/ladders/{league_id}?limit={limit}&offset={offset}"
+        headers = {"User-Agent": f"PoeLadderTrackerProxy/1.0 (contact: {CONTACT_EMAIL})"}
+        return _fetch_upstream_json(url, headers, "public /ladders", "public-ladder")
+
+    return ladder_cache.get_or_fetch(("public-ladder", league_id, offset, limit), fetch)
+
+crawler = LadderCrawler(
+    fetch_public_ladder_chunk,
+    refresh_interval=SNAPSHOT_REFRESH_INTERVAL,
+    idle_timeout=SNAPSHOT_IDLE_TIMEOUT,
+    chunk_delay=CRAWLER_CHUNK_DELAY,
+    history_size=SNAPSHOT_DELTA_HISTORY,
+    pinned_leagues=CRAWL_LEAGUES
+)
 
 @app.route('/public-ladder/<path:league_id>', methods=['GET'])
 def proxy_public_ladder(league_id):
     """Proxies the request to the public, unauthenticated ladder endpoint."""
     limit = request.args.get('limit', 200, type=int)
     offset = request.args.get('offset', 0, type=int)
-    url = f"https://www.pathofexile.com/api/ladders/{league_id}?limit={limit}&offset={offset}"
-    headers = {"User-Agent": f"PoeLadderTrackerProxy/1.0 (contact: {CONTACT_EMAIL})"}
-    try:
-        for attempt in range(4):
-            response = requests.get(url, headers=headers)
-            if response.status_code == 429:
-                retry_after = response.headers.get("Retry-After")
-                wait_time = int(retry_after) + 1 if retry_after else 2 * (attempt + 1)
-                print(f"PROXY: Rate limit hit on /public-ladder. Waiting {wait_time}s...")
-                time.sleep(wait_time)
-                continue
-            response.raise_for_status()
-            return jsonify(response.json())
-        return jsonify({"error": "Rate limit exceeded after retries"}), 429
-    except requests.exceptions.RequestException as e:
-        print(f"PROXY: Error forwarding request to public GGG /ladders: {e}")
-        if e.response is not None:
-            print(f"PROXY: GGG API Response: {e.response.text}")
-        return jsonify({"error": str(e)}), e.response.status_code if e.response else 500
+    if CRAWLER_ENABLED:
+        crawler.touch(league_id)
+
+    payload, status = fetch_public_ladder_chunk(league_id, offset, limit)
+    return _json_response(payload, status)
+
+@app.route('/snapshot/<path:league_id>', methods=['GET'])
+def ladder_snapshot(league_id):
+    """Serves the crawler's materialized copy of a league's full public ladder."""
+    if not CRAWLER_ENABLED:
+        return jsonify({"error": "snapshot_disabled", "message": "The ladder crawler is disabled on this server."}), 503
+
+    crawler.touch(league_id)
+    snapshot = crawler.get_snapshot(league_id)
+    if snapshot is None:
+        # The first crawl of a league takes a while; clients should poll again.
+        return jsonify({"status": "pending", "message": f"Snapshot for '{league_id}' is being built. Try again shortly."}), 202
+
+    # The snapshot is large and changes only every few minutes, so its
+    # compressed forms are produced once and reused for every request.
+    encoding = _preferred_encoding(request.headers.get('Accept-Encoding', ''))
+    response = Response(snapshot.encoded_body(encoding, _compress), mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return _make_conditional(response, snapshot.etag())
+
+def _iter_ladder_range(league_id, start, end, deep_search):
+    """
+    Yields ranked entries for positions [start, end) of a league's ladder.
+    Serves from the crawler's snapshot when it covers the range; otherwise keeps
+    up to RANGE_PIPELINE_DEPTH upstream chunk requests in flight and yields each
+    chunk, in order, as soon as it arrives. Upstream errors are yielded as a
+    final {"error": ...} object.
+    """
+    snapshot = crawler.get_snapshot(league_id) if CRAWLER_ENABLED and not deep_search else None
+    if snapshot is not None and (end <= len(snapshot.entries) or len(snapshot.entries) < PUBLIC_LADDER_DEPTH):
+        yield from snapshot.entries[start:end]
+        return
+
+    fetch_chunk = fetch_authenticated_ladder_chunk if deep_search else fetch_public_ladder_chunk
+    offsets = iter(range(start - start % CHUNK_SIZE, end, CHUNK_SIZE))
+    with ThreadPoolExecutor(max_workers=max(1, RANGE_PIPELINE_DEPTH)) as pool:
+        pending = []
+        def schedule_next():
+            offset = next(offsets, None)
+            if offset is not None:
+                pending.append((offset, pool.submit(fetch_chunk, league_id, offset, CHUNK_SIZE)))
+
+        for _ in range(max(1, RANGE_PIPELINE_DEPTH)):
+            schedule_next()
+        try:
+            while pending:
+                offset, future = pending.pop(0)
+                payload, status = future.result()
+                if status != 200:
+                    yield payload if isinstance(payload, dict) else {"error": "upstream_error"}
+                    return
+                schedule_next()
+
+                entries = payload.get('entries', [])
+                for i, entry in enumerate(entries):
+                    rank = offset + i + 1
+                    if start < rank <= end:
+                        yield dict(entry, rank=rank)
+                if len(entries) < CHUNK_SIZE:
+                    return # Reached the end of the ladder
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+@app.route('/ladder-range/<path:league_id>', methods=['GET'])
+def ladder_range(league_id):
+    """
+    Streams ladder entries [from, to) as newline-delimited JSON, one entry per line,
+    so clients can process rows while the rest of the range is still being fetched.
+    """
+    deep_search = request.args.get('deep', '0') == '1'
+    start = max(request.args.get('from', 0, type=int), 0)
+    end = request.args.get('to', start + CHUNK_SIZE, type=int)
+    if not deep_search:
+        end = min(end, PUBLIC_LADDER_DEPTH)
+    if end <= start or end - start > MAX_RANGE_ENTRIES:
+        return jsonify({"error": "invalid_range", "message": f"'to' must be greater than 'from' and cover at most {MAX_RANGE_ENTRIES} entries."}), 400
+    if CRAWLER_ENABLED and not deep_search:
+        crawler.touch(league_id)
+
+    def generate():
+        for row in _iter_ladder_range(league_id, start, end, deep_search):
+            yield json.dumps(row, separators=(',', ':')) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/character/<path:league_id>/<name>', methods=['GET'])
+def find_character(league_id, name):
+    """Looks a character up in the league snapshot's name index, with its neighbours."""
+    if not CRAWLER_ENABLED:
+        return jsonify({"error": "snapshot_disabled", "message": "The ladder crawler is disabled on this server."}), 503
+
+    neighbors = min(max(request.args.get('neighbors', 1, type=int), 0), MAX_LOOKUP_NEIGHBORS)
+    crawler.touch(league_id)
+    snapshot = crawler.get_snapshot(league_id)
+    if snapshot is None:
+        return jsonify({"status": "pending", "message": f"Snapshot for '{league_id}' is being built. Try again shortly."}), 202
+
+    result = snapshot.find_character(name, neighbors)
+    if result is None:
+        return jsonify({"error": "not_found", "message": f"Character '{name}' is not in the top {len(snapshot.entries)} of '{league_id}'."}), 404
+    return _json_response(result, 200)
+
+@app.route('/ladder-delta/<path:league_id>', methods=['GET'])
+def ladder_delta(league_id):
+    """
+    Returns the entries that changed since the snapshot version a client already
+    has (?since=<version_token>), plus the new version token, so race views can
+    patch their local copy instead of re-downloading the ladder.
+    """
+    if not CRAWLER_ENABLED:
+        return jsonify({"error": "snapshot_disabled", "message": "The ladder crawler is disabled on this server."}), 503
+
+    since = request.args.get('since', '')
+    if not since:
+        return jsonify({"error": "invalid_version", "message": "'since' must be a version token from /snapshot or /ladder-delta."}), 400
+
+    crawler.touch(league_id)
+    snapshot = crawler.get_snapshot(league_id)
+    if snapshot is None:
+        return jsonify({"status": "pending", "message": f"Snapshot for '{league_id}' is being built. Try again shortly."}), 202
+
+    delta = crawler.delta(league_id, since)
+    if delta is None:
+        return jsonify({
+            "error": "resync_required",
+            "message": f"Version '{since}' is no longer available. Reload the full snapshot.",
+            "version_token": snapshot.version_token
+        }), 410
+    return _json_response(delta, 200)
+
+@app.route('/top/<path:league_id>', methods=['GET'])
+def top_characters(league_id):
+    """
+    Returns the ranked top-N characters per ascendancy (or for one ascendancy or
+    base class) from the league snapshot, in the same format as process_ladder_data.
+    """
+    if not CRAWLER_ENABLED:
+        return jsonify({"error": "snapshot_disabled", "message": "The ladder crawler is disabled on this server."}), 503
+
+    selected = request.args.get('base_class') or request.args.get('ascendancy') or None
+    if selected == "All":
+        selected = None
+    limit = max(request.args.get('limit', 10, type=int), 0)
+
+    crawler.touch(league_id)
+    snapshot = crawler.get_snapshot(league_id)
+    if snapshot is None:
+        return jsonify({"status": "pending", "message": f"Snapshot for '{league_id}' is being built. Try again shortly."}), 202
+
+    results = snapshot.top(selected, limit)
+    groups = [selected] if selected else ALL_ASCENDANCY_NAMES
+    return _json_response({
+        "league": league_id,
+        "version": snapshot.version,
+        "limit": limit,
+        "results": results,
+        "group_sizes": {group: snapshot.group_size(group) for group in groups}
+    }, 200)
+
+@app.after_request
+def compress_response(response):
+    """Compresses JSON responses with brotli or gzip when the client accepts it."""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype != 'application/json'):
+        return response
+    encoding = _preferred_encoding(request.headers.get('Accept-Encoding', ''))
+    body = response.get_data()
+    if encoding and len(body) >= COMPRESS_MIN_SIZE:
+        response.set_data(_compress(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/rate-limit-stats', methods=['GET'])
+def rate_limit_stats():
+    """Reports the remaining GGG rate-limit budget per policy, as tracked by the governor."""
+    return jsonify(rate_governor.budget())
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Reports hit/miss counters for the shared ladder cache."""
+    return jsonify(ladder_cache.stats())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Exposes request, upstream, rate-limit, token and cache metrics for Prometheus."""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 if __name__ == '__main__':
     # For production, use a proper WSGI server like Gunicorn or Waitress
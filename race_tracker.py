@@ -0,0 +1,134 @@
+from api import GGGAPIClient, PRIORITY_BULK, PRIORITY_RACE
+from fetch_trace import fetch_trace
+
+# Ranks searched on each side of a raced character's last known rank, and how
+# much the window grows each time the character is not in it.
+RACE_WINDOW_MARGIN = 100
+RACE_WINDOW_GROWTH = 4
+# Chunks re-fetched above the race windows per refresh to keep ascendancy ranks current.
+RACE_INDEX_REFRESH_CHUNKS = 2
+# Chunks above the race windows that the store has never seen, fetched per refresh
+# until the class counts reach down to the windows.
+RACE_INDEX_FILL_CHUNKS = 4
+# Race refreshes reuse chunks another view fetched less than this many seconds ago.
+RACE_REUSE_AGE = 20
+
+
+def find_characters(store, last_ranks, deep_search=False, stopped=None):
+    """
+    Finds a group of characters on the ladder of `store`'s league in one pass,
+    for race mode: `last_ranks` maps each character name to its last known
+    rank (or None).
+
+    The chunks around every character's last rank are fetched together, each
+    at most once, and every entry is checked against the set of characters not
+    found yet, so a whole party costs about as many requests as one character
+    when its members are close on the ladder. Windows widen only for the
+    characters still missing.
+
+    Ascendancy ranks are stamped from the store's class counts once they
+    reach down to a character. Chunks above the windows that the store has
+    never seen are filled in a few per refresh rather than all at once; until
+    then, characters keep the ascendancy rank of a proxy name lookup, if any.
+
+    Returns {"characters": {name: (entry, entries around it in ladder order)}}
+    for the characters found, an error dict like fetch_ladder()'s if a chunk
+    could not be fetched, or None if `stopped()` turned true meanwhile.
+    """
+    chunk_size = store.chunk_size
+    # Deep scans stop at a safety cap.
+    ladder_end = 20000 if deep_search else 15000
+    chunks = {} # offset -> entries fetched (or reused) by this refresh
+    unresolved = {name.lower(): (name, rank or 1) for name, rank in last_ranks.items()}
+    found = {} # name -> (offset, entry)
+    margin = RACE_WINDOW_MARGIN
+    while unresolved:
+        wanted = set()
+        for _, rank in unresolved.values():
+            start = max(0, (rank - 1 - margin) // chunk_size * chunk_size)
+            end = min(ladder_end, (rank - 1 + margin) // chunk_size * chunk_size + chunk_size)
+            wanted.update(range(start, end, chunk_size))
+
+        fetched = sorted(offset for offset in wanted if offset not in chunks and offset < ladder_end)
+        ladder_end = _fetch_chunks(store, deep_search, fetched, chunks, ladder_end, stopped)
+        if ladder_end is None or isinstance(ladder_end, dict):
+            return ladder_end
+
+        with fetch_trace.phase("processing"):
+            for offset in fetched:
+                for entry in chunks.get(offset, ()):
+                    name = entry['character']['name'].lower()
+                    if name in unresolved:
+                        found[unresolved.pop(name)[0]] = (offset, entry)
+
+        if margin >= ladder_end or all(offset in chunks for offset in range(0, ladder_end, chunk_size)):
+            break # The whole ladder has been searched
+        margin *= RACE_WINDOW_GROWTH
+
+    # Fill in a few chunks above the windows on every refresh, so ascendancy ranks
+    # become exact without fetching the whole ladder above the characters at once.
+    for offset in store.missing(min(chunks, default=0))[:RACE_INDEX_FILL_CHUNKS]:
+        if stopped is not None and stopped(): return None
+        data = GGGAPIClient.fetch_ladder(store.league_id, limit=chunk_size, offset=offset, deep_search=deep_search, priority=PRIORITY_BULK)
+        if data and len(data.get('entries', [])) == chunk_size:
+            store.put(offset, data['entries'])
+
+    results = {}
+    with fetch_trace.phase("processing"):
+        stamped = set()
+        for name, (found_offset, entry) in found.items():
+            # The character's chunk and the ones on either side provide its neighbors.
+            surrounding = []
+            for offset in range(found_offset - chunk_size, found_offset + 2 * chunk_size, chunk_size):
+                if offset not in chunks:
+                    continue
+                if offset not in stamped and store.first_missing(offset) is None:
+                    store.stamp(offset, chunks[offset])
+                    stamped.add(offset)
+                surrounding.extend(chunks[offset])
+            for neighbor in surrounding:
+                if 'ascendancy_rank' not in neighbor:
+                    looked_up = store.lookup_ascendancy_rank(neighbor['character']['name'])
+                    if looked_up is not None:
+                        neighbor['ascendancy_rank'] = looked_up
+            results[name] = (entry, surrounding)
+
+    # Re-count a few chunks above the windows on every refresh, so the class counts
+    # catch up with characters moving between chunks without a full rescan.
+    for offset in store.stale_chunks(min(chunks, default=0), RACE_INDEX_REFRESH_CHUNKS, skip=chunks):
+        if store.chunk(offset, RACE_REUSE_AGE) is not None:
+            continue # Another view has just fetched it
+        data = GGGAPIClient.fetch_ladder(store.league_id, limit=chunk_size, offset=offset, deep_search=deep_search, priority=PRIORITY_BULK)
+        if data and len(data.get('entries', [])) == chunk_size:
+            store.put(offset, data['entries'])
+    return {"characters": results}
+
+
+def _fetch_chunks(store, deep_search, offsets, chunks, ladder_end, stopped):
+    """
+    Fetches the chunks at the sorted `offsets`, one pipeline per run of consecutive
+    offsets, adding them to `chunks` and reusing those another view fetched in the
+    last RACE_REUSE_AGE seconds. Returns the end of the ladder as far as it is now
+    known, the error dict of a chunk that could not be fetched, or None if
+    `stopped()` turned true.
+    """
+    chunk_size = store.chunk_size
+    index = 0
+    while index < len(offsets) and offsets[index] < ladder_end:
+        run_start = run_end = offsets[index]
+        while index < len(offsets) and offsets[index] == run_end:
+            run_end += chunk_size
+            index += 1
+        with GGGAPIClient.iter_ladder_chunks(store.league_id, start=run_start, end=min(run_end, ladder_end), chunk_size=chunk_size,
+                                             deep_search=deep_search, priority=PRIORITY_RACE,
+                                             store=store, max_age=RACE_REUSE_AGE) as pipeline:
+            for offset, data in pipeline:
+                if stopped is not None and stopped(): return None
+                if isinstance(data, dict) and data.get('error'):
+                    return data
+                entries = data.get('entries') if isinstance(data, dict) else None
+                if entries:
+                    chunks[offset] = entries
+                if not entries or len(entries) < chunk_size:
+                    return offset + len(entries or [])
+    return ladder_end
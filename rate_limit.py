@@ -0,0 +1,201 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl # Only available on POSIX; used to share state between server workers
+except ImportError:
+    fcntl = None
+
+# Requests kept below each limit, to leave room for clock skew and other clients on the same IP.
+DEFAULT_SAFETY_MARGIN = 1
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the upstream budget is exhausted for longer than the caller is willing to wait."""
+    def __init__(self, policy, retry_after):
+        super().__init__(f"Rate limit budget for '{policy}' exhausted. Retry in {retry_after:.0f}s.")
+        self.policy = policy
+        self.retry_after = retry_after
+
+
+def parse_rule_header(value):
+    """
+    Parses a GGG rate-limit header such as "8:10:60,15:60:120" into a list of
+    (first, period, last) integer triples. For a limit header that is
+    (max_hits, period, restriction); for a state header (hits, period, active_restriction).
+    """
+    rules = []
+    for part in (value or "").split(","):
+        fields = part.strip().split(":")
+        if len(fields) == 3:
+            try:
+                rules.append(tuple(int(f) for f in fields))
+            except ValueError:
+                continue
+    return rules
+
+
+class RateLimitGovernor:
+    """
+    Paces outgoing GGG API calls using the X-Rate-Limit-* headers GGG returns.
+
+    Each upstream endpoint maps to a policy (learned from X-Rate-Limit-Policy).
+    For every policy the governor remembers its limits and a log of recent hits,
+    and before each call works out how long it would have to wait to stay within
+    all of them. Short waits are slept off; longer ones raise RateLimitExceeded so
+    the caller can fail fast with a retry estimate instead of holding a worker.
+
+    When a state file can be locked (POSIX), the budget is shared by every
+    server worker process on the machine; otherwise it is per process.
+    """
+    def __init__(self, state_path=None, max_wait=1.0, safety_margin=DEFAULT_SAFETY_MARGIN):
+        self.state_path = state_path
+        self.max_wait = max_wait
+        self.safety_margin = safety_margin
+        self._thread_lock = threading.Lock()
+        self._local_state = {"endpoints": {}, "policies": {}}
+
+    @contextmanager
+    def _state(self):
+        """Yields the shared state dict under an exclusive lock and persists changes."""
+        with self._thread_lock:
+            if not self.state_path or fcntl is None:
+                yield self._local_state
+                return
+            with open(self.state_path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read() or "{}")
+                    except ValueError:
+                        state = {}
+                    state.setdefault("endpoints", {})
+                    state.setdefault("policies", {})
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _required_wait(self, policy_state, now):
+        """Seconds until one more request fits within every window of a policy."""
+        wait = max(0.0, policy_state.get("restricted_until", 0) - now)
+        hits = policy_state.get("hits", [])
+        for limits in policy_state.get("rules", {}).values():
+            for max_hits, period, _restriction in limits:
+                allowed = max(1, max_hits - self.safety_margin)
+                window = [t for t in hits if t > now - period]
+                if len(window) >= allowed:
+                    # The oldest hit that must expire before another request fits.
+                    wait = max(wait, window[len(window) - allowed] + period - now)
+        return wait
+
+    def estimate_wait(self, endpoint):
+        """Returns the current wait for an endpoint without reserving a request."""
+        now = time.time()
+        with self._state() as state:
+            policy = state["endpoints"].get(endpoint)
+            if policy is None:
+                return 0.0
+            return self._required_wait(state["policies"].get(policy, {}), now)
+
+    def budget(self):
+        """Summarizes the remaining budget of every known policy, for diagnostics."""
+        now = time.time()
+        summary = {}
+        with self._state() as state:
+            for policy, policy_state in state["policies"].items():
+                hits = policy_state.get("hits", [])
+                windows = []
+                for rule, limits in policy_state.get("rules", {}).items():
+                    for max_hits, period, _restriction in limits:
+                        used = sum(1 for t in hits if t > now - period)
+                        windows.append({"rule": rule, "period": period, "limit": max_hits, "remaining": max(0, max_hits - used)})
+                summary[policy] = {
+                    "windows": windows,
+                    "restricted_for": round(max(0.0, policy_state.get("restricted_until", 0) - now), 1),
+                    "wait": round(self._required_wait(policy_state, now), 1)
+                }
+            summary_endpoints = dict(state["endpoints"])
+        return {"policies": summary, "endpoints": summary_endpoints}
+
+    def acquire(self, endpoint, max_wait=None):
+        """
+        Reserves budget for one request to an endpoint, sleeping for at most
+        max_wait seconds. Raises RateLimitExceeded if the wait would be longer.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        while True:
+            now = time.time()
+            with self._state() as state:
+                policy = state["endpoints"].get(endpoint)
+                if policy is None:
+                    # Nothing learned yet for this endpoint; let the first request through.
+                    return
+                policy_state = state["policies"].setdefault(policy, {})
+                wait = self._required_wait(policy_state, now)
+                if wait <= 0:
+                    policy_state.setdefault("hits", []).append(now)
+                    return
+            if wait > max_wait:
+                raise RateLimitExceeded(policy, wait)
+            time.sleep(wait)
+
+    def update(self, endpoint, headers, status_code=200):
+        """Learns limits and current usage from a GGG response's headers."""
+        policy = headers.get("X-Rate-Limit-Policy")
+        rule_names = [r.strip() for r in headers.get("X-Rate-Limit-Rules", "").split(",") if r.strip()]
+        retry_after = headers.get("Retry-After")
+        if not policy and status_code != 429:
+            return
+
+        now = time.time()
+        with self._state() as state:
+            if policy:
+                is_new = state["endpoints"].get(endpoint) != policy
+                state["endpoints"][endpoint] = policy
+            else:
+                policy = state["endpoints"].setdefault(endpoint, endpoint)
+                is_new = False
+            policy_state = state["policies"].setdefault(policy, {})
+            hits = policy_state.setdefault("hits", [])
+            if is_new:
+                # The request that produced these headers was not reserved through acquire().
+                hits.append(now)
+
+            rules = policy_state.setdefault("rules", {})
+            longest_period = 0
+            for rule in rule_names:
+                limits = parse_rule_header(headers.get(f"X-Rate-Limit-{rule}"))
+                if limits:
+                    rules[rule] = limits
+                    longest_period = max([longest_period] + [period for _, period, _ in limits])
+                for current_hits, period, active_restriction in parse_rule_header(headers.get(f"X-Rate-Limit-{rule}-State")):
+                    if active_restriction > 0:
+                        policy_state["restricted_until"] = max(policy_state.get("restricted_until", 0), now + active_restriction)
+                    # GGG counts hits from everyone sharing our IP/client; trust its count if it is higher.
+                    known = sum(1 for t in hits if t > now - period)
+                    hits.extend([now] * max(0, current_hits - known))
+
+            if status_code == 429:
+                try:
+                    penalty = int(retry_after) if retry_after else 60
+                except ValueError:
+                    penalty = 60
+                policy_state["restricted_until"] = max(policy_state.get("restricted_until", 0), now + penalty)
+
+            # Forget hits that no window can see anymore.
+            horizon = max(longest_period, max([p for limits in rules.values() for _, p, _ in limits] or [0]))
+            policy_state["hits"] = [t for t in hits if t > now - horizon] if horizon else []
+
+
+def default_state_path():
+    """A per-machine state file so all workers of one server share a budget."""
+    return os.path.join(tempfile.gettempdir(), "poeladdertracker_ratelimit.json")
@@ -0,0 +1,271 @@
+import math
+import sys
+
+import customtkinter
+
+from data_processor import level_progress
+
+# Height of every table row, before CustomTkinter's widget scaling.
+ROW_HEIGHT = 34
+# Pixels scrolled per mouse-wheel notch over the rows.
+SCROLL_STEP = ROW_HEIGHT * 3
+
+ACCENT_COLOR = "#4da6ff"
+HOVER_COLOR = ("gray92", "gray20")
+HEADER_SEPARATOR_COLOR = ("gray85", "gray60")
+
+ASC_COL_WIDTH = 140
+LVL_COL_WIDTH = 60
+RANK_COL_WIDTH = 120
+PROGRESS_COL_WIDTH = 100
+
+
+class ResultsTableModel:
+    """
+    The rows of the results table, kept apart from any widget: for every group
+    (ascendancy or base class), a header row followed by its characters in
+    the order process_ladder_data returned them.
+
+    Rows are ("group", name) or ("character", character info) tuples.
+    """
+    def __init__(self):
+        self.rows = []
+        self.league = None
+
+    def set_results(self, final_results, league):
+        """Replaces the rows with a new top-N list. Later lists are supersets, so nothing shown is lost."""
+        groups = {}
+        for char in final_results:
+            groups.setdefault(char.get('group', char['ascendancy']), []).append(char)
+        rows = []
+        for group, chars in groups.items():
+            rows.append(("group", group))
+            rows.extend(("character", char) for char in chars)
+        self.rows = rows
+        self.league = league
+
+    def clear(self):
+        self.rows = []
+        self.league = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+
+class _PooledRow:
+    """
+    One row of widgets that the table moves and re-fills as the user scrolls,
+    showing whichever model row is currently in its slot.
+    """
+    def __init__(self, table):
+        self.table = table
+        self.row = None
+        self.kind = None
+        self.frame = customtkinter.CTkFrame(table.viewport, height=ROW_HEIGHT, fg_color="transparent", corner_radius=6)
+        self.frame.grid_propagate(False)
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(2, weight=1)
+
+        self.group_label = customtkinter.CTkLabel(self.frame, anchor="w", text_color=ACCENT_COLOR, font=customtkinter.CTkFont(weight="bold"))
+        self.asc_label = customtkinter.CTkLabel(self.frame, width=ASC_COL_WIDTH, anchor="w")
+        self.lvl_label = customtkinter.CTkLabel(self.frame, width=LVL_COL_WIDTH, anchor="center")
+        self.name_label = customtkinter.CTkLabel(self.frame, anchor="w")
+        self.status_label = customtkinter.CTkLabel(self.frame, width=PROGRESS_COL_WIDTH, anchor="center", font=customtkinter.CTkFont(size=16))
+        self.progress_bar = customtkinter.CTkProgressBar(self.frame, width=PROGRESS_COL_WIDTH, height=8, progress_color="#2CC985")
+        self.rank_label = customtkinter.CTkLabel(self.frame, width=RANK_COL_WIDTH, anchor="e")
+        self.character_widgets = [self.asc_label, self.lvl_label, self.name_label, self.rank_label]
+
+        # The pool is small, so every widget gets its bindings once, for good.
+        for widget in [self.frame, self.group_label, self.status_label, self.progress_bar] + self.character_widgets:
+            widget.bind("<Enter>", self.on_enter)
+            widget.bind("<Leave>", self.on_leave)
+            table.bind_scroll(widget)
+        self.name_label.bind("<Button-1>", self.on_name_click)
+
+    def show(self, row):
+        """Fills the widgets with a model row, touching only what changed."""
+        if row is self.row:
+            return
+        self.row = row
+        kind, value = row
+        if kind != self.kind:
+            if kind == "group":
+                for widget in self.character_widgets + [self.status_label, self.progress_bar]:
+                    widget.grid_remove()
+                self.group_label.grid(row=0, column=0, columnspan=5, padx=10, sticky="ew")
+            else:
+                self.group_label.grid_remove()
+                self.asc_label.grid(row=0, column=0, padx=10)
+                self.lvl_label.grid(row=0, column=1, padx=10)
+                self.name_label.grid(row=0, column=2, padx=10, sticky="ew")
+                self.rank_label.grid(row=0, column=4, padx=10)
+            self.kind = kind
+            self.frame.configure(fg_color="transparent")
+
+        if kind == "group":
+            self.group_label.configure(text=value)
+            return
+
+        char = value
+        self.asc_label.configure(text=char['ascendancy'])
+        self.lvl_label.configure(text=char['level'])
+        self.rank_label.configure(text=f"{char['asc_rank']} / {char['global_rank']}")
+        # Make name clickable if account name is available
+        if char.get('account_name'):
+            self.name_label.configure(text=char['name'], text_color=ACCENT_COLOR, cursor="hand2")
+        else:
+            self.name_label.configure(text=char['name'], text_color=customtkinter.ThemeManager.theme["CTkLabel"]["text_color"], cursor="")
+
+        # Progress Bar or Status Icon
+        if char.get('dead') or char.get('retired'):
+            self.progress_bar.grid_remove()
+            if char.get('dead'):
+                self.status_label.configure(text="💀", text_color="#FF5252")
+            else:
+                self.status_label.configure(text="♿", text_color="gray")
+            self.status_label.grid(row=0, column=3, padx=10)
+        else:
+            self.status_label.grid_remove()
+            self.progress_bar.set(level_progress(char['level'], char['xp']))
+            self.progress_bar.grid(row=0, column=3, padx=10)
+
+    def on_enter(self, event=None):
+        if self.kind == "character":
+            self.frame.configure(fg_color=HOVER_COLOR)
+
+    def on_leave(self, event=None):
+        self.frame.configure(fg_color="transparent")
+
+    def on_name_click(self, event=None):
+        if self.kind == "character" and self.row[1].get('account_name') and self.table.on_name_click:
+            char = self.row[1]
+            self.table.on_name_click(self.table.model.league, char['account_name'], char['name'])
+
+
+class ResultsTable(customtkinter.CTkFrame):
+    """
+    A scrollable table of ranked characters that stays fast with thousands of rows.
+
+    Rather than a frame and half a dozen widgets per character, it keeps a pool
+    of row widgets just large enough to fill the visible area. Scrolling moves
+    the pool and re-fills each row from the ResultsTableModel, so the number of
+    Tk widgets, and the cost of populating, scrolling and resizing, do not grow
+    with the number of rows.
+    """
+    def __init__(self, master, on_name_click=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = ResultsTableModel()
+        self.on_name_click = on_name_click
+        self.pool = []
+        self.offset = 0 # Scroll position in unscaled pixels
+        self._render_job = None
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        # --- Table Header ---
+        header = customtkinter.CTkFrame(self, fg_color="transparent", height=30)
+        header.grid(row=0, column=0, columnspan=2, padx=5, pady=(5, 5), sticky="ew")
+        header.grid_columnconfigure(2, weight=1)
+        bold = customtkinter.CTkFont(weight="bold")
+        customtkinter.CTkLabel(header, text="ASCENDANCY", width=ASC_COL_WIDTH, anchor="w", font=bold, text_color=ACCENT_COLOR).grid(row=0, column=0, padx=10)
+        customtkinter.CTkLabel(header, text="LEVEL", width=LVL_COL_WIDTH, anchor="center", font=bold, text_color=ACCENT_COLOR).grid(row=0, column=1, padx=10)
+        customtkinter.CTkLabel(header, text="CHARACTER NAME", anchor="w", font=bold, text_color=ACCENT_COLOR).grid(row=0, column=2, padx=10, sticky="ew")
+        customtkinter.CTkLabel(header, text="PROGRESS", width=PROGRESS_COL_WIDTH, anchor="center", font=bold, text_color=ACCENT_COLOR).grid(row=0, column=3, padx=10)
+        customtkinter.CTkLabel(header, text="RANK (Asc/Global)", width=RANK_COL_WIDTH, anchor="e", font=bold, text_color=ACCENT_COLOR).grid(row=0, column=4, padx=10)
+
+        # --- Header Separator ---
+        customtkinter.CTkFrame(self, height=3, fg_color=HEADER_SEPARATOR_COLOR, corner_radius=0).grid(row=1, column=0, columnspan=2, padx=5, sticky="ew")
+
+        # --- Rows ---
+        self.viewport = customtkinter.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self.viewport.grid(row=2, column=0, padx=(5, 0), pady=5, sticky="nsew")
+        self.scrollbar = customtkinter.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.grid(row=2, column=1, padx=(0, 5), pady=5, sticky="ns")
+
+        self.viewport.bind("<Configure>", self.on_viewport_resize)
+        self.bind_scroll(self.viewport)
+
+    def bind_scroll(self, widget):
+        """Scrolls the table when the mouse wheel turns over `widget`."""
+        if sys.platform.startswith("linux"):
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-SCROLL_STEP))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(SCROLL_STEP))
+        else:
+            widget.bind("<MouseWheel>", self.on_mouse_wheel)
+
+    def on_mouse_wheel(self, event):
+        # Windows reports multiples of 120 per notch; macOS reports small deltas.
+        notches = event.delta / 120 if sys.platform == "win32" else event.delta
+        self.scroll_by(-notches * SCROLL_STEP)
+
+    def set_results(self, final_results, league):
+        self.model.set_results(final_results, league)
+        self.offset = min(self.offset, self._max_offset())
+        self.request_render()
+
+    def clear(self):
+        self.model.clear()
+        self.offset = 0
+        self.request_render()
+
+    def _scaling(self):
+        return customtkinter.ScalingTracker.get_widget_scaling(self)
+
+    def _viewport_height(self):
+        return self.viewport.winfo_height() / self._scaling()
+
+    def _max_offset(self):
+        return max(0, len(self.model) * ROW_HEIGHT - self._viewport_height())
+
+    def scroll_by(self, pixels):
+        self.scroll_to(self.offset + pixels)
+
+    def scroll_to(self, offset):
+        offset = min(max(0, int(offset)), int(self._max_offset()))
+        if offset != self.offset:
+            self.offset = offset
+            self.request_render()
+
+    def yview(self, action, value, unit=None):
+        """Handles the scrollbar: ("moveto", fraction) or ("scroll", count, "units" | "pages")."""
+        if action == "moveto":
+            self.scroll_to(float(value) * len(self.model) * ROW_HEIGHT)
+        elif action == "scroll":
+            step = self._viewport_height() if unit == "pages" else ROW_HEIGHT
+            self.scroll_by(int(value) * step)
+
+    def on_viewport_resize(self, event=None):
+        # One spare row covers the partly visible rows at the top and bottom.
+        needed = math.ceil(self._viewport_height() / ROW_HEIGHT) + 1
+        while len(self.pool) < needed:
+            self.pool.append(_PooledRow(self))
+        self.offset = min(self.offset, int(self._max_offset()))
+        self.request_render()
+
+    def request_render(self):
+        """Schedules one render for the next idle moment, however many scroll events arrive before it."""
+        if self._render_job is None:
+            self._render_job = self.after_idle(self.render)
+
+    def render(self):
+        self._render_job = None
+        first, shift = divmod(self.offset, ROW_HEIGHT)
+        visible = math.ceil(self._viewport_height() / ROW_HEIGHT) + 1
+        for slot, pooled in enumerate(self.pool):
+            index = first + slot
+            if slot < visible and index < len(self.model):
+                pooled.show(self.model[index])
+                pooled.frame.place(x=0, y=slot * ROW_HEIGHT - shift, relwidth=1.0)
+            else:
+                pooled.frame.place_forget()
+                pooled.row = None
+
+        total = len(self.model) * ROW_HEIGHT
+        if total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self._viewport_height()) / total))
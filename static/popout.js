@@ -4,7 +4,15 @@ let allFetchedEntries = [];
 let raceInterval = null;
 let xpHistory = {};
 
+// Local copy of the proxy's ladder snapshot. Refreshes patch it from /ladder-delta
+// instead of scanning the ladder again from the top.
+let ladderByName = null; // lower-cased name -> ranked entry
+let ladderByRank = [];   // rank - 1 -> ranked entry
+let ladderVersion = null;
+
 const CHUNK_SIZE = 200;
+// Entries shown to either side of the raced character when taken from the local ladder copy.
+const RACE_CONTEXT = 10;
 const XP_THRESHOLDS = [
     0, 525, 1760, 3781, 7184, 12186, 19324, 29377, 43181, 61693, 
     85990, 117506, 157384, 207736, 269997, 346462, 439268, 551295, 685171, 843709, 
@@ -18,6 +26,17 @@ const XP_THRESHOLDS = [
     2094900291, 2268549086, 2455921256, 2658074992, 2876116901, 3111280300, 3364828162, 3638186694, 3932818530, 4250334444
 ];
 
+// Fetches one public ladder chunk through the proxy. When GGG's rate limit is
+// exhausted the proxy answers 429 with a Retry-After estimate; wait it out here.
+async function fetchLadderChunk(leagueId, limit, offset, retries = 3) {
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(`/public-ladder/${encodeURIComponent(leagueId)}?limit=${limit}&offset=${offset}`);
+        if (response.status !== 429 || attempt >= retries) return response.json();
+        const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 5;
+        await new Promise(r => setTimeout(r, Math.min(retryAfter, 30) * 1000));
+    }
+}
+
 function calculateProgress(level, xp) {
     if (level >= 100) return 100;
     if (level < 1) return 0;
@@ -124,6 +143,79 @@ async function updateRaceData() {
     }
 
     const charName = foundCharacterEntry.character.name.toLowerCase();
+    let synced = false;
+    try {
+        synced = await syncLadder();
+    } catch (e) {
+        console.error(e);
+    }
+    // Without a snapshot on the proxy (still being built, or the crawler is disabled), scan the ladder.
+    const surroundingEntries = synced ? ladderSurroundings(charName) : await scanForCharacter(charName);
+    if (surroundingEntries) {
+        processRaceData(surroundingEntries);
+    }
+
+    if (btn) {
+        btn.disabled = false;
+        btn.textContent = "Refresh";
+    }
+}
+
+// Brings the local ladder copy up to date: applies the changes since the version
+// held, or loads the full snapshot the first time and whenever the proxy asks for
+// a resync. Returns false if the proxy has no snapshot to offer.
+async function syncLadder() {
+    const league = encodeURIComponent(leagueId);
+    if (ladderVersion) {
+        const response = await fetch(`/ladder-delta/${league}?since=${encodeURIComponent(ladderVersion)}`);
+        if (response.status === 200) {
+            applyLadderDelta(await response.json());
+            return true;
+        }
+        if (response.status !== 410) return false; // 410: the version is too old, resync below
+    }
+    const response = await fetch(`/snapshot/${league}`);
+    if (response.status !== 200) return false;
+    const snapshot = await response.json();
+    ladderByName = new Map();
+    ladderByRank = [];
+    applyLadderDelta({ version_token: snapshot.version_token, changed: snapshot.entries, removed: [] });
+    return true;
+}
+
+// Patches the local ladder copy with a /ladder-delta response. Every entry whose
+// rank changed is in it, so only the changed and removed characters are touched.
+function applyLadderDelta(delta) {
+    delta.removed.forEach(name => ladderByName.delete(name));
+    delta.changed.forEach(entry => {
+        ladderByName.set(entry.character.name.toLowerCase(), entry);
+        ladderByRank[entry.rank - 1] = entry;
+    });
+    ladderByRank.length = ladderByName.size; // Drops the ranks of a ladder that shrank
+    ladderVersion = delta.version_token;
+}
+
+// Entries around a character in the local ladder copy, plus the nearest characters
+// of its ascendancy on either side, in ladder order. Null if it is not on the ladder.
+function ladderSurroundings(charName) {
+    const me = ladderByName.get(charName);
+    if (!me) return null;
+    const index = me.rank - 1;
+    const myClass = me.character.class;
+    const sameClass = i => ladderByRank[i] && ladderByRank[i].character.class === myClass;
+    const surrounding = ladderByRank.slice(Math.max(0, index - RACE_CONTEXT), index + RACE_CONTEXT + 1).filter(Boolean);
+    let ahead = index - 1;
+    while (ahead >= 0 && !sameClass(ahead)) ahead--;
+    let behind = index + 1;
+    while (behind < ladderByRank.length && !sameClass(behind)) behind++;
+    if (ahead >= 0 && ahead < index - RACE_CONTEXT) surrounding.unshift(ladderByRank[ahead]);
+    if (behind < ladderByRank.length && behind > index + RACE_CONTEXT) surrounding.push(ladderByRank[behind]);
+    return surrounding;
+}
+
+// Finds a character by scanning the ladder from the top, stamping ranks on the way.
+// Returns the entries around it, or null if it is not in the first 15,000.
+async function scanForCharacter(charName) {
     let currentOffset = 0;
     let found = false;
     let ascCounts = {};
@@ -133,8 +225,7 @@ async function updateRaceData() {
     // Scan from 0 to get accurate Ascendancy Ranks
     while (currentOffset < 15000) {
         try {
-            const response = await fetch(`/public-ladder/${encodeURIComponent(leagueId)}?limit=${CHUNK_SIZE}&offset=${currentOffset}`);
-            const data = await response.json();
+            const data = await fetchLadderChunk(leagueId, CHUNK_SIZE, currentOffset);
             
             if (!data.entries || data.entries.length === 0) break;
             
@@ -157,8 +248,7 @@ async function updateRaceData() {
                     
                     // If near end of chunk, fetch one more small chunk for "Behind" neighbor
                     if (i >= entries.length - 2) {
-                         const nextRes = await fetch(`/public-ladder/${encodeURIComponent(leagueId)}?limit=10&offset=${currentOffset + CHUNK_SIZE}`);
-                         const nextData = await nextRes.json();
+                         const nextData = await fetchLadderChunk(leagueId, 10, currentOffset + CHUNK_SIZE);
                          if (nextData.entries) {
                              nextData.entries.forEach((ne, ni) => {
                                  const nasc = ne.character.class;
@@ -188,14 +278,7 @@ async function updateRaceData() {
         }
     }
 
-    if (found) {
-        processRaceData(surroundingEntries);
-    }
-
-    if (btn) {
-        btn.disabled = false;
-        btn.textContent = "Refresh";
-    }
+    return found ? surroundingEntries : null;
 }
 
 function processRaceData(surroundingEntries) {
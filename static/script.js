@@ -57,6 +57,17 @@ const CLASS_TO_BASE = {
     "Architect of Chaos": "Shadow"
 };
 
+// Fetches one public ladder chunk through the proxy. When GGG's rate limit is
+// exhausted the proxy answers 429 with a Retry-After estimate; wait it out here.
+async function fetchLadderChunk(leagueId, limit, offset, retries = 3) {
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(`/public-ladder/${encodeURIComponent(leagueId)}?limit=${limit}&offset=${offset}`);
+        if (response.status !== 429 || attempt >= retries) return response.json();
+        const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 5;
+        await new Promise(r => setTimeout(r, Math.min(retryAfter, 30) * 1000));
+    }
+}
+
 function calculateProgress(level, xp) {
     if (level >= 100) return 100;
     if (level < 1) return 0;
@@ -261,15 +272,29 @@ async function fetchAndDisplayData() {
     
     stopSearchFlag = false;
 
-    while (true) {
+    // The proxy keeps precomputed per-group orderings; scan chunk by chunk only while its snapshot is being built.
+    let servedFromSnapshot = false;
+    try {
+        const params = new URLSearchParams({ limit: currentLimit });
+        if (selectedAsc) params.set('ascendancy', selectedAsc);
+        const topRes = await fetch(`/top/${encodeURIComponent(leagueId)}?${params}`);
+        if (topRes.status === 200) {
+            const top = await topRes.json();
+            renderResults(top.results, leagueId);
+            servedFromSnapshot = true;
+        }
+    } catch (e) {
+        // Ignore and fall back to scanning
+    }
+
+    while (!servedFromSnapshot) {
         if (stopSearchFlag) break;
         if (shouldStopFetching(selectedAsc)) break;
 
         updateStatus(`Fetching characters ${currentOffset} to ${currentOffset + CHUNK_SIZE}...`);
         
         try {
-            const response = await fetch(`/public-ladder/${encodeURIComponent(leagueId)}?limit=${CHUNK_SIZE}&offset=${currentOffset}`);
-            const data = await response.json();
+            const data = await fetchLadderChunk(leagueId, CHUNK_SIZE, currentOffset);
 
             if (data.error) {
                 updateStatus(`Error: ${data.message}`);
@@ -297,8 +322,10 @@ async function fetchAndDisplayData() {
     }
 
     // Final update
-    const results = processLadderData(allFetchedEntries, selectedAsc, currentLimit);
-    renderResults(results, leagueId);
+    if (!servedFromSnapshot) {
+        const results = processLadderData(allFetchedEntries, selectedAsc, currentLimit);
+        renderResults(results, leagueId);
+    }
     
     updateStatus(`Done. Showing top ${currentLimit} for ${selectedAsc || 'all ascendancies'}.`);
     
@@ -369,12 +396,29 @@ async function searchCharacter() {
     updateStatus(`Searching for ${charName}...`);
     logResult("Starting search...");
 
+    // Ask the proxy's name index first; fall back to scanning while its snapshot is being built.
+    try {
+        const lookupRes = await fetch(`/character/${encodeURIComponent(leagueId)}/${encodeURIComponent(charName)}`);
+        if (lookupRes.status === 200) {
+            const lookup = await lookupRes.json();
+            foundCharacterEntry = lookup.entry;
+            // Keep the same-ascendancy neighbours too, so Race Mode can show them from the cache.
+            const around = new Map([...(lookup.ascendancy_ahead || []), ...lookup.ahead, lookup.entry, ...lookup.behind, ...(lookup.ascendancy_behind || [])]
+                .map(e => [e.character.name, e]));
+            allFetchedEntries = [...around.values()].sort((a, b) => a.rank - b.rank);
+            found = true;
+        } else if (lookupRes.status === 404) {
+            offset = 15000; // The snapshot covers the whole public ladder
+        }
+    } catch (e) {
+        // Ignore and scan chunk by chunk instead
+    }
+
     while (!stopSearchFlag && !found && offset < 15000) {
         updateStatus(`Scanning offset ${offset}...`);
         
         try {
-            const response = await fetch(`/public-ladder/${encodeURIComponent(leagueId)}?limit=${CHUNK_SIZE}&offset=${offset}`);
-            const data = await response.json();
+            const data = await fetchLadderChunk(leagueId, CHUNK_SIZE, offset);
             
             if (data.error) {
                 logResult(`Error: ${data.message}`);
@@ -413,14 +457,16 @@ async function searchCharacter() {
     document.getElementById('stopBtn').disabled = true;
 
     if (found) {
-        // Calculate Ascendancy Rank
-        let ascRank = 0;
-        const targetClass = foundCharacterEntry.character.class;
-        for (const entry of allFetchedEntries) {
-            if (entry.character.class === targetClass) ascRank++;
-            if (entry.character.name === foundCharacterEntry.character.name) break;
+        // Calculate Ascendancy Rank (already stamped when the proxy's index answered)
+        if (foundCharacterEntry.ascendancy_rank === undefined) {
+            let ascRank = 0;
+            const targetClass = foundCharacterEntry.character.class;
+            for (const entry of allFetchedEntries) {
+                if (entry.character.class === targetClass) ascRank++;
+                if (entry.character.name === foundCharacterEntry.character.name) break;
+            }
+            foundCharacterEntry.ascendancy_rank = ascRank;
         }
-        foundCharacterEntry.ascendancy_rank = ascRank;
 
         updateStatus(`Found ${foundCharacterEntry.character.name}!`);
         
@@ -533,8 +579,7 @@ async function updateRaceData() {
     // Scan from 0 to get accurate Ascendancy Ranks
     while (currentOffset < 15000) {
         try {
-            const response = await fetch(`/public-ladder/${encodeURIComponent(leagueId)}?limit=${CHUNK_SIZE}&offset=${currentOffset}`);
-            const data = await response.json();
+            const data = await fetchLadderChunk(leagueId, CHUNK_SIZE, currentOffset);
             
             if (!data.entries || data.entries.length === 0) break;
             
@@ -554,8 +599,7 @@ async function updateRaceData() {
                     surroundingEntries = [...(prevChunk.slice(-10)), ...entries];
                     
                     if (i >= entries.length - 2) {
-                         const nextRes = await fetch(`/public-ladder/${encodeURIComponent(leagueId)}?limit=10&offset=${currentOffset + CHUNK_SIZE}`);
-                         const nextData = await nextRes.json();
+                         const nextData = await fetchLadderChunk(leagueId, 10, currentOffset + CHUNK_SIZE);
                          if (nextData.entries) {
                              const nextChunkOffset = currentOffset + CHUNK_SIZE;
                              nextData.entries.forEach((ne, ni) => {